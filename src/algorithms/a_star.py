@@ -1,26 +1,36 @@
-import heapq
 from common.problem import Problems
-from common.node import Node
-from common.utils import expand, reconstruct_path
+from common.node import NodeStore
+from common.utils import reconstruct_path
+from common.frontier import IndexedPriorityQueue
+from common.vectorized import expand_batch, store_arrays
 
 # Graph Search A* (A*)
 # Pseudo code
 
 # function A_STAR_SEARCH(problem) returns a solution path or failure
-#     node ← NODE(STATE=problem.initial, PATH_COST=0, HEURISTIC=problem.heuristics[problem.initial])
-#     frontier ← a priority queue ordered by node.PATH_COST + node.HEURISTIC, with node as an element
-#     reached ← a dictionary with key problem.initial and value node
+#     store ← NODE_STORE(problem.graph.num_nodes)  // parent, path cost and heuristic arrays indexed by state
+#     ADD(store, problem.initial, PARENT=-1, PATH_COST=0, HEURISTIC=problem.heuristics[problem.initial])
+#     frontier ← an indexed priority queue ordered by PATH_COST + HEURISTIC, with one entry per state
 
 #     while frontier is not empty do
-#         _, current_node ← POP(frontier)
-
-#         if problem.IS_GOAL(current_node.STATE) then
-#             return RECONSTRUCT_PATH(current_node)
-
-#         for each child in EXPAND(problem, current_node) do
-#             if child.STATE not in reached or child.PATH_COST < reached[child.STATE].PATH_COST then
-#                 reached[child.STATE] ← child
-#                 PUSH(frontier, (child.PATH_COST + child.HEURISTIC, child))
+#         _, s ← POP(frontier)
+
+#         if problem.IS_GOAL(s) then
+#             return RECONSTRUCT_PATH(s, store)
+
+#         if s was expanded before then
+#             RECORD_REEXPANSION(budget, s)  // counted with a budget only; an inconsistent heuristic reopened s
+
+#         for each (s_prime, cost) in problem.SUCCESSORS(s) do
+#             path_cost ← store.path_costs[s] + cost
+#             if s_prime not in store or path_cost < store.path_costs[s_prime] then
+#                 ADD(store, s_prime, PARENT=s, PATH_COST=path_cost, HEURISTIC=problem.heuristics[s_prime])
+#                 if frontier.CONTAINS(s_prime) then
+#                     frontier.DECREASE_KEY(s_prime, path_cost + store.heuristics[s_prime], s_prime)
+#                 else
+#                     frontier.PUSH(s_prime, path_cost + store.heuristics[s_prime], s_prime)
+#             else
+#                 RECORD_DUPLICATE(budget, s_prime)
 #     return failure
 
 
@@ -42,41 +52,123 @@ def a_star_search(problem):
         list or None: The path from the initial state to the goal state if a path is found.
         The path is represented as a list of states. If no path is found, the function returns None.
     """
-    # Initialize the start node with the initial state, no parent, no action, zero path cost, and the heuristic value.
-    start_node = Node(
-        state=problem.initial,
-        parent=None,
-        action=None,
+    # Keep the search nodes in a node store: parallel arrays of parent, path cost and heuristic indexed by state.
+    # Only children that improve on the stored path are written, the rest are never allocated.
+    store = NodeStore(problem.graph.num_nodes)
+    store.add(
+        problem.initial,
+        parent=-1,
         path_cost=0,
         heuristic=problem.heuristics[problem.initial],
     )
+    path_costs = store.path_costs
 
-    # Initialize the priority queue (frontier) with the start node. The priority is the sum of the path cost and the heuristic.
-    frontier = [(start_node.path_cost + start_node.heuristic, start_node)]
-
-    # Initialize the reached dictionary to keep track of the best known path to each state.
-    reached = {problem.initial: start_node}
+    # Initialize the priority queue (frontier) with the start state. The priority is the sum of the path cost and the heuristic.
+    frontier = IndexedPriorityQueue(budget=problem.budget)
+    frontier.push(problem.initial, store.heuristics[problem.initial], problem.initial)
+    # With a budget, flag the expanded states to count re-expansions; without one, skip the bookkeeping.
+    budget = problem.budget
+    expanded = bytearray(problem.graph.num_nodes) if budget is not None else None
 
     # Continue searching while there are nodes to explore in the frontier.
-    while frontier:
-        # Pop the node with the lowest estimated total cost (path cost + heuristic) from the priority queue.
-        _, current_node = heapq.heappop(frontier)
-
-        # Check if the current node's state is the goal state.
-        if problem.is_goal(current_node.state):
-            return reconstruct_path(current_node)
-
-        # Expand the current node to generate its children.
-        for child in expand(problem=problem, node=current_node):
+    while not frontier.empty():
+        # Pop the state with the lowest estimated total cost (path cost + heuristic) from the priority queue.
+        _, s = frontier.pop()
+
+        # Check if the current state is the goal state.
+        if problem.is_goal(s):
+            return reconstruct_path(s, store=store)
+
+        # A state expanded before was reopened by a cheaper path (the heuristic is not consistent).
+        if expanded is not None:
+            if expanded[s]:
+                budget.record_reexpansion(s)
+            expanded[s] = 1
+
+        # Generate the successors of the current state.
+        for s_prime, cost in problem.successors(s):
+            path_cost = path_costs[s] + cost
             # If the child state is not reached yet, or the new path cost is lower than the previously known path cost:
-            if (
-                child.state not in reached
-                or child.path_cost < reached[child.state].path_cost
-            ):
-                # Update the reached dictionary with the new child node.
-                reached[child.state] = child
-                # Push the child node to the priority queue with its estimated total cost.
-                heapq.heappush(frontier, (child.path_cost + child.heuristic, child))
+            if s_prime not in store or path_cost < path_costs[s_prime]:
+                # Store the child node (its parent, path cost and heuristic).
+                store.add(
+                    s_prime,
+                    parent=s,
+                    path_cost=path_cost,
+                    heuristic=problem.heuristics[s_prime],
+                )
+                # Push the child state to the priority queue with its estimated total cost, or lower the cost of its entry.
+                priority = path_cost + store.heuristics[s_prime]
+                if frontier.contains(s_prime):
+                    frontier.decrease_key(s_prime, priority, s_prime)
+                else:
+                    frontier.push(s_prime, priority, s_prime)
+            elif budget is not None:
+                # Count the child pruned as a duplicate.
+                budget.record_duplicate(s_prime)
 
     # Return None if no path is found to the goal state.
     return None
+
+
+# Pseudo code for the vectorised variant
+
+# function A_STAR_SEARCH_VECTORIZED(problem) returns a solution path or failure
+#     same as A_STAR_SEARCH, except that every expansion is one batch:
+#         neighbors, costs, heuristics ← EXPAND_BATCH(problem, s)
+#         path_costs_new ← store.path_costs[s] + costs
+#         better ← neighbors not in store or path_costs_new < store.path_costs[neighbors]
+#         priorities ← path_costs_new[better] + heuristics[better]  // g + h of all kept children in one operation
+#         store the kept children, then push or decrease the key of each one with its priority
+
+
+def a_star_search_vectorized(problem):
+    """Graph Search A* Algorithm with batched expansion
+
+    Returns the same path as `a_star_search`. Each state is expanded with `expand_batch`, which
+    returns the neighbours, edge costs and heuristics of all children as NumPy arrays, so g + h and
+    the comparison with the stored path costs are computed for all children in one operation.
+
+    Args:
+        problem (Problems): The problem to solve. Its graph must be a `CSRGraph`.
+
+    Returns:
+        list or None: The path from the initial state to the goal state if a path is found, otherwise None.
+    """
+    store = NodeStore(problem.graph.num_nodes)
+    store.add(
+        problem.initial,
+        parent=-1,
+        path_cost=0,
+        heuristic=problem.heuristics[problem.initial],
+    )
+    reached, parents, path_costs, heuristics = store_arrays(store)
+    frontier = IndexedPriorityQueue(budget=problem.budget)
+    frontier.push(problem.initial, store.heuristics[problem.initial], problem.initial)
+
+    while not frontier.empty():
+        _, s = frontier.pop()
+
+        if problem.is_goal(s):
+            return reconstruct_path(s, store=store)
+
+        # Compute g, h and g + h of every child at once and keep the ones that improve on the store.
+        neighbors, costs, child_heuristics = expand_batch(problem, s)
+        new_costs = path_costs[s] + costs
+        better = ~reached[neighbors] | (new_costs < path_costs[neighbors])
+        neighbors = neighbors[better]
+        new_costs = new_costs[better]
+        child_heuristics = child_heuristics[better]
+        reached[neighbors] = True
+        parents[neighbors] = s
+        path_costs[neighbors] = new_costs
+        heuristics[neighbors] = child_heuristics
+        priorities = new_costs + child_heuristics
+
+        for s_prime, priority in zip(neighbors.tolist(), priorities.tolist()):
+            if frontier.contains(s_prime):
+                frontier.decrease_key(s_prime, priority, s_prime)
+            else:
+                frontier.push(s_prime, priority, s_prime)
+
+    return None
@@ -0,0 +1,464 @@
+import heapq
+import math
+import time
+from common.budget import BudgetExceeded
+from common.node import NodeStore
+from common.utils import reconstruct_path
+from common.frontier import IndexedPriorityQueue
+
+# Anytime searches: weighted A*, Anytime Weighted A* (AWA*), Anytime Repairing A* (ARA*) and focal search
+# Pseudo code
+
+# Each search keeps an incumbent: the cheapest path found so far, with a proven bound ε' such that
+# cost(incumbent) ≤ ε' × optimal cost. With an admissible heuristic, every path to the goal goes
+# through an open state, so the optimal cost is at least LOWER = MIN(cost(incumbent), min of g + h
+# over the open states), and ε' = cost(incumbent) / LOWER. When the deadline (or problem.budget)
+# runs out, the search stops and returns the incumbent with its bound. The budget can run out in
+# the middle of an expansion, after the state left the open list but before all its children were
+# generated, so the state being expanded still counts as open for LOWER.
+
+# function ANYTIME_WEIGHTED_A_STAR(problem, ε) returns (path, bound)
+#     store ← NODE_STORE with problem.initial, frontier ← indexed priority queue ordered by g + ε·h
+#     incumbent ← failure, cost ← ∞
+#     while frontier is not empty do
+#         _, s ← POP(frontier)
+#         if g(s) + h(s) ≥ cost then continue  // cannot lead to a cheaper path
+#         if problem.IS_GOAL(s) then
+#             incumbent, cost ← RECONSTRUCT_PATH(s, store), g(s)  // a better solution, keep searching
+#             continue
+#         for each (s_prime, c) in problem.SUCCESSORS(s) do
+#             if (s_prime not in store or g(s) + c < g(s_prime)) and g(s) + c + h(s_prime) < cost then
+#                 ADD(store, s_prime, PARENT=s, PATH_COST=g(s) + c)
+#                 PUSH or DECREASE_KEY(frontier, s_prime, g(s_prime) + ε·h(s_prime))  // reopens closed states
+#     return incumbent, 1  // the frontier is empty: the incumbent is optimal
+
+# function ARA_STAR(problem, ε, decrement) returns (path, bound)
+#     store ← NODE_STORE with problem.initial, frontier ← ordered by g + ε·h
+#     loop do
+#         closed ← ∅, incons ← ∅
+#         IMPROVE_PATH()
+#         publish the incumbent with ε' ← MIN(ε, g(goal) / min of g + h over frontier ∪ incons)
+#         if ε' ≤ 1 then return incumbent, 1
+#         ε ← MAX(1, ε - decrement)
+#         frontier ← frontier ∪ incons, reordered by g + ε·h  // the search effort is reused, not redone
+
+# function IMPROVE_PATH()
+#     while g(goal) > the lowest key of frontier do
+#         _, s ← POP(frontier), closed ← closed ∪ {s}
+#         for each (s_prime, c) in problem.SUCCESSORS(s) do
+#             if s_prime not in store or g(s) + c < g(s_prime) then
+#                 ADD(store, s_prime, PARENT=s, PATH_COST=g(s) + c)
+#                 if s_prime in closed then incons ← incons ∪ {s_prime}  // not reopened in this iteration
+#                 else PUSH or DECREASE_KEY(frontier, s_prime, g(s_prime) + ε·h(s_prime))
+
+# function FOCAL_SEARCH(problem, w) returns (path, bound)
+#     open ← the generated states not expanded yet, f_min ← the lowest g + h of open
+#     focal ← the states of open with g + h ≤ w·f_min, ordered by g + w·h  // weighted A* inside the bound
+#     while open is not empty and f_min < cost(incumbent) do
+#         s ← POP(focal), remove s from open
+#         if problem.IS_GOAL(s) then
+#             incumbent ← RECONSTRUCT_PATH(s, store)  // cost ≤ w × optimal, keep searching for better
+#             continue
+#         expand s like A*, adding the children to open (and to focal when g + h ≤ w·f_min)
+#     return incumbent, 1
+
+
+class AnytimeResult:
+    """
+    The outcome of an anytime search: the best path found, and how far from optimal it can be.
+
+    The bound is proven from the heuristic, so it only holds when the heuristic is admissible
+    (and, for ARA*, consistent).
+
+    Attributes:
+        path: The cheapest path found, or None.
+        cost: Its cost, or infinity without a path.
+        bound: The suboptimality bound: cost ≤ bound × optimal cost (1 once the path is proven optimal,
+            infinity without a path).
+        complete: Whether the search ran to the end: the path is then optimal, or there is no path.
+        stopped: The reason the search stopped early ("max time" for its deadline, or the reason of the
+            `BudgetExceeded` of problem.budget), or None.
+        solutions: The (elapsed seconds, cost, bound) of each improvement, in order.
+    """
+
+    def __init__(self, max_time=None):
+        self.path = None
+        self.cost = math.inf
+        self.bound = math.inf
+        self.complete = False
+        self.stopped = None
+        self.solutions = []
+        self.start_time = time.perf_counter()
+        self.deadline = None if max_time is None else self.start_time + max_time
+
+    def check_deadline(self):
+        # Stop the search once its deadline has passed.
+        if self.deadline is not None and time.perf_counter() > self.deadline:
+            raise BudgetExceeded("max time")
+
+    def improve(self, path, cost, lower_bound, epsilon=math.inf):
+        # Record a path, if cheaper than the incumbent, then tighten the bound.
+        if cost < self.cost:
+            self.path, self.cost = path, cost
+        self.tighten(lower_bound, epsilon)
+
+    def tighten(self, lower_bound, epsilon=math.inf):
+        # Tighten the bound of the incumbent from a lower bound on the optimal cost, or from the
+        # suboptimality factor the search guarantees (ε), whichever is lower.
+        if self.path is None:
+            return
+        lower_bound = min(lower_bound, self.cost)
+        ratio = self.cost / lower_bound if lower_bound > 0 else math.inf
+        bound = min(self.bound, max(1.0, min(epsilon, ratio)))
+        if bound < self.bound or not self.solutions or self.solutions[-1][1] != self.cost:
+            self.bound = bound
+            self.solutions.append((time.perf_counter() - self.start_time, self.cost, bound))
+
+    def finish(self):
+        # The search ran to the end: the incumbent (if any) is optimal.
+        self.complete = True
+        if self.path is not None and self.bound > 1:
+            self.bound = 1.0
+            self.solutions.append((time.perf_counter() - self.start_time, self.cost, 1.0))
+
+
+def _best_path(result):
+    # The path of an anytime result, for the searches that return a path: a search stopped by its
+    # budget before finding any path reports it like the other algorithms.
+    if result.path is None and result.stopped is not None:
+        raise BudgetExceeded(result.stopped)
+    return result.path
+
+
+def _open_lower_bound(store, states):
+    # The lowest g + h of the given states, a lower bound on the optimal cost.
+    path_costs, heuristics = store.path_costs, store.heuristics
+    return min((path_costs[s] + heuristics[s] for s in states), default=math.inf)
+
+
+def anytime_weighted_a_star(problem, epsilon=3.0, max_time=None, first_only=False):
+    """Anytime Weighted A* (AWA*)
+
+    Weighted A* orders the frontier by g + ε·h: it trusts the heuristic more than A* does and
+    reaches the goal after far fewer expansions, with a path that costs at most ε times the
+    optimal one. Instead of stopping there, AWA* keeps the path as an incumbent and goes on with
+    the same frontier, pruning every state with g + h at least its cost, and reopening states
+    reached again more cheaply. Each goal popped later is a cheaper path; when the frontier is
+    empty, the incumbent is optimal.
+
+    Args:
+        problem (Problems): The problem to solve (see `a_star_search`).
+        epsilon (float): The weight of the heuristic, at least 1.
+        max_time (float): The deadline in seconds, or None to run to the end.
+        first_only (bool): Stop at the first path (plain weighted A*).
+
+    Returns:
+        AnytimeResult: The best path found and its bound.
+    """
+    result = AnytimeResult(max_time)
+    heuristics = problem.heuristics
+    store = NodeStore(problem.graph.num_nodes)
+    store.add(problem.initial, parent=-1, path_cost=0, heuristic=heuristics[problem.initial])
+    path_costs, store_heuristics = store.path_costs, store.heuristics
+    frontier = IndexedPriorityQueue(budget=problem.budget)
+    frontier.push(problem.initial, epsilon * store_heuristics[problem.initial], problem.initial)
+    budget = problem.budget
+    expanding = None  # The state whose children are being generated.
+
+    try:
+        while not frontier.empty():
+            result.check_deadline()
+            _, s = frontier.pop()
+            # Prune: no path through s can beat the incumbent.
+            if path_costs[s] + store_heuristics[s] >= result.cost:
+                continue
+            if problem.is_goal(s):
+                lower_bound = _open_lower_bound(store, (entry[2] for entry in frontier.heap))
+                result.improve(reconstruct_path(s, store=store), path_costs[s], lower_bound, epsilon)
+                if first_only:
+                    return result
+                continue
+
+            expanding = s  # Open until all its children are generated.
+            for s_prime, cost in problem.successors(s):
+                path_cost = path_costs[s] + cost
+                if s_prime not in store or path_cost < path_costs[s_prime]:
+                    h = heuristics[s_prime]
+                    if path_cost + h >= result.cost:
+                        continue  # Pruned by the incumbent.
+                    store.add(s_prime, parent=s, path_cost=path_cost, heuristic=h)
+                    # Push the child, or lower the key of its entry; a closed state is reopened.
+                    priority = path_cost + epsilon * h
+                    if frontier.contains(s_prime):
+                        frontier.decrease_key(s_prime, priority, s_prime)
+                    else:
+                        frontier.push(s_prime, priority, s_prime)
+                elif budget is not None:
+                    budget.record_duplicate(s_prime)
+            expanding = None
+        result.finish()
+    except BudgetExceeded as e:
+        # Out of time: bound the incumbent by what is still open.
+        result.stopped = e.reason
+        open_states = [entry[2] for entry in frontier.heap]
+        if expanding is not None:
+            open_states.append(expanding)  # Cut off mid-expansion.
+        result.tighten(_open_lower_bound(store, open_states), epsilon)
+    return result
+
+
+def ara_star(problem, epsilon=3.0, decrement=0.5, max_time=None):
+    """Anytime Repairing A* (ARA*)
+
+    A series of weighted A* searches with a decreasing ε (by `decrement`, down to 1), each one
+    giving a path within ε of the optimal. The searches are not started over: every iteration
+    keeps the store (g values and parents) and the frontier of the previous one, and only
+    revisits the states whose g value improved after they were expanded (kept in INCONS), so
+    each iteration repairs the previous path instead of searching again. A state is expanded at
+    most once per iteration.
+
+    Args:
+        problem (Problems): The problem to solve (see `a_star_search`).
+        epsilon (float): The weight of the heuristic in the first iteration, at least 1.
+        decrement (float): How much ε decreases from one iteration to the next.
+        max_time (float): The deadline in seconds, or None to run to the end.
+
+    Returns:
+        AnytimeResult: The best path found and its bound.
+    """
+    result = AnytimeResult(max_time)
+    heuristics = problem.heuristics
+    num_nodes = problem.graph.num_nodes
+    goal = problem.goal
+    store = NodeStore(num_nodes)
+    store.add(problem.initial, parent=-1, path_cost=0, heuristic=heuristics[problem.initial])
+    path_costs, store_heuristics = store.path_costs, store.heuristics
+    frontier = IndexedPriorityQueue(budget=problem.budget)
+    frontier.push(problem.initial, epsilon * store_heuristics[problem.initial], problem.initial)
+    incons = []  # States improved after their expansion in this iteration.
+    budget = problem.budget
+    expanding = None  # The state whose children are being generated.
+
+    try:
+        while True:
+            # IMPROVE_PATH: expand until no state of the frontier can lead to a cheaper goal.
+            closed = bytearray(num_nodes)
+            while not frontier.empty() and (
+                goal not in store or path_costs[goal] > frontier.peek()[0]
+            ):
+                result.check_deadline()
+                _, s = frontier.pop()
+                closed[s] = 1
+                expanding = s  # Open until all its children are generated.
+                for s_prime, cost in problem.successors(s):
+                    path_cost = path_costs[s] + cost
+                    if s_prime not in store or path_cost < path_costs[s_prime]:
+                        store.add(s_prime, parent=s, path_cost=path_cost, heuristic=heuristics[s_prime])
+                        if closed[s_prime]:
+                            incons.append(s_prime)  # Expanded once in this iteration already.
+                        else:
+                            priority = path_cost + epsilon * store_heuristics[s_prime]
+                            if frontier.contains(s_prime):
+                                frontier.decrease_key(s_prime, priority, s_prime)
+                            else:
+                                frontier.push(s_prime, priority, s_prime)
+                    elif budget is not None:
+                        budget.record_duplicate(s_prime)
+                expanding = None
+
+            if goal not in store:
+                break  # The frontier is empty: there is no path.
+            # Publish the path of this iteration, within ε of the optimal.
+            open_states = [entry[2] for entry in frontier.heap] + incons
+            lower_bound = _open_lower_bound(store, open_states)
+            result.improve(reconstruct_path(goal, store=store), path_costs[goal], lower_bound, epsilon)
+            if result.bound <= 1:
+                break
+
+            # Next iteration: a lower ε, and the inconsistent states back in the frontier.
+            epsilon = max(1.0, epsilon - decrement)
+            # (Built apart, so a budget stop while it fills up still sees every open state.)
+            next_frontier = IndexedPriorityQueue(budget=problem.budget)
+            for s in set(open_states):
+                next_frontier.push(s, path_costs[s] + epsilon * store_heuristics[s], s)
+            frontier, incons = next_frontier, []
+        result.finish()
+    except BudgetExceeded as e:
+        result.stopped = e.reason
+        # The ε of an unfinished iteration is not proven yet: only the lower bound holds.
+        open_states = [entry[2] for entry in frontier.heap] + incons
+        if expanding is not None:
+            open_states.append(expanding)  # Cut off mid-expansion.
+        result.tighten(_open_lower_bound(store, open_states))
+    return result
+
+
+def anytime_focal_search(problem, weight=1.5, max_time=None, first_only=False):
+    """Focal search (A*ε)
+
+    Like A*, the open states are ordered by f = g + h, but the next state is chosen among the
+    FOCAL ones, whose f is at most `weight` times the lowest f, by the lowest g + w·h: weighted A*,
+    restricted to the states cheap enough. The first path found costs at most `weight` times the
+    optimal one, for any choice inside FOCAL. (Choosing by h alone dives greedily, and on graphs
+    with dead ends reopens most states many times over.) The search then goes on (keeping
+    the path as an incumbent and pruning states that cannot beat it) until the path is proven
+    optimal.
+
+    OPEN and FOCAL are two binary heaps (by f, and by g + w·h) with lazy deletion: an entry is valid
+    while its state is open with the same f. The states of OPEN above the focal bound wait in a
+    third heap (by f) and move into FOCAL as the lowest f grows.
+
+    Args:
+        problem (Problems): The problem to solve (see `a_star_search`).
+        weight (float): The suboptimality bound of the focal list, at least 1.
+        max_time (float): The deadline in seconds, or None to run to the end.
+        first_only (bool): Stop at the first path.
+
+    Returns:
+        AnytimeResult: The best path found and its bound.
+    """
+    result = AnytimeResult(max_time)
+    heuristics = problem.heuristics
+    num_nodes = problem.graph.num_nodes
+    store = NodeStore(num_nodes)
+    path_costs, store_heuristics = store.path_costs, store.heuristics
+    is_open = bytearray(num_nodes)
+    open_heap = []  # (f, state): the open states by f.
+    focal_heap = []  # (g + w·h, f, state): the focal states by weighted f.
+    waiting = []  # (f, state): the open states not in FOCAL yet, by f.
+    focal_bound = 0
+    budget = problem.budget
+    expanding = None  # The state whose children are being generated.
+
+    def valid(f, s):
+        # Whether a heap entry is the current one of an open state.
+        return is_open[s] and f == path_costs[s] + store_heuristics[s]
+
+    def insert(s):
+        # Open a state, in FOCAL if its f is within the focal bound.
+        f = path_costs[s] + store_heuristics[s]
+        is_open[s] = 1
+        heapq.heappush(open_heap, (f, s))
+        if f <= focal_bound:
+            heapq.heappush(focal_heap, (path_costs[s] + weight * store_heuristics[s], f, s))
+        else:
+            heapq.heappush(waiting, (f, s))
+        if budget is not None:
+            budget.record_push(len(open_heap), s, f)
+
+    store.add(problem.initial, parent=-1, path_cost=0, heuristic=heuristics[problem.initial])
+    insert(problem.initial)
+
+    def lowest_f():
+        # The lowest f of the open states (dropping outdated entries), or infinity.
+        while open_heap and not valid(*open_heap[0]):
+            heapq.heappop(open_heap)
+        return open_heap[0][0] if open_heap else math.inf
+
+    try:
+        while True:
+            f_min = lowest_f()
+            if f_min >= result.cost:
+                break  # Nothing open can beat the incumbent (or nothing is open).
+            result.check_deadline()
+
+            # Admit the waiting states within the focal bound.
+            focal_bound = weight * f_min
+            while waiting and waiting[0][0] <= focal_bound:
+                f, s = heapq.heappop(waiting)
+                if valid(f, s):
+                    heapq.heappush(focal_heap, (path_costs[s] + weight * store_heuristics[s], f, s))
+
+            # Pick the best focal state (sending back the ones above a lowered bound).
+            while True:
+                _, f, s = heapq.heappop(focal_heap)
+                if not valid(f, s):
+                    continue
+                if f > focal_bound:
+                    heapq.heappush(waiting, (f, s))
+                    continue
+                break
+            is_open[s] = 0
+            if budget is not None:
+                budget.record_pop(s, f)
+
+            if problem.is_goal(s):
+                result.improve(reconstruct_path(s, store=store), path_costs[s], lowest_f(), weight)
+                if first_only:
+                    return result
+                continue
+
+            expanding = s  # Open until all its children are generated.
+            for s_prime, cost in problem.successors(s):
+                path_cost = path_costs[s] + cost
+                if s_prime not in store or path_cost < path_costs[s_prime]:
+                    h = heuristics[s_prime]
+                    if path_cost + h >= result.cost:
+                        continue  # Pruned by the incumbent.
+                    store.add(s_prime, parent=s, path_cost=path_cost, heuristic=h)
+                    insert(s_prime)  # Its older entries are no longer valid.
+                elif budget is not None:
+                    budget.record_duplicate(s_prime)
+            expanding = None
+        result.finish()
+    except BudgetExceeded as e:
+        result.stopped = e.reason
+        lower_bound = lowest_f()
+        if expanding is not None:  # Cut off mid-expansion.
+            lower_bound = min(lower_bound, path_costs[expanding] + store_heuristics[expanding])
+        result.tighten(lower_bound, weight)
+    return result
+
+
+def weighted_a_star_search(problem):
+    """
+    Weighted A* with ε = 1.5: the first path of `anytime_weighted_a_star`, at most 1.5 times the optimal cost.
+
+    Args:
+        problem (Problems): The problem to solve.
+
+    Returns:
+        list or None: The path from the initial state to the goal state if a path is found, otherwise None.
+    """
+    return _best_path(anytime_weighted_a_star(problem, epsilon=1.5, first_only=True))
+
+
+def anytime_weighted_a_star_search(problem):
+    """
+    AWA* with ε = 3, run until the path is proven optimal or problem.budget runs out; the best path so far is then
+    returned instead of failing.
+
+    Args:
+        problem (Problems): The problem to solve.
+
+    Returns:
+        list or None: The path from the initial state to the goal state if a path is found, otherwise None.
+    """
+    return _best_path(anytime_weighted_a_star(problem))
+
+
+def ara_star_search(problem):
+    """
+    ARA* from ε = 3 down to 1, run until the path is proven optimal or problem.budget runs out; the best path so
+    far is then returned instead of failing.
+
+    Args:
+        problem (Problems): The problem to solve.
+
+    Returns:
+        list or None: The path from the initial state to the goal state if a path is found, otherwise None.
+    """
+    return _best_path(ara_star(problem))
+
+
+def focal_search(problem):
+    """
+    Focal search with weight 1.5: the first path of `anytime_focal_search`, at most 1.5 times the optimal cost.
+
+    Args:
+        problem (Problems): The problem to solve.
+
+    Returns:
+        list or None: The path from the initial state to the goal state if a path is found, otherwise None.
+    """
+    return _best_path(anytime_focal_search(problem, weight=1.5, first_only=True))
@@ -1,6 +1,8 @@
-from common.node import Node
-from common.utils import expand, reconstruct_path
+from collections import deque
+from common.node import Node, NodeStore
+from common.utils import reconstruct_path
 from common.frontier import QueueFrontier
+from common.vectorized import expand_batch, store_arrays
 
 
 # Breath - First Search (BFS) --> first visited - first explored
@@ -15,12 +17,12 @@ from common.frontier import QueueFrontier
 #     reached ← set containing problem.initial
 #     while not frontier.empty() do
 #         node ← frontier.remove()
-#         for each child in EXPAND(problem, node) do
-#             if problem.IS-GOAL(child.STATE) then
-#                 return RECONSTRUCT-PATH(child)
-#             if child.STATE not in reached and not frontier.contains_state(child.STATE) then
-#                 add child.STATE to reached
-#                 frontier.add(child)
+#         for each (s, cost) in problem.SUCCESSORS(node.STATE) do
+#             if problem.IS-GOAL(s) then
+#                 return RECONSTRUCT-PATH(NODE(STATE=s, PARENT=node))
+#             if s not in reached and not frontier.contains_state(s) then
+#                 add s to reached
+#                 frontier.add(NODE(STATE=s, PARENT=node, PATH_COST=node.PATH_COST + cost))  // only surviving children become nodes
 #     return failure
 
 
@@ -41,30 +43,109 @@ def bfs(problem):
         return reconstruct_path(node)
 
     # Initialize the frontier using a queue and add the initial node
-    frontier = QueueFrontier()
+    frontier = QueueFrontier(budget=problem.budget)
     frontier.add(node)
 
     # Initialize the reached set with the initial state
     reached = {problem.initial}
+    budget = problem.budget
 
     # Continue searching while there are nodes to explore
     while not frontier.empty():
         # Remove a node from the frontier (FIFO)
         node = frontier.remove()
 
-        # Expand the node to generate its children
-        for child in expand(problem=problem, node=node):
-            s = child.state
-
+        # Generate the successor states of the node
+        for s, cost in problem.successors(node.state):
             # If the child state is the goal state, return the reconstructed path
             if problem.is_goal(s):
-                return reconstruct_path(child)
+                return reconstruct_path(Node(state=s, parent=node, action=s))
 
             # If the child state has not been reached and is not in the frontier
             if s not in reached and not frontier.contains_state(s):
                 # Add the child state to the reached set
                 reached.add(s)
-                # Add the child node to the frontier
-                frontier.add(child)
+                # Create a node only for a child that is kept, and add it to the frontier
+                frontier.add(
+                    Node(
+                        state=s,
+                        parent=node,
+                        action=s,
+                        path_cost=node.path_cost + cost,
+                    )
+                )
+            elif budget is not None:
+                # Count the child pruned as a duplicate.
+                budget.record_duplicate(s)
+    # Return None if no solution is found
+    return None
+
+
+# Pseudo code for the vectorised variant
+
+# function BFS_VECTORIZED(problem) returns a solution path or failure
+#     store ← NodeStore(problem.graph.num_nodes), reached ← the reached flags of store as a boolean array
+#     if problem.IS-GOAL(problem.initial) then
+#         return [problem.initial]
+#     frontier ← a queue containing problem.initial
+#     while frontier is not empty do
+#         s ← POP-LEFT(frontier)
+#         neighbors, _, _ ← EXPAND-BATCH(problem, s, informed=false)
+#         if problem.goal in neighbors then
+#             store.add(problem.goal, parent=s)
+#             return RECONSTRUCT-PATH(problem.goal, store)
+#         new ← neighbors[not reached[neighbors]]  // one boolean mask instead of one test per child
+#         reached[new] ← true, parents[new] ← s
+#         append new to frontier
+#     return failure
+
+
+def bfs_vectorized(problem):
+    """Breadth-First Search Algorithm with batched expansion
+
+    Returns the same path as `bfs`, but expands each state with `expand_batch`: the children come
+    back as one NumPy array and the unreached ones are selected with a single boolean mask, so the
+    per-child work is done in NumPy instead of in Python. This pays off on graphs with a high
+    average degree.
+
+    Args:
+        problem (Problem): The problem to solve. Its graph must be a `CSRGraph`.
+
+    Returns:
+        list or None: The path from the initial state to the goal state, or None if no path is found.
+    """
+    # Keep the parent of every reached state in a node store, viewed as NumPy arrays.
+    store = NodeStore(problem.graph.num_nodes)
+    store.add(problem.initial)
+    reached, parents, _, _ = store_arrays(store)
+
+    # Check if the initial state is the goal state
+    if problem.is_goal(problem.initial):
+        return reconstruct_path(problem.initial, store=store)
+
+    # Initialize the frontier using a queue of states
+    frontier = deque([problem.initial])
+
+    # Continue searching while there are states to explore
+    while frontier:
+        # Remove a state from the frontier (FIFO)
+        s = frontier.popleft()
+
+        # Generate all children of the state at once
+        neighbors, _, _ = expand_batch(problem, s, informed=False)
+
+        # If the goal is one of the children, return the reconstructed path (goal test on generation)
+        if (neighbors == problem.goal).any():
+            store.add(problem.goal, parent=s)
+            return reconstruct_path(problem.goal, store=store)
+
+        # Keep only the children that have not been reached, mark them and add them to the frontier
+        new = neighbors[~reached[neighbors]]
+        reached[new] = True
+        parents[new] = s
+        frontier.extend(new.tolist())
+        if problem.budget is not None:
+            problem.budget.check_frontier(len(frontier))
+
     # Return None if no solution is found
     return None
@@ -0,0 +1,218 @@
+import math
+from collections import deque
+from common.node import NodeStore
+from common.frontier import IndexedPriorityQueue
+
+# Bidirectional search --> one search forward from the initial state, one backward from the goal,
+# stopping when they meet. The backward search follows `problem.predecessors`, i.e. the reverse
+# graph, which is built once per problem.
+
+
+def _join(forward, backward, meeting):
+    # Join the forward path to `u` with the backward path from `v`, for a meeting edge u → v.
+    u, v = meeting
+    return forward.path(u) + backward.path(v)[::-1]
+
+
+# Pseudo code
+
+# function BIDIRECTIONAL_BFS(problem) returns a solution path or failure
+#     if problem.IS-GOAL(problem.initial) then
+#         return [problem.initial]
+#     forward, backward ← NodeStore with problem.initial, NodeStore with problem.goal  // depth as PATH_COST
+#     forward_frontier, backward_frontier ← queue [problem.initial], queue [problem.goal]
+#     while both frontiers are not empty do
+#         if |forward_frontier| ≤ |backward_frontier| then
+#             meeting ← EXPAND-LAYER(problem.SUCCESSORS, forward_frontier, forward, backward)
+#         else
+#             meeting ← EXPAND-LAYER(problem.PREDECESSORS, backward_frontier, backward, forward)
+#         if meeting is not failure then
+#             return forward.PATH(u) + REVERSE(backward.PATH(v)) for the meeting edge u → v
+#     return failure
+
+# function EXPAND-LAYER(neighbors_of, frontier, store, other) returns the shortest meeting edge or failure
+#     for each s in the current layer of frontier do
+#         for each (s_prime, _) in neighbors_of(s) do
+#             if s_prime in other then
+#                 keep (s, s_prime) if store.DEPTH(s) + 1 + other.DEPTH(s_prime) is the shortest so far
+#             if s_prime not in store then
+#                 store.ADD(s_prime, parent=s, depth=store.DEPTH(s) + 1)
+#                 append s_prime to frontier
+#     return the shortest meeting edge  // the whole layer is expanded, so it is the shortest path overall
+
+
+def _expand_layer(neighbors_of, frontier, store, other, backwards=False, budget=None):
+    # Expand one whole BFS layer of one side and return the shortest meeting edge found, or None.
+    # Meeting edges are always returned forward (u → v), also when this side searches backwards.
+    depths = store.path_costs
+    other_depths = other.path_costs
+    best, best_length = None, math.inf
+    for _ in range(len(frontier)):
+        s = frontier.popleft()
+        depth = depths[s] + 1
+        for s_prime, _ in neighbors_of(s):
+            # The other side has reached this child: the two searches meet on the edge s - s_prime.
+            if s_prime in other and depth + other_depths[s_prime] < best_length:
+                best = (s_prime, s) if backwards else (s, s_prime)
+                best_length = depth + other_depths[s_prime]
+            if s_prime not in store:
+                store.add(s_prime, parent=s, path_cost=depth)
+                frontier.append(s_prime)
+            elif budget is not None:
+                budget.record_duplicate(s_prime)
+    return best
+
+
+def bidirectional_bfs(problem):
+    """Bidirectional Breadth-First Search
+
+    Runs a BFS forward from the initial state and one backward from the goal, one whole layer at
+    a time, always growing the smaller frontier. It returns a path with the fewest edges, like
+    `bfs`, but each side only has to reach about half the depth, which on graphs with a branching
+    factor b means about b^(d/2) instead of b^d expansions.
+
+    Args:
+        problem (Problem): The problem to solve, which includes the initial state, goal state, and state transitions.
+
+    Returns:
+        list or None: The path from the initial state to the goal state, or None if no path is found.
+    """
+    # Check if the initial state is the goal state
+    if problem.is_goal(problem.initial):
+        return [problem.initial]
+
+    # Keep the parent and the depth of every state reached by each side.
+    num_nodes = problem.graph.num_nodes
+    forward = NodeStore(num_nodes)
+    forward.add(problem.initial)
+    backward = NodeStore(num_nodes)
+    backward.add(problem.goal)
+
+    # Initialize one queue of states per side
+    forward_frontier = deque([problem.initial])
+    backward_frontier = deque([problem.goal])
+
+    # Continue while both sides can still grow; once one side is exhausted there is no path.
+    while forward_frontier and backward_frontier:
+        # Expand the next layer of the smaller side.
+        if len(forward_frontier) <= len(backward_frontier):
+            meeting = _expand_layer(
+                problem.successors, forward_frontier, forward, backward, budget=problem.budget
+            )
+        else:
+            meeting = _expand_layer(
+                problem.predecessors,
+                backward_frontier,
+                backward,
+                forward,
+                backwards=True,
+                budget=problem.budget,
+            )
+
+        if problem.budget is not None:
+            problem.budget.check_frontier(len(forward_frontier) + len(backward_frontier))
+
+        # The two searches met: join the two halves at the meeting edge.
+        if meeting is not None:
+            return _join(forward, backward, meeting)
+
+    # Return None if no solution is found
+    return None
+
+
+# Pseudo code
+
+# function BIDIRECTIONAL_UCS(problem) returns a solution path or failure
+#     if problem.IS-GOAL(problem.initial) then
+#         return [problem.initial]
+#     forward, backward ← NodeStore with problem.initial, NodeStore with problem.goal
+#     forward_frontier, backward_frontier ← indexed priority queues ordered by PATH_COST
+#     best ← ∞, meeting ← failure  // the cheapest complete path seen so far
+#     while both frontiers are not empty do
+#         if TOP(forward_frontier) + TOP(backward_frontier) ≥ best then
+#             break  // no path through unexpanded states can be cheaper than best
+#         expand the side with the lower TOP like UCS, and for each relaxed edge s → s_prime do
+#             if s_prime in the other store then
+#                 best, meeting ← MIN(best, store.PATH_COST(s) + cost + other.PATH_COST(s_prime)), (s, s_prime)
+#     if meeting is failure then return failure
+#     return forward.PATH(u) + REVERSE(backward.PATH(v)) for the meeting edge u → v
+
+
+def _expand_cheapest(neighbors_of, frontier, store, other, best, backwards=False):
+    # Expand the cheapest state of one side and return the cheapest (cost, meeting edge) seen, or `best`.
+    # Meeting edges are always returned forward (u → v), also when this side searches backwards.
+    _, s = frontier.pop()
+    path_costs = store.path_costs
+    budget = frontier.budget
+    for s_prime, cost in neighbors_of(s):
+        path_cost = path_costs[s] + cost
+        if s_prime not in store or path_cost < path_costs[s_prime]:
+            store.add(s_prime, parent=s, path_cost=path_cost)
+            if frontier.contains(s_prime):
+                frontier.decrease_key(s_prime, path_cost, s_prime)
+            else:
+                frontier.push(s_prime, path_cost, s_prime)
+        elif budget is not None:
+            budget.record_duplicate(s_prime)
+        # The other side has reached this child: this edge completes a path.
+        if s_prime in other and path_cost + other.path_costs[s_prime] < best[0]:
+            meeting = (s_prime, s) if backwards else (s, s_prime)
+            best = (path_cost + other.path_costs[s_prime], meeting)
+    return best
+
+
+def bidirectional_ucs(problem):
+    """Bidirectional Uniform Cost Search
+
+    Runs a UCS forward from the initial state and one backward from the goal, always expanding
+    the side whose cheapest frontier entry is lower. Every edge that links the two searches is a
+    candidate path. The search stops once the two cheapest frontier entries together cost at
+    least as much as the best candidate, since any cheaper path would have to pass through a state
+    on both frontiers. The first meeting is not enough on weighted graphs; this rule makes the
+    result as cheap as the one of `ucs`.
+
+    Args:
+        problem (Problems): The problem instance which includes the initial state, goal state, adjacency_matrix, and heuristics
+
+    Returns:
+        list: A list representing the path from the initial state to the goal state if a path is found, otherwise None.
+    """
+    if problem.is_goal(problem.initial):
+        return [problem.initial]
+
+    # Keep the parent and the best path cost of every state reached by each side.
+    num_nodes = problem.graph.num_nodes
+    forward = NodeStore(num_nodes)
+    forward.add(problem.initial, parent=-1, path_cost=0)
+    backward = NodeStore(num_nodes)
+    backward.add(problem.goal, parent=-1, path_cost=0)
+
+    # One priority queue ordered by path cost per side.
+    forward_frontier = IndexedPriorityQueue(budget=problem.budget)
+    forward_frontier.push(problem.initial, 0, problem.initial)
+    backward_frontier = IndexedPriorityQueue(budget=problem.budget)
+    backward_frontier.push(problem.goal, 0, problem.goal)
+
+    # The cost of the cheapest complete path found so far, and its meeting edge (forward side first).
+    best = (math.inf, None)
+
+    while not forward_frontier.empty() and not backward_frontier.empty():
+        forward_top, _ = forward_frontier.peek()
+        backward_top, _ = backward_frontier.peek()
+        # Stop when no path through the unexpanded states can beat the best one.
+        if forward_top + backward_top >= best[0]:
+            break
+
+        if forward_top <= backward_top:
+            best = _expand_cheapest(
+                problem.successors, forward_frontier, forward, backward, best
+            )
+        else:
+            best = _expand_cheapest(
+                problem.predecessors, backward_frontier, backward, forward, best, backwards=True
+            )
+
+    # Join the two halves at the meeting edge of the cheapest path.
+    if best[1] is None:
+        return None
+    return _join(forward, backward, best[1])
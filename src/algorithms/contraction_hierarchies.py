@@ -0,0 +1,137 @@
+import math
+from common.contraction import ContractionHierarchy
+from common.node import NodeStore
+from common.frontier import IndexedPriorityQueue
+from common.utils import reconstruct_path
+
+# Contraction Hierarchies query
+# Pseudo code
+
+# function PREPARE_HIERARCHY(problem) returns ContractionHierarchy
+#     if problem.HIERARCHY is missing or older than problem.graph then
+#         problem.HIERARCHY ← BUILD_HIERARCHY(problem)  // charges problem.budget once per contracted state
+#     return problem.HIERARCHY
+
+# function CH_SEARCH(problem) returns a solution path or failure
+#     hierarchy ← PREPARE_HIERARCHY(problem)
+#     forward, backward ← NodeStore with problem.initial, NodeStore with problem.goal
+#     forward_frontier, backward_frontier ← indexed priority queues ordered by PATH_COST
+#     best ← ∞, meeting ← failure
+#     while some frontier has a TOP < best do
+#         s ← POP(the frontier with the lower TOP)  // only edges to higher-ranked states
+#         if s in the other store then
+#             best, meeting ← MIN(best, store.PATH_COST(s) + other.PATH_COST(s)), s
+#         relax every upward edge of s (hierarchy.UP forward, hierarchy.DOWN backward) like UCS
+#     if meeting is failure then return failure
+#     graft the backward path from meeting to problem.goal onto forward
+#     return RECONSTRUCT_PATH(problem.goal, forward, shortcuts=hierarchy)  // shortcuts unpacked
+
+
+def _settle_upward(graph, frontier, store, other, best):
+    # Settle the cheapest state of one side, relax its upward edges, and return the cheapest
+    # (cost, meeting state) seen, or `best`.
+    path_cost, s = frontier.pop()
+    # Both sides have reached s: their paths join into a complete one.
+    if s in other and path_cost + other.path_costs[s] < best[0]:
+        best = (path_cost + other.path_costs[s], s)
+    path_costs = store.path_costs
+    budget = frontier.budget
+    for s_prime, cost in zip(graph.neighbors(s), graph.edge_weights(s)):
+        new_cost = path_cost + cost
+        if s_prime not in store or new_cost < path_costs[s_prime]:
+            store.add(s_prime, parent=s, path_cost=new_cost)
+            if frontier.contains(s_prime):
+                frontier.decrease_key(s_prime, new_cost, s_prime)
+            else:
+                frontier.push(s_prime, new_cost, s_prime)
+        elif budget is not None:
+            budget.record_duplicate(s_prime)
+    return best
+
+
+def prepare_hierarchy(problem):
+    """
+    Returns the contraction hierarchy of the problem's graph, building it first if the problem has
+    none or the graph changed since (see `ContractionHierarchy.build`).
+
+    The build charges `problem.budget` like a search, so it honours the same limits. Run it on a
+    problem before timing `ch_search` to measure the preprocessing and the queries separately.
+
+    Args:
+        problem (Problems): The problem whose graph is preprocessed.
+
+    Returns:
+        ContractionHierarchy: The hierarchy, also set on the problem with `use_hierarchy`.
+    """
+    hierarchy = problem.hierarchy
+    if hierarchy is None or hierarchy.version != problem.graph.version:
+        hierarchy = ContractionHierarchy.build(problem)
+        problem.use_hierarchy(hierarchy)
+    return hierarchy
+
+
+def ch_search(problem):
+    """Contraction Hierarchies (CH) query
+
+    A bidirectional Dijkstra on the contraction hierarchy of the graph: the forward search from
+    the initial state and the backward search from the goal both follow only edges to states of
+    higher rank. Both searches stay small (a few hundred states on road-like graphs, whatever the
+    distance), and the cheapest path through a state settled by both is a shortest path of the
+    augmented graph. Its shortcuts are unpacked into original edges, so the path is as cheap as
+    the one of `ucs`.
+
+    The hierarchy is built on first use (see `prepare_hierarchy`) and kept on the problem, so the
+    preprocessing is paid once per graph; `Problems.use_hierarchy` sets a saved one instead.
+
+    Args:
+        problem (Problems): The problem instance which includes the initial state, goal state, adjacency_matrix, and heuristics
+
+    Returns:
+        list: A list representing the path from the initial state to the goal state if a path is found, otherwise None.
+    """
+    hierarchy = prepare_hierarchy(problem)
+    if problem.is_goal(problem.initial):
+        return [problem.initial]
+
+    # Keep the parent and the best path cost of every state reached by each side.
+    num_nodes = problem.graph.num_nodes
+    forward = NodeStore(num_nodes)
+    forward.add(problem.initial, parent=-1, path_cost=0)
+    backward = NodeStore(num_nodes)
+    backward.add(problem.goal, parent=-1, path_cost=0)
+
+    # One priority queue ordered by path cost per side.
+    forward_frontier = IndexedPriorityQueue(budget=problem.budget)
+    forward_frontier.push(problem.initial, 0, problem.initial)
+    backward_frontier = IndexedPriorityQueue(budget=problem.budget)
+    backward_frontier.push(problem.goal, 0, problem.goal)
+
+    # The cost of the cheapest complete path found so far, and the state where its halves meet.
+    best = (math.inf, None)
+    budget = problem.budget
+
+    while True:
+        forward_top = forward_frontier.peek()[0] if not forward_frontier.empty() else math.inf
+        backward_top = backward_frontier.peek()[0] if not backward_frontier.empty() else math.inf
+        # Each side stops once its cheapest state cannot lead to a better path.
+        if min(forward_top, backward_top) >= best[0]:
+            break
+
+        if forward_top <= backward_top:
+            graph, frontier, store, other = hierarchy.up, forward_frontier, forward, backward
+        else:
+            graph, frontier, store, other = hierarchy.down, backward_frontier, backward, forward
+        if budget is not None:
+            s = frontier.peek()[1]
+            budget.charge_expansion(graph.degree(s), s)
+        best = _settle_upward(graph, frontier, store, other, best)
+
+    if best[1] is None:
+        return None
+    # Graft the backward half (meeting state → goal) onto the forward tree, then unpack the path.
+    s = best[1]
+    while s != problem.goal:
+        s_prime = backward.parents[s]
+        forward.parents[s_prime] = s
+        s = s_prime
+    return reconstruct_path(problem.goal, forward, shortcuts=hierarchy)
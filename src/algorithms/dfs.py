@@ -6,36 +6,79 @@ from common.frontier import StackFrontier
 # Tree - search Depth - first search (DFS) --> last visited - first explored
 # Pseudo code
 
-# function DFS(problem) returns a solution path or failure
+# function DFS(problem, mode) returns a solution path or failure
+#     if mode = "path" then
+#         return ON-PATH-DFS(problem)
 #     node ← Node(state=problem.initial)
 #     if problem.is_goal(node.state) then
 #         return reconstruct_path(node)
+#     visited ← a bitmap of problem.graph.num_nodes bits, packed 8 per byte, with problem.initial set  // mode "graph" only
 #     frontier ← StackFrontier()
 #     frontier.add(node)
 #     while not frontier.empty() do
 #         node ← frontier.remove()
-#         for each child in expand(problem, node) do
+#         for each child in expand(problem, node, informed=false) do  // DFS never reads the heuristics
 #             if problem.is_goal(child.state) then
 #                 return reconstruct_path(child)
+#             if mode = "graph" then
+#                 if bit child.state of visited is set then continue  // reached before: prune
+#                 set bit child.state of visited  // byte state >> 3, mask 1 << (state & 7)
 #             frontier.add(child)
 #     return failure
 
+# function ON-PATH-DFS(problem) returns a solution path or failure
+#     path ← [problem.initial], children ← [the reversed successors of problem.initial]
+#     check the successors of problem.initial for the goal
+#     while path is not empty do
+#         if the last of children has a next s_prime not in path then
+#             append s_prime to path
+#             if a successor of s_prime is the goal then
+#                 return path + [goal]
+#             append the reversed successors of s_prime to children
+#         else
+#             remove the last state of path and its children  // backtrack
+#     return failure
+
+
+# The DFS modes: tree search, graph search with a visited bitmap, or tree search that only skips
+# states on the current path.
+DFS_MODES = ("tree", "graph", "path")
+
 
-def dfs(problem):
+def dfs(problem, mode="tree"):
     """Depth-First Search Algorithm (Tree Search)
 
     This function implements the Depth-First Search (DFS) algorithm for tree search. DFS explores the deepest nodes first before backtracking to shallower nodes. It does not keep track of visited states, which is suitable for tree structures.
 
+    Two opt-in modes avoid the endless revisits of tree search on graphs with cycles:
+
+    - `"graph"`: graph search. A bitmap of one bit per state records the states already
+      generated, and a child that was reached before is pruned, so every state enters the stack
+      at most once and the stack holds at most one node per state.
+    - `"path"`: only children that are on the current path are pruned (cycles), and the search
+      keeps an explicit stack of the current path and of the untried children of each state on it
+      instead of a frontier of every generated node. Memory is O(depth) states for tree-like
+      graphs, but states reachable by several paths may be searched once per path.
+
+    In every mode the goal test is done when a child is generated, and children are tried in the
+    same order, so on a tree the three modes return the same path.
+
     Args:
         problem (Problem): The problem to solve. The problem must provide:
             - `initial`: The initial state of the problem.
             - `is_goal(state)`: A method to check if a given state is the goal state.
             - `expand(node)`: A method to generate the child nodes from a given node.
+        mode (str): One of `DFS_MODES`: "tree" (the default), "graph" or "path".
 
     Returns:
         list or None: The path from the initial state to the goal state if a path is found. The path is
         represented as a list of states. If no path is found, the function returns None.
     """
+    if mode not in DFS_MODES:
+        raise ValueError(f"unknown DFS mode {mode!r}")
+    if mode == "path":
+        return _on_path_dfs(problem)
+
     # Create the root node with the initial state.
     node = Node(state=problem.initial)
 
@@ -43,8 +86,15 @@ def dfs(problem):
     if problem.is_goal(node.state):
         return reconstruct_path(node)
 
+    # In graph search, flag every state generated so far (one bit per state, 8 per byte).
+    visited = None
+    if mode == "graph":
+        visited = bytearray((problem.graph.num_nodes + 7) >> 3)
+        visited[problem.initial >> 3] |= 1 << (problem.initial & 7)
+    budget = problem.budget
+
     # Initialize the frontier with the root node. Use a stack (LIFO) to implement DFS.
-    frontier = StackFrontier()
+    frontier = StackFrontier(budget=problem.budget)
     frontier.add(node)
 
     # Continue exploring until there are no more nodes to explore in the frontier.
@@ -53,15 +103,96 @@ def dfs(problem):
         node = frontier.remove()
 
         # Expand the current node to generate its children.
-        for child in expand(problem=problem, node=node):
+        for child in expand(problem=problem, node=node, informed=False):
             s = child.state
 
             # Check if the child state is the goal state.
             if problem.is_goal(s):
                 return reconstruct_path(child)
 
+            # In graph search, prune a child whose state was already generated.
+            if visited is not None:
+                mask = 1 << (s & 7)
+                if visited[s >> 3] & mask:
+                    if budget is not None:
+                        budget.record_duplicate(s)
+                    continue
+                visited[s >> 3] |= mask
+
             # Add the child node to the frontier.
             frontier.add(child)
 
     # Return None if no path is found to the goal state.
     return None
+
+
+def _on_path_dfs(problem):
+    # DFS over an explicit stack of the current path, pruning only the children already on it.
+    if problem.is_goal(problem.initial):
+        return [problem.initial]
+    budget = problem.budget
+    path = []  # The states of the current path.
+    children = []  # The untried children of each state on the path, last to first (the order of the tree search).
+    on_path = set()  # The states of the current path, for O(1) cycle checks in O(depth) memory.
+
+    def push(s):
+        # Put a state on the path and generate its children; return the goal if it is one of them, else None.
+        path.append(s)
+        on_path.add(s)
+        if budget is not None:
+            budget.record_push(len(path), s)
+        successors = [s_prime for s_prime, _ in problem.successors(s)]
+        for s_prime in successors:
+            if problem.is_goal(s_prime):
+                return s_prime
+        children.append(reversed(successors))
+        return None
+
+    goal = push(problem.initial)
+    while goal is None and path:
+        # Try the next child of the deepest state that is not on the path.
+        for s_prime in children[-1]:
+            if s_prime in on_path:
+                if budget is not None:
+                    budget.record_duplicate(s_prime)
+                continue
+            goal = push(s_prime)
+            break
+        else:
+            # Every child has been tried: backtrack.
+            on_path.discard(path.pop())
+            children.pop()
+            if budget is not None:
+                budget.record_pop()
+
+    # The goal was generated as a child of the last state of the path.
+    if goal is None:
+        return None
+    path.append(goal)
+    return path
+
+
+def dfs_graph(problem):
+    """
+    Graph-search DFS: `dfs` in mode "graph", with a visited bitmap.
+
+    Args:
+        problem (Problem): The problem to solve.
+
+    Returns:
+        list or None: The path from the initial state to the goal state, or None if no path is found.
+    """
+    return dfs(problem, mode="graph")
+
+
+def dfs_on_path(problem):
+    """
+    DFS that only prunes cycles on the current path: `dfs` in mode "path".
+
+    Args:
+        problem (Problem): The problem to solve.
+
+    Returns:
+        list or None: The path from the initial state to the goal state, or None if no path is found.
+    """
+    return dfs(problem, mode="path")
@@ -1,27 +1,31 @@
-from common.node import Node
-from common.utils import expand, reconstruct_path
+from common.node import NodeStore
+from common.utils import reconstruct_path
+from common.frontier import IndexedPriorityQueue
 from common.problem import Problems
-import heapq
 
 
 # Greedy Best First Search (GBFS)
 # Pseudo - code
 
 # function GREEDY-BEST-FIRST-SEARCH(problem) returns a solution path or failure
-#     node ← Node(state=problem.initial, parent=None, action=None, path_cost=0, heuristic=problem.heuristics[problem.initial])
-#     frontier ← a priority queue ordered by heuristic, with node as an element
-#     reached ← a dictionary with key problem.initial and value node
+#     store ← NodeStore(problem.graph.num_nodes)
+#     store.add(problem.initial, parent=-1, path_cost=0, heuristic=problem.heuristics[problem.initial])
+#     frontier ← an indexed priority queue ordered by heuristic, with one entry per state
 
 #     while frontier is not empty do
-#         _, current_node ← POP(frontier)
+#         _, s ← POP(frontier)
 
-#         if problem.is_goal(current_node.state) then
-#             return RECONSTRUCT-PATH(current_node)
+#         if problem.is_goal(s) then
+#             return RECONSTRUCT-PATH(s, store)
 
-#         for each child in EXPAND(problem, current_node) do
-#             if child.state not in reached or child.heuristic < reached[child.state].heuristic then
-#                 reached[child.state] ← child
-#                 ADD (child.heuristic, child) to frontier
+#         for each (s_prime, cost) in problem.successors(s) do
+#             heuristic ← problem.heuristics[s_prime]
+#             if s_prime not in store or heuristic < store.heuristics[s_prime] then
+#                 store.add(s_prime, parent=s, path_cost=store.path_costs[s] + cost, heuristic=heuristic)
+#                 if frontier.CONTAINS(s_prime) then
+#                     frontier.DECREASE_KEY(s_prime, heuristic, s_prime)
+#                 else
+#                     frontier.PUSH(s_prime, heuristic, s_prime)
 
 #     return failure
 
@@ -35,40 +39,48 @@ def gbfs(problem):
     Returns:
         list: A list representing the path from the initial state to the goal state if a path is found, otherwise None.
     """
-    # Create the start node with initial state, no parent, no action, and a path cost of 0.
-    start_node = Node(
-        state=problem.initial,
-        parent=None,
-        action=None,
+    # Store the start node (no parent, a path cost of 0 and its heuristic) in a node store indexed by state.
+    store = NodeStore(problem.graph.num_nodes)
+    store.add(
+        problem.initial,
+        parent=-1,
         path_cost=0,
         heuristic=problem.heuristics[problem.initial],
     )
-    # Initialize the frontier as a priority queue ordered by heuristic, starting with the initial node.
-    frontier = [(start_node.heuristic, start_node)]
-
-    # The reached dictionary keeps track of the best heuristic to reach each state.
-    reached = {problem.initial: start_node}
+    # Initialize the frontier as a priority queue ordered by heuristic, starting with the initial state.
+    frontier = IndexedPriorityQueue(budget=problem.budget)
+    frontier.push(problem.initial, store.heuristics[problem.initial], problem.initial)
+    budget = problem.budget
 
     # Loop until the frontier is empty.
-    while frontier:
-        # Pop the node with the lowest heuristic value from the frontier.
-        _, current_node = heapq.heappop(frontier)
+    while not frontier.empty():
+        # Pop the state with the lowest heuristic value from the frontier.
+        _, s = frontier.pop()
 
-        # If the current node is the goal state, reconstruct and return the path.
-        if problem.is_goal(current_node.state):
-            return reconstruct_path(current_node)
+        # If the current state is the goal state, reconstruct and return the path.
+        if problem.is_goal(s):
+            return reconstruct_path(s, store=store)
 
-        # Expand the current node to generate its children.
-        for child in expand(problem=problem, node=current_node):
+        # Generate the successors of the current state.
+        for s_prime, cost in problem.successors(s):
+            heuristic = problem.heuristics[s_prime]
             # If the child state has not been reached yet or if the new heuristic is lower than the previously known heuristic to this state.
-            if (
-                child.state not in reached
-                or child.heuristic < reached[child.state].heuristic
-            ):
-                # Update the reached dictionary with the new lower heuristic for this state.
-                reached[child.state] = child
-                # Add the child to the frontier with its heuristic as the priority.
-                heapq.heappush(frontier, (child.heuristic, child))
+            if s_prime not in store or heuristic < store.heuristics[s_prime]:
+                # Update the store with the child node for this state.
+                store.add(
+                    s_prime,
+                    parent=s,
+                    path_cost=store.path_costs[s] + cost,
+                    heuristic=heuristic,
+                )
+                # Add the child to the frontier with its heuristic as the priority, or update its entry.
+                if frontier.contains(s_prime):
+                    frontier.decrease_key(s_prime, heuristic, s_prime)
+                else:
+                    frontier.push(s_prime, heuristic, s_prime)
+            elif budget is not None:
+                # Count the child pruned as a duplicate.
+                budget.record_duplicate(s_prime)
 
     # If the goal state is not reached and the frontier is empty, return None indicating failure.
     return None
@@ -1,3 +1,7 @@
+import heapq
+import multiprocessing
+import random
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
 from common.node import Node
 from common.problem import Problems
 from common.utils import expand, reconstruct_path
@@ -18,6 +22,8 @@ from common.utils import expand, reconstruct_path
 #     if next_node.HEURISTIC ≥ current_node.HEURISTIC then
 #         return failure  // Return None if the next node has a higher or equal heuristic value (stuck)
 #     current_node ← next_node  // Move to the next node
+# The current node is a frontier of one node (a beam of width 1, see LOCAL_BEAM_SEARCH): problem.budget
+# counts a push when the search moves to a node and a pop when it expands it.
 
 
 def hill_climbing(problem):
@@ -37,6 +43,9 @@ def hill_climbing(problem):
         heuristic=problem.heuristics[problem.initial],
     )
     current_node = start_node
+    budget = problem.budget
+    if budget is not None:
+        budget.record_push(1, start_node.state, start_node.heuristic)
 
     while True:
         # If the current node is the goal, return the path
@@ -44,6 +53,8 @@ def hill_climbing(problem):
             return reconstruct_path(current_node)
 
         # Expand the current node to find neighbors
+        if budget is not None:
+            budget.record_pop(current_node.state, current_node.heuristic)
         neighbors = list(expand(problem, current_node))
 
         # If there are no neighbors, return None (stuck)
@@ -59,3 +70,315 @@ def hill_climbing(problem):
 
         # Move to the next node
         current_node = next_node
+        if budget is not None:
+            budget.record_push(1, current_node.state, current_node.heuristic)
+
+
+# Local search variants
+# Pseudo code
+
+# function CLIMB(problem, rng, selection, max_sideways) returns a solution path or failure
+#     current_node ← NODE(STATE=problem.initial, HEURISTIC=problem.heuristics[problem.initial])
+#     sideways ← 0
+#     while true do
+#         if problem.IS_GOAL(current_node.STATE) then
+#             return RECONSTRUCT_PATH(current_node)
+#         neighbors ← the nodes of EXPAND(problem, current_node) whose state is not on the path
+#         next_node ← SELECT(neighbors, selection, rng)  // an improving neighbor, else a sideways one while sideways < max_sideways
+#         if next_node is failure then
+#             return failure  // stuck
+#         sideways ← sideways + 1 if next_node.HEURISTIC = current_node.HEURISTIC else 0
+#         current_node ← next_node
+
+# function SELECT(neighbors, selection, rng) returns a node or failure
+#     "steepest":     the neighbor with the lowest heuristic (ties broken by rng)
+#     "stochastic":   a random improving neighbor, with probability proportional to its improvement
+#     "first-choice": the first improving neighbor in random order
+#     if no neighbor improves and a sideways move is allowed, a random neighbor with the same heuristic
+
+# function RANDOM_RESTART_HILL_CLIMBING(problem, restarts, seed) returns a solution path or failure
+#     for i ← 0 to restarts - 1 do
+#         path ← CLIMB(problem, rng(seed, i), ...)  // restart 0 is the plain steepest climb
+#         if path is not failure then return path
+#     return failure
+
+# function PARALLEL_RANDOM_RESTART(problem, restarts, workers) returns a solution path or failure
+#     found ← a flag shared with every worker process, initially false
+#     submit the restarts to a pool of workers, in batches  // a worker stops its batch once found is set
+#     for each batch, as soon as it completes do
+#         if it reports a path then
+#             set found, cancel the batches not started, return the path without waiting for the others
+#     return failure
+
+# function LOCAL_BEAM_SEARCH(problem, k) returns a solution path or failure
+#     beam ← [the node of problem.initial], reached ← {problem.initial}
+#     while beam is not empty do
+#         candidates ← the children of every node in beam that are not reached (goal test on generation)
+#         reached ← reached ∪ the states of candidates
+#         beam ← the k candidates with the lowest heuristic
+#     return failure
+
+
+# The ways CLIMB picks the next node.
+SELECTIONS = ("steepest", "stochastic", "first-choice")
+
+
+def _select(neighbors, heuristic, selection, rng, sideways_allowed):
+    # Pick the next node among the neighbors of a node with the given heuristic, or None if stuck.
+    if selection == "steepest":
+        best = min(node.heuristic for node in neighbors)
+        if best > heuristic or (best == heuristic and not sideways_allowed):
+            return None
+        ties = [node for node in neighbors if node.heuristic == best]
+        return ties[0] if rng is None else rng.choice(ties)
+
+    if selection == "stochastic":
+        uphill = [node for node in neighbors if node.heuristic < heuristic]
+        if uphill:
+            # The steeper the move, the more likely it is chosen.
+            weights = [heuristic - node.heuristic for node in uphill]
+            return rng.choices(uphill, weights)[0]
+    else:  # "first-choice"
+        order = list(neighbors)
+        rng.shuffle(order)
+        for node in order:
+            if node.heuristic < heuristic:
+                return node
+
+    if sideways_allowed:
+        flat = [node for node in neighbors if node.heuristic == heuristic]
+        if flat:
+            return rng.choice(flat)
+    return None
+
+
+def climb(problem, rng=None, selection="steepest", max_sideways=0):
+    """
+    One hill-climbing run from the initial state, with a choice of how the next node is picked.
+
+    Unlike `hill_climbing`, a run can take up to `max_sideways` consecutive sideways moves (to a
+    neighbor with the same heuristic) to cross a plateau, and never moves back to a state of its
+    own path, so it always ends.
+
+    Args:
+        problem (Problems): The problem instance which includes the initial state, goal state, and other problem-specific methods.
+        rng (random.Random): The random generator of the randomised choices. Required for the "stochastic" and
+            "first-choice" selections; with "steepest", it breaks ties (None keeps the first neighbor).
+        selection (str): One of `SELECTIONS`.
+        max_sideways (int): The largest number of consecutive sideways moves.
+
+    Returns:
+        list or None: A list representing the path from the initial state to the goal state if a path is found, otherwise None.
+    """
+    if selection not in SELECTIONS:
+        raise ValueError(f"unknown selection {selection!r}")
+    if rng is None and selection != "steepest":
+        rng = random.Random(0)
+    current_node = Node(state=problem.initial, heuristic=problem.heuristics[problem.initial])
+    on_path = {problem.initial}
+    sideways = 0
+    budget = problem.budget
+    if budget is not None:
+        budget.record_push(1, current_node.state, current_node.heuristic)
+
+    while True:
+        # If the current node is the goal, return the path
+        if problem.is_goal(current_node.state):
+            return reconstruct_path(current_node)
+
+        # Expand the current node, leaving out the states already on the path
+        if budget is not None:
+            budget.record_pop(current_node.state, current_node.heuristic)
+        neighbors = [
+            child for child in expand(problem, current_node) if child.state not in on_path
+        ]
+        if not neighbors:
+            return None
+
+        # Pick the next node, or give up if stuck
+        next_node = _select(
+            neighbors, current_node.heuristic, selection, rng, sideways < max_sideways
+        )
+        if next_node is None:
+            return None
+
+        # Count the consecutive sideways moves, and move to the next node
+        sideways = sideways + 1 if next_node.heuristic == current_node.heuristic else 0
+        on_path.add(next_node.state)
+        current_node = next_node
+        if budget is not None:
+            budget.record_push(1, current_node.state, current_node.heuristic)
+
+
+def _restart_rng(seed, restart):
+    # The random generator of one restart: the same (seed, restart) pair always gives the same run,
+    # in whichever process it runs.
+    return random.Random(f"{seed}:{restart}")
+
+
+def _run_restarts(problem, first, count, selection, max_sideways, seed, found=None):
+    # Run restarts first .. first + count - 1 and return (restart, path) of the first success, or (None, None).
+    # Stops early, between two restarts, once the `found` event (if any) is set by another success.
+    for restart in range(first, first + count):
+        if found is not None and found.is_set():
+            break
+        rng = _restart_rng(seed, restart)
+        if restart == 0:
+            path = climb(problem, None, "steepest", max_sideways)
+        else:
+            path = climb(problem, rng, selection, max_sideways)
+        if path is not None:
+            return restart, path
+    return None, None
+
+
+def random_restart_hill_climbing(
+    problem, restarts=20, selection="stochastic", max_sideways=10, seed=0
+):
+    """Random-Restart Hill-Climbing
+
+    Repeats `climb` from the initial state until one run reaches the goal. The first run is the
+    plain steepest climb (with sideways moves), so this never does worse than it; every later run
+    is randomised with its own generator, derived from `seed` and the restart number, so the
+    result is reproducible.
+
+    Args:
+        problem (Problems): The problem instance which includes the initial state, goal state, and other problem-specific methods.
+        restarts (int): The largest number of runs.
+        selection (str): The selection of the randomised runs, one of `SELECTIONS`.
+        max_sideways (int): The largest number of consecutive sideways moves of a run.
+        seed (int): The random seed.
+
+    Returns:
+        list or None: A list representing the path from the initial state to the goal state if a path is found, otherwise None.
+    """
+    _, path = _run_restarts(problem, 0, restarts, selection, max_sideways, seed)
+    return path
+
+
+# The problem of the restarts run by this (worker) process, and the event set once a restart succeeded.
+_worker_problem = None
+_worker_found = None
+
+
+def _load_worker(problem, found):
+    # Initializer of the worker processes of `parallel_random_restart`: keep the problem, sent once.
+    global _worker_problem, _worker_found
+    _worker_problem = problem
+    _worker_found = found
+
+
+def _run_worker_restarts(first, count, selection, max_sideways, seed):
+    # A batch of restarts on the problem of this worker process.
+    return _run_restarts(
+        _worker_problem, first, count, selection, max_sideways, seed, _worker_found
+    )
+
+
+def parallel_random_restart(
+    problem,
+    restarts=100,
+    workers=None,
+    selection="stochastic",
+    max_sideways=10,
+    seed=0,
+    batch_size=4,
+):
+    """
+    Random-restart hill climbing with the restarts spread over a process pool.
+
+    The restarts run in batches of `batch_size`. As soon as one batch reports a success, its path
+    is returned: the batches that have not started are cancelled, and the running ones see a
+    shared event and stop before their next restart, without being waited for. Every restart runs the
+    same climb as in `random_restart_hill_climbing`, but which successful restart finishes first
+    depends on scheduling, so the path can differ from run to run when several restarts succeed.
+
+    Args:
+        problem (Problems): The problem instance which includes the initial state, goal state, and other problem-specific methods.
+        restarts (int): The largest number of runs.
+        workers (int): The number of worker processes, or None for one per CPU.
+        selection (str): The selection of the randomised runs, one of `SELECTIONS`.
+        max_sideways (int): The largest number of consecutive sideways moves of a run.
+        seed (int): The random seed.
+        batch_size (int): The number of restarts per job.
+
+    Returns:
+        list or None: A list representing the path from the initial state to the goal state if a path is found, otherwise None.
+    """
+    context = multiprocessing.get_context()
+    found = context.Event()
+    pool = ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=context,
+        initializer=_load_worker,
+        initargs=(problem, found),
+    )
+    try:
+        pending = {
+            pool.submit(
+                _run_worker_restarts,
+                first,
+                min(batch_size, restarts - first),
+                selection,
+                max_sideways,
+                seed,
+            )
+            for first in range(0, restarts, batch_size)
+        }
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                restart, path = future.result()
+                if path is not None:
+                    return path
+        return None
+    finally:
+        # Drop the batches that have not started, and let the running ones stop on their own.
+        found.set()
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def local_beam_search(problem, k=4, seed=0):
+    """Local Beam Search
+
+    Keeps the k best nodes instead of one: at each step, the children of all k nodes are pooled
+    and the k with the lowest heuristic (ties broken at random) form the next beam, so the beam
+    moves towards the most promising regions. A state enters the beam at most once, which rules
+    out cycles and bounds the number of steps. The goal test is done when a child is generated.
+
+    Args:
+        problem (Problems): The problem instance which includes the initial state, goal state, and other problem-specific methods.
+        k (int): The width of the beam.
+        seed (int): The random seed of the tie-breaking.
+
+    Returns:
+        list or None: A list representing the path from the initial state to the goal state if a path is found, otherwise None.
+    """
+    rng = random.Random(seed)
+    start_node = Node(state=problem.initial, heuristic=problem.heuristics[problem.initial])
+    if problem.is_goal(start_node.state):
+        return reconstruct_path(start_node)
+    beam = [start_node]
+    reached = {problem.initial}
+    budget = problem.budget
+
+    while beam:
+        # Pool the children of the whole beam that were never reached.
+        candidates = []
+        for node in beam:
+            for child in expand(problem, node):
+                if problem.is_goal(child.state):
+                    return reconstruct_path(child)
+                if child.state in reached:
+                    if budget is not None:
+                        budget.record_duplicate(child.state)
+                    continue
+                reached.add(child.state)
+                candidates.append(child)
+
+        # Keep the k best of them.
+        beam = heapq.nsmallest(k, candidates, key=lambda node: (node.heuristic, rng.random()))
+        if budget is not None:
+            budget.check_frontier(len(beam))
+
+    return None
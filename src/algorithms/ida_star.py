@@ -0,0 +1,157 @@
+import math
+from algorithms.ids import DepthLimitedSearch
+
+# Iterative Deepening A* (IDA*)
+# Pseudo code
+
+# Same explicit stack as the depth-limited search of IDS, with a bound on f = g + h instead of a
+# bound on the depth, and one more buffer: path_costs[d], the path cost of states[d]. As in IDS, the
+# pushes, pops and size of the stack are reported to problem.budget, here with f as the priority.
+
+# function COST-LIMITED-SEARCH(problem, bound) returns (solution path or failure, next bound)
+#     if problem.IS-GOAL(problem.initial) then
+#         return [problem.initial], bound
+#     states[0], path_costs[0], children[0], depth ← problem.initial, 0, SUCCESSORS(problem.initial), 0
+#     next_bound ← ∞  // the smallest f above the bound, the bound of the next iteration
+#     while depth ≥ 0 do
+#         if children[depth] has a next child (s_prime, cost) not on the current path then
+#             g ← path_costs[depth] + cost
+#             f ← g + problem.heuristics[s_prime]
+#             if f > bound then
+#                 next_bound ← MIN(next_bound, f)
+#             else if problem.IS-GOAL(s_prime) then
+#                 return states[0 .. depth] + [s_prime], bound
+#             else
+#                 depth ← depth + 1  // push
+#                 states[depth], path_costs[depth], children[depth] ← s_prime, g, SUCCESSORS(s_prime)
+#         else
+#             depth ← depth - 1  // pop
+#     return failure, next_bound
+
+# function IDA_STAR(problem) returns a solution path or failure
+#     bound ← problem.heuristics[problem.initial]
+#     while true do
+#         path, bound ← COST-LIMITED-SEARCH(problem, bound)
+#         if path is not failure then return path
+#         if bound = ∞ then return failure
+
+
+class CostLimitedSearch(DepthLimitedSearch):
+    """
+    The depth-first search of one IDA* iteration: the stack of `DepthLimitedSearch` bounded by
+    f = g + h instead of by depth.
+
+    Only the current path is kept in memory, so the memory use is linear in the depth of the
+    solution, whatever the size of the graph.
+
+    Attributes:
+        path_costs: The path cost of the state at each depth of the current path.
+    """
+
+    def __init__(self, problem):
+        super().__init__(problem)
+        self.path_costs = []
+
+    def _push(self, depth, state, path_cost):
+        # Put a state on the path at a depth, growing the buffers the first time the depth is reached.
+        if depth == len(self.states):
+            self.states.append(state)
+            self.path_costs.append(path_cost)
+            self.children.append(None)
+        else:
+            self.states[depth] = state
+            self.path_costs[depth] = path_cost
+        self.on_path[state] = 1
+        self.children[depth] = iter(self.problem.successors(state))
+
+    def search(self, bound):
+        """
+        Runs one cost-limited search from the initial state.
+
+        Args:
+            bound (float): The largest f = g + h of a state that may be expanded.
+
+        Returns:
+            tuple: The path to the goal state (or None if none was found within the bound), and the bound of
+                   the next iteration: the smallest f above `bound`, or infinity if no state was cut off.
+        """
+        problem = self.problem
+        heuristics = problem.heuristics
+        if problem.is_goal(problem.initial):
+            return [problem.initial], bound
+
+        states, path_costs, children, on_path = (
+            self.states,
+            self.path_costs,
+            self.children,
+            self.on_path,
+        )
+        depth = 0
+        self._push(0, problem.initial, 0)
+        next_bound = math.inf
+        budget = problem.budget
+        if budget is not None:
+            budget.record_push(1, problem.initial, heuristics[problem.initial])
+
+        while depth >= 0:
+            for s_prime, cost in children[depth]:
+                # Skip a child that closes a cycle on the current path.
+                if on_path[s_prime]:
+                    if budget is not None:
+                        budget.record_duplicate(s_prime)
+                    continue
+                path_cost = path_costs[depth] + cost
+                f = path_cost + heuristics[s_prime]
+                # Cut off a child above the bound, and remember the smallest f that was cut off.
+                if f > bound:
+                    if f < next_bound:
+                        next_bound = f
+                    continue
+                # The bound never exceeds the optimal cost, so a goal within it is optimal.
+                if problem.is_goal(s_prime):
+                    path = states[: depth + 1]
+                    for s in path:
+                        on_path[s] = 0  # Leave the buffer clean for the next search.
+                    path.append(s_prime)
+                    return path, bound
+                # Push the child and continue with its own children.
+                depth += 1
+                self._push(depth, s_prime, path_cost)
+                if budget is not None:
+                    budget.record_push(depth + 1, s_prime, f)
+                break
+            else:
+                # Every child of this state has been tried: pop it.
+                if budget is not None:
+                    budget.record_pop(states[depth])
+                on_path[states[depth]] = 0
+                children[depth] = None
+                depth -= 1
+
+        return None, next_bound
+
+
+def ida_star(problem):
+    """Iterative Deepening A* (IDA*)
+
+    Repeats a depth-first search bounded by f = g + h, raising the bound each time to the smallest
+    f that was cut off, until the goal is found within the bound. With an admissible heuristic the
+    path is optimal, like the one of `a_star_search`, while the memory use is only linear in the
+    depth of the path. The price is that states are expanded again in every iteration, once per
+    distinct f value below the optimal cost in the worst case.
+
+    Args:
+        problem (Problems): The problem instance which includes the initial state, goal state, adjacency_matrix, and heuristics
+
+    Returns:
+        list: A list representing the path from the initial state to the goal state if a path is found, otherwise None.
+    """
+    search = CostLimitedSearch(problem)
+    bound = problem.heuristics[problem.initial]
+    # Continuously raise the bound until a solution is found or nothing was cut off.
+    while True:
+        path, bound = search.search(bound)
+        if path is not None:
+            return path
+        if bound == math.inf:
+            return None
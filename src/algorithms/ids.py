@@ -1,107 +1,204 @@
-from common.node import Node
-from common.problem import Problems
-from common.utils import expand, reconstruct_path
+from array import array
 
 # IDS (Iterative Deepening Search)
 # Pseudo - code
 
-# function DEPTH-LIMITED-SEARCH(problem, limit) returns a solution path or cutoff or failure
-#     return RECURSIVE-DLS(MAKE-NODE(problem.initial), problem, limit)
+# The depth-limited search walks the tree with an explicit stack instead of recursion, so the depth
+# is not bounded by Python's recursion limit. The stack is a set of buffers indexed by depth:
+#     states[d]   the state on the current path at depth d
+#     children[d] the iterator over the successors of states[d] not tried yet
+# and on_path[s] marks the states of the current path, so a child that closes a cycle is skipped.
+# The stack is the frontier of the search: its pushes, pops and size are reported to problem.budget.
 
-# function RECURSIVE-DLS(node, problem, limit) returns a solution path or cutoff or failure
-#     if problem.IS-GOAL(node.STATE) then
-#         return RECONSTRUCT-PATH(node)
-#     else if limit = 0 then
+# function DEPTH-LIMITED-SEARCH(problem, limit) returns a solution path or cutoff or failure
+#     if problem.IS-GOAL(problem.initial) then
+#         return [problem.initial]
+#     if limit = 0 then
 #         return cutoff
-#     else
-#         cutoff_occurred ← false
-#         for each child in EXPAND(problem, node) do
-#             result ← RECURSIVE-DLS(child, problem, limit - 1)
-#             if result = cutoff then
+#     states[0], children[0], depth ← problem.initial, SUCCESSORS(problem.initial), 0
+#     cutoff_occurred ← false
+#     while depth ≥ 0 do
+#         if children[depth] has a next child s_prime then
+#             if on_path[s_prime] or (transposition and s_prime was reached at a depth ≤ depth + 1) then
+#                 continue  // a cycle, or a state already searched with at least as much depth left
+#             if problem.IS-GOAL(s_prime) then
+#                 return states[0 .. depth] + [s_prime]
+#             if depth + 1 = limit then
 #                 cutoff_occurred ← true
-#             else if result ≠ failure then
-#                 return result
-#         if cutoff_occurred then
-#             return cutoff
+#             else
+#                 depth ← depth + 1  // push
+#                 states[depth], children[depth] ← s_prime, SUCCESSORS(s_prime)
 #         else
-#             return failure
+#             depth ← depth - 1  // pop: every child of states[depth] has been tried
+#     if cutoff_occurred then
+#         return cutoff
+#     else
+#         return failure
 
 
-def depth_limited_search(problem, limit):
+class DepthLimitedSearch:
     """
-    Depth-Limited Search (DLS)
-
-    Args:
-        problem (Problems): The problem instance which includes the initial state, goal state, and other problem-specific methods.
-        limit (int): The depth limit for the search.
-
-    Returns:
-        list: A list representing the path from the initial state to the goal state if a path is found,
-              'cutoff' if the depth limit is reached, or None if no path is found.
+    Depth-Limited Search (DLS) with an explicit stack.
+
+    The buffers are allocated once and reused by every call to `search`, so iterative deepening
+    does not allocate per iteration or per node (no `Node` objects are created). States already on
+    the current path are skipped, so cycles are never followed.
+
+    With `transposition=True`, a table also records the smallest depth at which each state was
+    reached during the current iteration, and a state reached again at the same or a greater
+    depth is skipped, since it has no more depth left than the first time. This turns the
+    exponential re-expansion of states reachable by many paths into at most one expansion per
+    state and depth, at the cost of one integer per state.
+
+    Attributes:
+        problem: The problem instance.
+        transposition: Whether the transposition table is used.
+        states: The state at each depth of the current path.
+        children: The successor iterator at each depth of the current path.
+        on_path: A flag per state, set while the state is on the current path.
+        depth_reached: The smallest depth at which each state was reached, when `transposition` is set.
     """
 
-    def recursive_dls(node, problem, limit):
+    def __init__(self, problem, transposition=False):
+        self.problem = problem
+        self.transposition = transposition
+        self.states = []
+        self.children = []
+        self.on_path = bytearray(problem.graph.num_nodes)
+        self.depth_reached = None
+
+    def search(self, limit):
         """
-        Recursive helper function for Depth-Limited Search.
+        Runs one depth-limited search from the initial state.
 
         Args:
-            node (Node): The current node in the search.
-            problem (Problems): The problem instance.
-            limit (int): The current depth limit for the search.
+            limit (int): The depth limit for the search.
 
         Returns:
-            list or str or None: A list representing the path to the goal if found,
+            list or str or None: A list representing the path from the initial state to the goal state if a path is found,
                                  'cutoff' if the depth limit is reached, or None if no path is found.
         """
-        # Check if the current node is the goal state
-        if problem.is_goal(node.state):
-            return reconstruct_path(node)
+        problem = self.problem
+        # Check if the initial state is the goal state
+        if problem.is_goal(problem.initial):
+            return [problem.initial]
         # If the depth limit is reached, return 'cutoff'
-        elif limit == 0:
+        if limit == 0:
             return "cutoff"
-        else:
-            cutoff_occurred = False
-            # Expand the current node and recurse for each child
-            for child in expand(problem=problem, node=node):
-                result = recursive_dls(child, problem, limit - 1)
-                if result == "cutoff":
+
+        # Grow the buffers to the depth limit; they are kept for deeper iterations.
+        states, children, on_path = self.states, self.children, self.on_path
+        if len(states) < limit:
+            states.extend([0] * (limit - len(states)))
+            children.extend([None] * (limit - len(children)))
+        depth_reached = None
+        if self.transposition:
+            # A fresh table per iteration: a deeper limit may reach further from the same depth.
+            depth_reached = array("q", [limit + 1]) * len(on_path)
+            depth_reached[problem.initial] = 0
+            self.depth_reached = depth_reached
+
+        # Push the initial state.
+        depth = 0
+        states[0] = problem.initial
+        on_path[problem.initial] = 1
+        children[0] = iter(problem.successors(problem.initial))
+        cutoff_occurred = False
+        budget = problem.budget
+        if budget is not None:
+            budget.record_push(1, problem.initial, 0)  # The stack is the frontier, with the depth as priority.
+
+        while depth >= 0:
+            # Try the next child of the deepest state on the path.
+            for s_prime, _ in children[depth]:
+                # Skip a child that closes a cycle on the current path.
+                if on_path[s_prime]:
+                    if budget is not None:
+                        budget.record_duplicate(s_prime)
+                    continue
+                # Skip a child already reached with at least as much depth left.
+                if depth_reached is not None:
+                    if depth_reached[s_prime] <= depth + 1:
+                        if budget is not None:
+                            budget.record_duplicate(s_prime)
+                        continue
+                    depth_reached[s_prime] = depth + 1
+                # Check if the child is the goal state, and return the current path to it.
+                if problem.is_goal(s_prime):
+                    path = states[: depth + 1]
+                    for s in path:
+                        on_path[s] = 0  # Leave the buffer clean for the next search.
+                    path.append(s_prime)
+                    return path
+                # The child is at the depth limit: record the cutoff and try its siblings.
+                if depth + 1 == limit:
                     cutoff_occurred = True
-                elif result is not None:
-                    return result
-            return "cutoff" if cutoff_occurred else None
+                    continue
+                # Push the child and continue with its own children.
+                depth += 1
+                states[depth] = s_prime
+                on_path[s_prime] = 1
+                children[depth] = iter(problem.successors(s_prime))
+                if budget is not None:
+                    budget.record_push(depth + 1, s_prime, depth)
+                break
+            else:
+                # Every child of this state has been tried: pop it.
+                if budget is not None:
+                    budget.record_pop(states[depth], depth)
+                on_path[states[depth]] = 0
+                children[depth] = None
+                depth -= 1
+
+        return "cutoff" if cutoff_occurred else None
+
+
+def depth_limited_search(problem, limit, transposition=False):
+    """
+    Depth-Limited Search (DLS)
 
-    # Start the recursive DLS with the initial node and given depth limit
-    return recursive_dls(
-        Node(state=problem.initial, parent=None, action=None, path_cost=0),
-        problem,
-        limit,
-    )
+    Args:
+        problem (Problems): The problem instance which includes the initial state, goal state, and other problem-specific methods.
+        limit (int): The depth limit for the search.
+        transposition (bool): Whether to skip states already reached at the same or a smaller depth.
+
+    Returns:
+        list: A list representing the path from the initial state to the goal state if a path is found,
+              'cutoff' if the depth limit is reached, or None if no path is found.
+    """
+    return DepthLimitedSearch(problem, transposition).search(limit)
 
 
 # Pseudo-code for IDS
 # function IDS (problem ← Problems) returns a solution path or failure
+# dls ← DepthLimitedSearch(problem)  // the buffers are shared by every iteration
 # depth ← 0
 # while true do
-#     result ← DLS (problem, depth)
+#     result ← dls.SEARCH(depth)
 #     if result ≠ cutoff then
 #         return result
 #     depth ← depth + 1
 
 
-def ids(problem):
+def ids(problem, transposition=False):
     """
     Iterative Deepening Search (IDS)
 
+    Since cycles on the current path are skipped, a graph without a path to the goal ends with
+    failure once no simple path reaches the depth limit, instead of deepening forever.
+
     Args:
         problem (Problems): The problem instance which includes the initial state, goal state, and other problem-specific methods.
+        transposition (bool): Whether to skip states already reached at the same or a smaller depth in each iteration.
 
     Returns:
         list: A list representing the path from the initial state to the goal state if a path is found, otherwise None.
     """
+    dls = DepthLimitedSearch(problem, transposition)
     depth = 0
     # Continuously increase the depth limit until a solution is found
     while True:
-        result = depth_limited_search(problem, depth)
+        result = dls.search(depth)
         if result != "cutoff":
             return result
         depth += 1
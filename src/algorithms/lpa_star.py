@@ -0,0 +1,210 @@
+import math
+from array import array
+from common.frontier import IndexedPriorityQueue
+
+# Lifelong Planning A* (LPA*)
+# Pseudo code
+
+# Every state has g, the cost of the best path found to it, and rhs, a one-step lookahead:
+#     rhs(start) = 0, rhs(s) = min over the edges p → s of g(p) + c(p, s)
+# A state is consistent when g = rhs. The frontier holds the inconsistent states, ordered by
+#     KEY(s) = (min(g(s), rhs(s)) + h(s), min(g(s), rhs(s)))
+# so the first search expands states like A*. After edge weights change, only the states whose rhs
+# changed become inconsistent, and the next search repairs the shortest-path tree from there.
+
+# function UPDATE_STATE(s)
+#     remove s from frontier if it is there
+#     if g(s) ≠ rhs(s) then PUSH(frontier, s, KEY(s))
+
+# function COMPUTE_SHORTEST_PATH()
+#     while TOP_KEY(frontier) < KEY(goal) or rhs(goal) ≠ g(goal) do
+#         _, u ← POP(frontier)
+#         if g(u) > rhs(u) then  // overconsistent: a cheaper path was found
+#             g(u) ← rhs(u)
+#             for each (s, c) in problem.SUCCESSORS(u) do
+#                 rhs(s) ← MIN(rhs(s), g(u) + c), UPDATE_STATE(s)
+#         else  // underconsistent: the path to u got more expensive
+#             g_old ← g(u), g(u) ← ∞
+#             for each (s, c) in problem.SUCCESSORS(u) and u itself do
+#                 if rhs(s) = g_old + c then rhs(s) ← min over the edges p → s of g(p) + c(p, s)
+#                 UPDATE_STATE(s)
+
+# function UPDATE_EDGES(changes)
+#     for each changed edge u → v (old cost c_old, new cost c_new) do
+#         if c_new < c_old then rhs(v) ← MIN(rhs(v), g(u) + c_new)
+#         else if rhs(v) = g(u) + c_old then rhs(v) ← min over the edges p → v of g(p) + c(p, v)
+#         UPDATE_STATE(v)
+
+# function PATH() returns a solution path or failure
+#     COMPUTE_SHORTEST_PATH()
+#     if g(goal) = ∞ then return failure
+#     walk back from goal to the predecessor p minimising g(p) + c(p, s), until start
+
+
+class LPAStar:
+    """
+    An incremental planner (Lifelong Planning A*) for one initial state and goal on a graph
+    whose edge weights change.
+
+    The first `path()` is an A* search. The g and rhs values and the frontier are then kept, so
+    after `update_edges` the next `path()` only repairs the part of the shortest-path tree
+    affected by the changes, and returns a path as cheap as a fresh A* or UCS would. D* Lite is
+    the same algorithm run backwards from the goal, for an initial state that moves; here both
+    ends are fixed, so the forward version is enough.
+
+    The heuristic must be consistent on the changed graph, as for A* without reopening; with
+    the heuristics of the generators and of `CoordinateHeuristic`, weight increases are always
+    safe. A change of the graph that did not go through `update_edges` (its `version` moved
+    on) makes the planner start over.
+
+    Attributes:
+        problem: The problem whose path is maintained.
+        g: The cost of the best path found to each state (infinity if none).
+        rhs: The one-step lookahead cost of each state.
+        frontier: The inconsistent states, by key.
+        version: The `version` of the graph the values are valid for.
+    """
+
+    def __init__(self, problem):
+        self.problem = problem
+        self.reset()
+
+    def reset(self):
+        # Forget every value and start over with only the initial state in the frontier.
+        problem = self.problem
+        num_nodes = problem.graph.num_nodes
+        self.g = array("d", [math.inf]) * num_nodes
+        self.rhs = array("d", [math.inf]) * num_nodes
+        self.rhs[problem.initial] = 0
+        self.frontier = IndexedPriorityQueue(budget=problem.budget)
+        self.frontier.push(problem.initial, self._key(problem.initial), problem.initial)
+        self.version = problem.graph.version
+
+    def _key(self, s):
+        best = min(self.g[s], self.rhs[s])
+        return (best + self.problem.heuristics[s], best)
+
+    def _update_state(self, s):
+        # Put s in the frontier if and only if it is inconsistent, with its current key.
+        frontier = self.frontier
+        if frontier.contains(s):
+            frontier.remove(s)
+        if self.g[s] != self.rhs[s]:
+            frontier.push(s, self._key(s), s)
+
+    def _lookahead(self, s):
+        # The rhs of s: the cheapest way in through one edge (its initial state has 0).
+        if s == self.problem.initial:
+            return 0
+        g = self.g
+        reverse_graph = self.problem.reverse_graph
+        return min(
+            (g[p] + cost for p, cost in zip(reverse_graph.neighbors(s), reverse_graph.edge_weights(s))),
+            default=math.inf,
+        )
+
+    def _compute_shortest_path(self):
+        problem = self.problem
+        goal = problem.goal
+        g, rhs, frontier = self.g, self.rhs, self.frontier
+        budget = problem.budget
+        while not frontier.empty() and (
+            frontier.peek()[0] < self._key(goal) or rhs[goal] != g[goal]
+        ):
+            _, u = frontier.pop()
+            if g[u] > rhs[u]:
+                # A cheaper path to u: settle it and offer it to the successors.
+                g[u] = rhs[u]
+                for s, cost in problem.successors(u):
+                    if g[u] + cost < rhs[s]:
+                        rhs[s] = g[u] + cost
+                        self._update_state(s)
+                    elif budget is not None:
+                        budget.record_duplicate(s)
+            else:
+                # The path to u got more expensive: recompute the states that relied on it.
+                g_old = g[u]
+                g[u] = math.inf
+                for s, cost in problem.successors(u):
+                    if rhs[s] == g_old + cost:
+                        rhs[s] = self._lookahead(s)
+                        self._update_state(s)
+                rhs[u] = self._lookahead(u)
+                self._update_state(u)
+
+    def update_edges(self, changes):
+        """
+        Changes the weights of a batch of edges (see `Problems.update_edges`) and marks the
+        states whose lookahead changed, for the next `path()` to repair.
+
+        Args:
+            changes (iterable): (s, s_prime, weight) triples; a weight of 0 removes the edge.
+
+        Returns:
+            list: The (s, s_prime, old weight, new weight) of every edge whose weight changed.
+        """
+        stale = self.version != self.problem.graph.version
+        applied = self.problem.update_edges(changes)
+        if stale:
+            self.reset()  # Changed behind our back before: nothing to repair from.
+            return applied
+        self.version = self.problem.graph.version
+
+        g, rhs = self.g, self.rhs
+        initial = self.problem.initial
+        for u, v, old, new in applied:
+            if v == initial:
+                continue
+            old_cost = old if old > 0 else math.inf  # 0 is a missing edge.
+            new_cost = new if new > 0 else math.inf
+            if new_cost < old_cost:
+                if g[u] + new_cost < rhs[v]:
+                    rhs[v] = g[u] + new_cost
+            elif rhs[v] == g[u] + old_cost:
+                rhs[v] = self._lookahead(v)
+            self._update_state(v)
+        return applied
+
+    def path(self):
+        """
+        Returns a shortest path from the initial state to the goal on the current graph,
+        repairing the search after the last changes.
+
+        Returns:
+            list or None: The path from the initial state to the goal state if a path is found, otherwise None.
+        """
+        if self.version != self.problem.graph.version:
+            self.reset()
+        self._compute_shortest_path()
+        problem = self.problem
+        g = self.g
+        if g[problem.goal] == math.inf:
+            return None
+
+        # Walk back along the predecessors that give each state its g.
+        reverse_graph = problem.reverse_graph
+        path = [problem.goal]
+        s = problem.goal
+        while s != problem.initial:
+            s = min(
+                zip(reverse_graph.neighbors(s), reverse_graph.edge_weights(s)),
+                key=lambda edge: g[edge[0]] + edge[1],
+            )[0]
+            path.append(s)
+        path.reverse()
+        return path
+
+
+def lpa_star(problem):
+    """Lifelong Planning A* (LPA*)
+
+    One planning run of `LPAStar`: the same expansions as A*. Keep an `LPAStar` instead to
+    replan after `update_edges`.
+
+    Args:
+        problem (Problems): The problem to solve.
+
+    Returns:
+        list or None: The path from the initial state to the goal state if a path is found, otherwise None.
+    """
+    return LPAStar(problem).path()
@@ -0,0 +1,287 @@
+import heapq
+import itertools
+import math
+
+# Simplified Memory-Bounded A* (SMA*)
+# Pseudo code
+
+# function SMA_STAR(problem, max_nodes) returns a solution path or failure
+#     root ← node of problem.initial with f = problem.heuristics[problem.initial]
+#     queue ← {root}, used ← 1
+#     while true do
+#         if queue is empty or the best f in queue is ∞ then
+#             return failure  // no solution fits in memory
+#         n ← the deepest node with the lowest f in queue
+#         if problem.IS-GOAL(n.STATE) then
+#             return the path to n
+#         s ← NEXT-SUCCESSOR(n)  // a successor never generated, else the best forgotten one,
+#                                // skipping a state already in memory with a path at most as costly
+#         if s is not a goal and s.DEPTH = max_nodes - 1 then
+#             s.F ← ∞  // a solution through s would not fit in memory
+#         else
+#             s.F ← MAX(n.F, s.G + problem.heuristics[s.STATE])
+#         if all successors of n have been generated then
+#             BACKUP(n)  // n.F ← the lowest F of its successors, propagated to its ancestors
+#         if all successors of n are in memory then
+#             remove n from queue
+#         insert s in queue, used ← used + 1
+#         while used > max_nodes do
+#             w ← the shallowest leaf with the highest f in queue
+#             remove w from queue and from the children of its parent, used ← used - 1
+#             remember w.F in the forgotten successors of w.PARENT
+#             insert w.PARENT in queue if it is not there
+
+
+class SMANode:
+    """
+    A node of the SMA* search tree.
+
+    Attributes:
+        state: The state of the node.
+        parent: The parent node, or None for the root.
+        path_cost: The cost of the path from the root.
+        f: The (backed-up) estimated cost of the best solution below this node.
+        depth: The number of edges from the root.
+        successors: The (state, cost) pairs of the successors, once the node has been expanded.
+        next_successor: The index of the first successor never generated.
+        children: The children currently in memory.
+        forgotten: The f value of each child dropped from memory, by state.
+        queued: Whether the node is in the queue.
+        version: Increased on every change of the node, so outdated heap entries can be skipped.
+    """
+
+    __slots__ = (
+        "state",
+        "parent",
+        "path_cost",
+        "f",
+        "depth",
+        "successors",
+        "next_successor",
+        "children",
+        "forgotten",
+        "queued",
+        "version",
+    )
+
+    def __init__(self, state, parent=None, path_cost=0, f=0, depth=0):
+        self.state = state
+        self.parent = parent
+        self.path_cost = path_cost
+        self.f = f
+        self.depth = depth
+        self.successors = None
+        self.next_successor = 0
+        self.children = []
+        self.forgotten = {}
+        self.queued = False
+        self.version = 0
+
+    def path(self):
+        # The states from the root to this node.
+        path = []
+        node = self
+        while node is not None:
+            path.append(node.state)
+            node = node.parent
+        return path[::-1]
+
+
+class _SMAQueue:
+    """
+    The SMA* queue: it gives the best node to expand (lowest f, then deepest) and the worst leaf
+    to drop (highest f, then shallowest).
+
+    Two heaps hold entries for the same nodes. A node's entries are outdated when its version
+    changes, and are skipped when they reach the top (lazy deletion).
+    """
+
+    def __init__(self):
+        self.best = []
+        self.worst = []
+        self.size = 0
+        self.counter = itertools.count()
+
+    def insert(self, node):
+        # Add a node, or refresh its entries after its f changed.
+        if not node.queued:
+            node.queued = True
+            self.size += 1
+        if len(self.best) > 4 * self.size + 64:
+            self._compact()
+        node.version += 1
+        order = next(self.counter)
+        heapq.heappush(self.best, (node.f, -node.depth, order, node.version, node))
+        heapq.heappush(self.worst, (-node.f, node.depth, order, node.version, node))
+
+    def remove(self, node):
+        # Take a node out of the queue; its heap entries become outdated.
+        if node.queued:
+            node.queued = False
+            node.version += 1
+            self.size -= 1
+
+    def _compact(self):
+        # Drop the outdated entries, so the heaps (and the dropped nodes they refer to) do not grow
+        # beyond a few entries per queued node.
+        for heap in (self.best, self.worst):
+            heap[:] = [
+                entry for entry in heap if entry[4].queued and entry[3] == entry[4].version
+            ]
+            heapq.heapify(heap)
+
+    def peek_best(self):
+        # Return the node with the lowest f (the deepest one on ties), or None if the queue is empty.
+        best = self.best
+        while best:
+            _, _, _, version, node = best[0]
+            if node.queued and version == node.version:
+                return node
+            heapq.heappop(best)
+        return None
+
+    def pop_worst_leaf(self):
+        # Remove and return the leaf with the highest f (the shallowest one on ties), skipping the root.
+        worst = self.worst
+        kept = []
+        leaf = None
+        while worst:
+            entry = heapq.heappop(worst)
+            node = entry[4]
+            if not node.queued or entry[3] != node.version:
+                continue  # Outdated entry.
+            if node.children or node.parent is None:
+                kept.append(entry)  # Not a leaf (or the root): it cannot be dropped.
+                continue
+            leaf = node
+            break
+        for entry in kept:
+            heapq.heappush(worst, entry)
+        if leaf is not None:
+            self.remove(leaf)
+        return leaf
+
+
+def _backup(queue, node):
+    # Once every successor of a node has been generated, its f is the lowest f of its successors
+    # (in memory or forgotten). Propagate the change up the tree.
+    while node is not None and node.next_successor == len(node.successors):
+        f = min(
+            itertools.chain(
+                (child.f for child in node.children), node.forgotten.values()
+            ),
+            default=math.inf,
+        )
+        if f == node.f:
+            return
+        node.f = f
+        if node.queued:
+            queue.insert(node)
+        node = node.parent
+
+
+def sma_star(problem, max_nodes=10000):
+    """Simplified Memory-Bounded A* (SMA*)
+
+    A* with a hard cap on the number of nodes in memory. It expands the best node like A*, but
+    generates one successor at a time, and when the cap is reached it drops the worst leaf. The
+    parent of a dropped leaf remembers its f value, so the subtree is only generated again if it
+    becomes the best option. With an admissible heuristic, the path is optimal whenever an optimal
+    path of at most `max_nodes - 1` edges exists. Otherwise SMA* returns the best solution that
+    fits in memory, or failure.
+
+    The search works on a tree, but a successor is not generated while its state is in memory with
+    a path that costs at most as much (which also rules out cycles), so the memory is not spent on
+    duplicates.
+
+    Args:
+        problem (Problems): The problem instance which includes the initial state, goal state, adjacency_matrix, and heuristics
+        max_nodes (int): The maximum number of nodes kept in memory (at least 2).
+
+    Returns:
+        list: A list representing the path from the initial state to the goal state if a path is found, otherwise None.
+    """
+    heuristics = problem.heuristics
+    root = SMANode(problem.initial, f=heuristics[problem.initial])
+    queue = _SMAQueue()
+    queue.insert(root)
+    used = 1
+    # The node in memory with the cheapest path to each state.
+    in_memory = {problem.initial: root}
+
+    while True:
+        # Expand the deepest of the nodes with the lowest f.
+        node = queue.peek_best()
+        if node is None or node.f == math.inf:
+            return None  # No solution fits in memory.
+
+        if problem.is_goal(node.state):
+            return node.path()
+
+        # Generate the next successor: one never generated, else the best forgotten one.
+        if node.successors is None:
+            node.successors = list(problem.successors(node.state))
+        state = None
+        while state is None and (
+            node.next_successor < len(node.successors) or node.forgotten
+        ):
+            f = None
+            if node.next_successor < len(node.successors):
+                state, cost = node.successors[node.next_successor]
+                node.next_successor += 1
+            else:
+                state = min(node.forgotten, key=node.forgotten.get)
+                f = node.forgotten.pop(state)  # Its backed-up f is a better estimate than g + h.
+                cost = next(c for s, c in node.successors if s == state)
+            # Skip a state already in memory with a path at most as costly (e.g. an ancestor).
+            other = in_memory.get(state)
+            if other is not None and other.path_cost <= node.path_cost + cost:
+                if problem.budget is not None:
+                    problem.budget.record_duplicate(state)
+                state = None
+
+        if state is not None:
+            path_cost = node.path_cost + cost
+            child = SMANode(state, node, path_cost, depth=node.depth + 1)
+            in_memory[state] = child
+            if f is not None:
+                child.f = f
+            elif not problem.is_goal(state) and child.depth >= max_nodes - 1:
+                child.f = math.inf  # A solution through it would not fit in memory.
+            else:
+                child.f = max(node.f, path_cost + heuristics[state])  # f never decreases along a path.
+            node.children.append(child)
+
+        # Update the f of the node (and its ancestors) once all its successors are known.
+        _backup(queue, node)
+        # A node with all its successors in memory has nothing left to generate. A node without
+        # children stays queued (with f = ∞), so it can be dropped from memory like any leaf.
+        if (
+            node.next_successor == len(node.successors)
+            and not node.forgotten
+            and node.children
+        ):
+            queue.remove(node)
+
+        if state is None:
+            continue
+        queue.insert(child)
+        used += 1
+        if problem.budget is not None:
+            problem.budget.check_frontier(queue.size)
+
+        # Drop the worst leaves until the tree fits in memory again.
+        while used > max_nodes:
+            leaf = queue.pop_worst_leaf()
+            if leaf is None:
+                break
+            parent = leaf.parent
+            parent.children.remove(leaf)
+            if in_memory.get(leaf.state) is leaf:
+                del in_memory[leaf.state]
+            parent.forgotten[leaf.state] = min(
+                leaf.f, parent.forgotten.get(leaf.state, math.inf)
+            )
+            used -= 1
+            if not parent.queued:
+                queue.insert(parent)
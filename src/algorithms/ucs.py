@@ -1,23 +1,217 @@
-import heapq
-from common.node import Node
-from common.utils import expand, reconstruct_path
+import math
+import pickle
+from array import array
+from common.node import NodeStore
+from common.utils import reconstruct_path
+from common.frontier import IndexedPriorityQueue
+from common.vectorized import expand_batch, store_arrays
 
 # Uniformed Cost Search (UCS)
 # Pseudo code
 
+# UCS settles states in increasing order of path cost, so stopping at the goal leaves a partial
+# shortest-path tree from the initial state: every settled state already has its shortest path.
+# ShortestPathTree keeps that tree and its frontier, so later goals resume the same search.
+
+# class ShortestPathTree
+#     method __init__(problem, source)
+#         store ← NodeStore(problem.graph.num_nodes)  // parent and path cost arrays indexed by state
+#         store.add(source, parent=-1, path_cost=0)
+#         settled ← a flag per state, all false
+#         frontier ← indexed priority queue ordered by PATH_COST, initially containing source with priority 0
+#         pending ← none  // a settled state whose successors are not generated yet
+
+#     method settle(goal) returns true if goal has a shortest path
+#         if pending is not none then
+#             EXPAND(pending), pending ← none
+#         while not settled[goal] and frontier is not empty do
+#             _, s ← POP(frontier)  // Remove the state with the lowest PATH_COST
+#             settled[s] ← true, pending ← s  // until EXPAND(s) is done: a budget stop inside it expands s again
+#             if s = goal then
+#                 break  // Expanded on the next call, so that stopping here costs no more than UCS
+#             EXPAND(s), pending ← none
+#         return settled[goal]
+
+#     method EXPAND(s)
+#         for each (s_prime, cost) in problem.successors(s) do
+#             path_cost ← store.path_costs[s] + cost
+#             if s_prime is not in store or path_cost < store.path_costs[s_prime] then
+#                 store.add(s_prime, parent=s, path_cost=path_cost)  // Update the store with the new lower PATH_COST
+#                 if frontier.CONTAINS(s_prime) then
+#                     frontier.DECREASE_KEY(s_prime, path_cost, s_prime)  // Replace its entry, no stale copy
+#                 else
+#                     frontier.PUSH(s_prime, path_cost, s_prime)  // Add the child to the frontier
+
+#     method path(goal) returns a solution path or failure
+#         if SETTLE(goal) then
+#             return store.PATH(goal)  // O(path length)
+#         return None
+
 # function UNIFORM_COST_SEARCH(problem) returns a solution path or failure
-#     start_node ← Node(state=problem.initial, parent=None, action=None, path_cost=0)
-#     frontier ← priority queue ordered by PATH_COST, initially containing (0, start_node)
-#     reached ← dictionary with key problem.initial and value start_node
-#     while frontier is not empty do
-#         _, current_node ← heappop(frontier)  // Remove the node with the lowest PATH_COST
-#         if problem.is_goal(current_node.state) then
-#             return reconstruct_path(current_node)  // Return the path to the goal
-#         for each child in expand(problem, current_node) do
-#             if child.state is not in reached or child.path_cost < reached[child.state].path_cost then
-#                 reached[child.state] ← child  // Update reached with the new lower PATH_COST
-#                 heappush(frontier, (child.path_cost, child))  // Add the child to the frontier
-#     return None  // Return None if no path to the goal is found
+#     return ShortestPathTree(problem, problem.initial).PATH(problem.goal)
+
+
+class ShortestPathTree:
+    """
+    The shortest paths from one source to every state, computed lazily by UCS (Dijkstra).
+
+    The search stops as soon as the requested goal is settled and keeps its frontier, so a later
+    goal resumes it instead of starting over: answering many goals from the same source costs
+    at most one full Dijkstra in total, and a goal that is already settled is answered in
+    O(path length) by walking the parent array. `complete` settles every reachable state at once.
+
+    The tree charges `problem.budget` (as read at each call), and can be saved to a file and
+    loaded back with its frontier, to resume later.
+
+    Attributes:
+        problem: The problem instance whose graph is searched.
+        source: The state the paths start from.
+        store: The `NodeStore` with the parent and the best known path cost of every reached state.
+        settled: A flag per state, set once its path cost is final.
+        frontier: The `IndexedPriorityQueue` of reached but unsettled states.
+        pending: A settled state whose successors have not been generated yet, or None.
+    """
+
+    def __init__(self, problem, source=None):
+        self.problem = problem
+        self.source = problem.initial if source is None else source
+        self.store = NodeStore(problem.graph.num_nodes)
+        self.store.add(self.source, parent=-1, path_cost=0)
+        self.settled = bytearray(problem.graph.num_nodes)
+        self.frontier = IndexedPriorityQueue(budget=problem.budget)
+        self.frontier.push(self.source, 0, self.source)
+        self.pending = None
+
+    def _expand(self, s):
+        # Relax every edge out of a settled state.
+        store, frontier = self.store, self.frontier
+        path_costs = store.path_costs
+        budget = self.problem.budget
+        for s_prime, cost in self.problem.successors(s):
+            path_cost = path_costs[s] + cost
+            # If the child state has not been reached yet or if the new path cost is lower than the previously known path cost to this state.
+            if s_prime not in store or path_cost < path_costs[s_prime]:
+                # Update the store with the new lower path cost for this state.
+                store.add(s_prime, parent=s, path_cost=path_cost)
+                # Add the child to the frontier with its path cost as the priority, or lower the priority of its entry.
+                if frontier.contains(s_prime):
+                    frontier.decrease_key(s_prime, path_cost, s_prime)
+                else:
+                    frontier.push(s_prime, path_cost, s_prime)
+            elif budget is not None:
+                # Count the child pruned as a duplicate.
+                budget.record_duplicate(s_prime)
+
+    def settle(self, goal=None):
+        """
+        Resumes the search until a goal is settled, or until every reachable state is.
+
+        Args:
+            goal (int): The state to settle, or None to settle every reachable state.
+
+        Returns:
+            bool: Whether the goal has a shortest path (for goal None, whether the search is complete).
+        """
+        self.frontier.budget = self.problem.budget
+        settled, frontier = self.settled, self.frontier
+        # A state stays pending until its expansion is done, so a search stopped by the budget in the
+        # middle of one (problem.successors charges it first) expands it again when it resumes.
+        if self.pending is not None:
+            self._expand(self.pending)
+            self.pending = None
+
+        # Loop until the goal is settled or the frontier is empty.
+        while (goal is None or not settled[goal]) and not frontier.empty():
+            # Pop the state with the lowest path cost from the frontier: its path cost is final.
+            _, s = frontier.pop()
+            settled[s] = 1
+            self.pending = s
+            if s == goal:
+                # Stop before expanding the goal, like UCS; it is expanded when the search resumes.
+                break
+            self._expand(s)
+            self.pending = None
+
+        return frontier.empty() if goal is None else settled[goal] == 1
+
+    def complete(self):
+        # Settle every state reachable from the source.
+        self.settle(None)
+
+    def path(self, goal):
+        """
+        Returns the shortest path from the source to a goal, resuming the search if needed.
+
+        Args:
+            goal (int): The goal state.
+
+        Returns:
+            list: A list representing the path from the source to the goal if a path is found, otherwise None.
+        """
+        if self.settled[goal] or self.settle(goal):
+            return reconstruct_path(goal, store=self.store)
+        return None
+
+    def distance(self, goal):
+        """
+        Returns the cost of the shortest path from the source to a goal, resuming the search if needed.
+
+        Args:
+            goal (int): The goal state.
+
+        Returns:
+            float: The path cost, or infinity if the goal is unreachable.
+        """
+        if self.settled[goal] or self.settle(goal):
+            return self.store.path_costs[goal]
+        return math.inf
+
+    def save(self, file_path):
+        """
+        Saves the tree and its frontier, so the search can be resumed by `load` in another process.
+
+        Args:
+            file_path (str): Path to the file to write.
+        """
+        store, frontier = self.store, self.frontier
+        state = {
+            "source": self.source,
+            "reached": bytes(store.reached),
+            "parents": store.parents.tobytes(),
+            "path_costs": store.path_costs.tobytes(),
+            "settled": bytes(self.settled),
+            "heap": frontier.heap,
+            "counter": frontier.counter,
+            "pending": self.pending,
+        }
+        with open(file_path, "wb") as file:
+            pickle.dump(state, file, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def load(cls, file_path, problem):
+        """
+        Loads a tree saved by `save`.
+
+        Args:
+            file_path (str): Path to the saved tree.
+            problem (Problems): The problem on the same graph the tree was built on.
+
+        Returns:
+            ShortestPathTree: The tree, ready to resume its search.
+        """
+        with open(file_path, "rb") as file:
+            state = pickle.load(file)
+        tree = cls(problem, state["source"])
+        store, frontier = tree.store, tree.frontier
+        store.reached[:] = state["reached"]
+        store.parents[:] = array("q", state["parents"])
+        store.path_costs[:] = array("d", state["path_costs"])
+        tree.settled[:] = state["settled"]
+        frontier.heap = state["heap"]
+        frontier.position = {entry[2]: i for i, entry in enumerate(frontier.heap)}
+        frontier.counter = state["counter"]
+        tree.pending = state["pending"]
+        return tree
 
 
 def ucs(problem):
@@ -29,34 +223,59 @@ def ucs(problem):
     Returns:
         list: A list representing the path from the initial state to the goal state if a path is found, otherwise None.
     """
+    # Grow the shortest-path tree from the initial state until the goal is settled.
+    return ShortestPathTree(problem).path(problem.goal)
 
-    # Create the start node with initial state, no parent, no action, and a path cost of 0.
-    start_node = Node(state=problem.initial, parent=None, action=None, path_cost=0)
-    # Initialize the frontier as a priority queue ordered by path cost, starting with the initial node.
-    frontier = [(0, start_node)]
-    # The reached dictionary keeps track of the best path cost to reach each state.
-    reached = {problem.initial: start_node}
 
-    # Loop until the frontier is empty.
-    while frontier:
-        # Pop the node with the lowest path cost from the frontier.
-        _, current_node = heapq.heappop(frontier)
+# Pseudo code for the vectorised variant
 
-        # If the current node is the goal state, reconstruct and return the path.
-        if problem.is_goal(current_node.state):
-            return reconstruct_path(current_node)
+# function UNIFORM_COST_SEARCH_VECTORIZED(problem) returns a solution path or failure
+#     same as UNIFORM_COST_SEARCH, except that every expansion is one batch:
+#         neighbors, costs, _ ← expand_batch(problem, s, informed=false)
+#         path_costs_new ← store.path_costs[s] + costs
+#         better ← neighbors not in store or path_costs_new < store.path_costs[neighbors]
+#         store.reached[better], store.parents[better], store.path_costs[better] ← true, s, path_costs_new[better]
+#         push or decrease the key of every state in better
+
+
+def ucs_vectorized(problem):
+    """Uniformed Cost Search (UCS) with batched expansion
+
+    Returns the same path as `ucs`. Each state is expanded with `expand_batch`, the path costs of
+    all children are computed and compared with the stored ones in one NumPy operation, and only
+    the improved children reach the (Python) priority queue.
+
+    Args:
+        problem (Problems): The problem instance. Its graph must be a `CSRGraph`.
+
+    Returns:
+        list: A list representing the path from the initial state to the goal state if a path is found, otherwise None.
+    """
+    store = NodeStore(problem.graph.num_nodes)
+    store.add(problem.initial, parent=-1, path_cost=0)
+    reached, parents, path_costs, _ = store_arrays(store)
+    frontier = IndexedPriorityQueue(budget=problem.budget)
+    frontier.push(problem.initial, 0, problem.initial)
+
+    while not frontier.empty():
+        _, s = frontier.pop()
+
+        if problem.is_goal(s):
+            return reconstruct_path(s, store=store)
+
+        # Compute the path cost of every child at once and keep the ones that improve on the store.
+        neighbors, costs, _ = expand_batch(problem, s, informed=False)
+        new_costs = path_costs[s] + costs
+        better = ~reached[neighbors] | (new_costs < path_costs[neighbors])
+        neighbors, new_costs = neighbors[better], new_costs[better]
+        reached[neighbors] = True
+        parents[neighbors] = s
+        path_costs[neighbors] = new_costs
+
+        for s_prime, path_cost in zip(neighbors.tolist(), new_costs.tolist()):
+            if frontier.contains(s_prime):
+                frontier.decrease_key(s_prime, path_cost, s_prime)
+            else:
+                frontier.push(s_prime, path_cost, s_prime)
 
-        # Expand the current node to generate its children.
-        for child in expand(problem=problem, node=current_node):
-            # If the child state has not been reached yet or if the new path cost is lower than the previously known path cost to this state.
-            if (
-                child.state not in reached
-                or child.path_cost < reached[child.state].path_cost
-            ):
-                # Update the reached dictionary with the new lower path cost for this state.
-                reached[child.state] = child
-                # Add the child to the frontier with its path cost as the priority.
-                heapq.heappush(frontier, (child.path_cost, child))
-
-    # If the goal state is not reached and the frontier is empty, return None indicating failure.
     return None
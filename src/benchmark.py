@@ -0,0 +1,558 @@
+import argparse
+import csv
+import json
+import random
+import statistics
+import time
+import tracemalloc
+from algorithms.anytime_a_star import anytime_focal_search, anytime_weighted_a_star, ara_star
+from algorithms.a_star import a_star_search
+from algorithms.contraction_hierarchies import ch_search
+from algorithms.hill_climbing import (
+    climb,
+    hill_climbing,
+    local_beam_search,
+    parallel_random_restart,
+    random_restart_hill_climbing,
+)
+from algorithms.lpa_star import LPAStar
+from algorithms.ucs import ucs
+from common.budget import BudgetExceeded, SearchBudget
+from common.contraction import ContractionHierarchy
+from common.graph_file import read_problem
+from main import ALGORITHMS, preprocess, run_algorithm
+
+# Pseudo-code for benchmark()
+# function BENCHMARK(algorithm, problem, warmups, repeats) returns a result row
+#     error, preprocessing ← PREPROCESS(algorithm, problem)  # Timed once, apart from the runs
+#     if error is not null then return the error and preprocessing
+#     repeat warmups times
+#         RUN_ALGORITHM(algorithm, problem)  # Warm up caches, not measured
+#     durations ← empty list
+#     repeat repeats times
+#         start_time ← time.perf_counter()
+#         path ← RUN_ALGORITHM(algorithm, problem, budget)  # No tracing; counters only with a budget
+#         append time.perf_counter() - start_time to durations
+#     budget ← SearchBudget()  # No limits, only counters
+#     tracemalloc.start()
+#     RUN_ALGORITHM(algorithm, problem, budget)  # One traced run for memory and counters
+#     peak ← tracemalloc peak
+#     tracemalloc.stop()
+#     return MEDIAN(durations), P95(durations), STDEV(durations), peak / 1024, COUNTERS(budget), preprocessing
+
+
+def percentile(values, q):
+    """
+    Returns the q-th percentile of the values (nearest-rank method).
+
+    Args:
+        values (list): The measured values.
+        q (float): The percentile, between 0 and 100.
+
+    Returns:
+        float: The smallest value that is greater than or equal to q percent of the values.
+    """
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * q // 100))  # ceil(n * q / 100), at least 1.
+    return ordered[int(rank) - 1]
+
+
+def benchmark(algorithm, problem, warmups=1, repeats=5, budget=None):
+    """
+    Measures an algorithm on a problem with separate timing and memory runs.
+
+    The timing runs do not use tracemalloc, and without a `budget` they do not count the work
+    either, so they measure the algorithm alone; a budget's limits need its counters, so with one
+    the timings include their (small) cost. Peak memory and the work counters come from one
+    extra run with tracemalloc enabled. The preprocessing of the algorithm, if any (see
+    `main.preprocess`), runs once before all of them and is reported separately.
+
+    Args:
+        algorithm (function): The search algorithm to be executed.
+        problem (Problems): The problem instance on which the algorithm will run.
+        warmups (int): The number of unmeasured runs before timing.
+        repeats (int): The number of timed runs.
+        budget (SearchBudget): The limits of each run, or None for no limits.
+
+    Returns:
+        dict: The timing statistics (seconds), the peak memory (KB), the work counters
+        (see `SearchBudget.counters`), the preprocessing time (seconds, or None) and the outcome of the search.
+    """
+    error, preprocessing = preprocess(algorithm, problem, budget)
+    if error is not None:
+        return {"outcome": f"budget exceeded ({error.reason}) in preprocessing", "preprocessing": preprocessing}
+    for _ in range(warmups):
+        run_algorithm(algorithm, problem, budget)
+
+    durations = []
+    for _ in range(repeats):
+        start_time = time.perf_counter()
+        path = run_algorithm(algorithm, problem, budget)
+        durations.append(time.perf_counter() - start_time)
+
+    # One traced run for the peak memory. A budget without limits of its own only counts the work.
+    counters = budget if budget is not None else SearchBudget()
+    tracemalloc.start()
+    try:
+        run_algorithm(algorithm, problem, counters)
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()  # Also when the search fails, so later runs are not traced.
+
+    if isinstance(path, BudgetExceeded):
+        outcome = f"budget exceeded ({path.reason})"
+    else:
+        outcome = "found" if path is not None else "no path"
+
+    row = {
+        "outcome": outcome,
+        "path_length": len(path) if isinstance(path, list) else None,
+        "repeats": repeats,
+        "median": statistics.median(durations),
+        "mean": statistics.fmean(durations),
+        "p95": percentile(durations, 95),
+        "stddev": statistics.stdev(durations) if len(durations) > 1 else 0.0,
+        "min": min(durations),
+        "memory_kb": peak / 1024,
+        "preprocessing": preprocessing,
+    }
+    row.update(counters.counters())
+    return row
+
+
+def benchmark_files(input_files, algorithms=None, warmups=1, repeats=5, budget=None):
+    """
+    Benchmarks every algorithm on every input file.
+
+    Args:
+        input_files (list): Paths to the input files (text or binary graph files).
+        algorithms (dict): The algorithms to run by name, or None for `ALGORITHMS`.
+        warmups (int): The number of unmeasured runs before timing.
+        repeats (int): The number of timed runs.
+        budget (SearchBudget): The limits of each run, or None for no limits.
+
+    Returns:
+        list: One result row (dict) per (input file, algorithm) pair.
+    """
+    algorithms = ALGORITHMS if algorithms is None else algorithms
+    rows = []
+    for input_file in input_files:
+        problem = read_problem(input_file)
+        for name, algorithm in algorithms.items():
+            row = {"input": input_file, "algorithm": name}
+            row.update(benchmark(algorithm, problem, warmups, repeats, budget))
+            rows.append(row)
+    return rows
+
+
+# Pseudo-code for benchmark_hierarchy()
+# function BENCHMARK_HIERARCHY(problem, queries) returns a result row
+#     start_time ← time.perf_counter()
+#     hierarchy ← BUILD_HIERARCHY(problem)  # Preprocessing, timed once
+#     preprocessing ← time.perf_counter() - start_time
+#     for each random (start, goal) pair of the queries do
+#         time UCS and CH_SEARCH on problem.WITH_QUERY(start, goal)
+#         check that both paths cost the same
+#     return preprocessing, shortcuts, index size, MEDIAN(UCS times), MEDIAN(CH times), speedup
+
+
+def benchmark_hierarchy(problem, queries=100, seed=0):
+    """
+    Measures contraction hierarchies against UCS: preprocessing time, index size and query speedup.
+
+    Every query is a random (start, goal) pair answered by both `ucs` and `ch_search`, and the
+    two paths must cost the same.
+
+    Args:
+        problem (Problems): The problem whose graph is preprocessed.
+        queries (int): The number of random queries.
+        seed (int): The random seed of the queries.
+
+    Returns:
+        dict: The preprocessing time (seconds), the number of original edges and shortcuts, the index size (KB),
+        the median query times (seconds) of UCS and CH, and the speedup of the median.
+    """
+    start_time = time.perf_counter()
+    hierarchy = ContractionHierarchy.build(problem)
+    preprocessing = time.perf_counter() - start_time
+    problem.use_hierarchy(hierarchy)
+
+    rng = random.Random(seed)
+    num_nodes = problem.graph.num_nodes
+    ucs_times, ch_times = [], []
+    for _ in range(queries):
+        query = problem.with_query(rng.randrange(num_nodes), rng.randrange(num_nodes))
+        paths = []
+        for algorithm, times in ((ucs, ucs_times), (ch_search, ch_times)):
+            start_time = time.perf_counter()
+            paths.append(algorithm(query))
+            times.append(time.perf_counter() - start_time)
+        costs = [
+            None if path is None else sum(map(query.graph.weight, path, path[1:]))
+            for path in paths
+        ]
+        if costs[0] != costs[1]:
+            raise AssertionError(
+                f"CH path costs {costs[1]} instead of {costs[0]} from {query.initial} to {query.goal}"
+            )
+
+    return {
+        "preprocessing": preprocessing,
+        "edges": problem.graph.num_edges,
+        "shortcuts": hierarchy.num_shortcuts,
+        "index_kb": hierarchy.nbytes / 1024,
+        "queries": queries,
+        "ucs_median": statistics.median(ucs_times),
+        "ch_median": statistics.median(ch_times),
+        "speedup": statistics.median(ucs_times) / max(statistics.median(ch_times), 1e-9),
+    }
+
+
+# Pseudo-code for benchmark_local_search()
+# function BENCHMARK_LOCAL_SEARCH(problem, trials) returns a result row per variant
+#     for each variant of hill climbing do
+#         for each random start of the trials do  # Same goal, so the heuristics still hold
+#             time the variant on problem.WITH_QUERY(start, problem.goal), with the trial as seed
+#             count it as a success if it returns a path, and compare its cost with the one of UCS
+#         return successes / trials, successes / total time, MEAN(cost / UCS cost)
+
+
+def benchmark_local_search(problem, trials=50, seed=0, workers=2):
+    """
+    Measures the hill-climbing variants: how often they reach the goal, and how fast.
+
+    Local search trades completeness for speed, so a variant is judged by its success rate per
+    unit of wall time (successes per second), not by its time alone. Every trial starts from a
+    random state towards the goal of the problem, with the trial number as the seed of the
+    randomised variants, and the cost of each path found is compared with the optimal one (UCS).
+
+    Args:
+        problem (Problems): The problem instance; its goal and heuristics are kept.
+        trials (int): The number of random starts.
+        seed (int): The random seed of the starts.
+        workers (int): The number of worker processes of the parallel restarts.
+
+    Returns:
+        list: One dict per variant with the number of trials and successes, the success rate, the total time
+        (seconds), the successes per second and the mean cost ratio of the paths found to the optimal ones.
+    """
+    variants = {
+        "hill-climbing": lambda query, trial: hill_climbing(query),
+        "stochastic": lambda query, trial: climb(
+            query, random.Random(trial), "stochastic", max_sideways=10
+        ),
+        "first-choice": lambda query, trial: climb(
+            query, random.Random(trial), "first-choice", max_sideways=10
+        ),
+        "random restart": lambda query, trial: random_restart_hill_climbing(query, seed=trial),
+        "parallel restarts": lambda query, trial: parallel_random_restart(
+            query, workers=workers, seed=trial
+        ),
+        "local beam (k=4)": lambda query, trial: local_beam_search(query, k=4, seed=trial),
+    }
+    rng = random.Random(seed)
+    num_nodes = problem.graph.num_nodes
+    queries = [problem.with_query(rng.randrange(num_nodes), problem.goal) for _ in range(trials)]
+    optimal = [ucs(query) for query in queries]
+
+    def cost(query, path):
+        return sum(map(query.graph.weight, path, path[1:]))
+
+    rows = []
+    for name, variant in variants.items():
+        successes, ratios, total = 0, [], 0.0
+        for trial, (query, best) in enumerate(zip(queries, optimal)):
+            start_time = time.perf_counter()
+            path = variant(query, trial)
+            total += time.perf_counter() - start_time
+            if path is not None:
+                successes += 1
+                ratios.append(cost(query, path) / max(cost(query, best), 1))
+        rows.append(
+            {
+                "variant": name,
+                "trials": trials,
+                "successes": successes,
+                "success_rate": successes / trials,
+                "time": total,
+                "successes_per_second": successes / max(total, 1e-9),
+                "cost_ratio": statistics.fmean(ratios) if ratios else None,
+            }
+        )
+    return rows
+
+
+# Pseudo-code for benchmark_anytime()
+# function BENCHMARK_ANYTIME(problem, max_time) returns a result row per anytime search
+#     for each anytime search do
+#         result ← the search on problem, stopped at max_time
+#         return the time and cost of its first path, and the cost and bound of its last one
+
+
+def benchmark_anytime(problem, max_time=1.0):
+    """
+    Measures the anytime searches under a deadline: how soon they have a path, and how good the
+    path is (with its proven bound) when the deadline is hit.
+
+    Args:
+        problem (Problems): The problem instance.
+        max_time (float): The deadline of each search, in seconds.
+
+    Returns:
+        list: One dict per search with the time (seconds) and cost of its first path, the cost and bound of its
+        best path, the number of improvements and whether it finished before the deadline.
+    """
+    searches = {
+        "anytime weighted A*": anytime_weighted_a_star,
+        "ARA*": ara_star,
+        "focal search": anytime_focal_search,
+    }
+    rows = []
+    for name, search in searches.items():
+        result = search(problem, max_time=max_time)
+        first = result.solutions[0] if result.solutions else (None, None, None)
+        rows.append(
+            {
+                "search": name,
+                "first_time": first[0],
+                "first_cost": first[1],
+                "cost": None if result.path is None else result.cost,
+                "bound": None if result.path is None else result.bound,
+                "improvements": len(result.solutions),
+                "complete": result.complete,
+            }
+        )
+    return rows
+
+
+# Pseudo-code for benchmark_replanning()
+# function BENCHMARK_REPLANNING(problem, batches, changes) returns a result row
+#     planner ← LPAStar(problem), planner.PATH()  # The initial search, not measured
+#     repeat batches times
+#         pick changes edges, half of them on the current path, and raise or restore their weights
+#         time planner.UPDATE_EDGES(batch) and planner.PATH()  # Replanning
+#         time A_STAR_SEARCH(problem) on the changed graph  # Planning from scratch
+#         check that both paths cost the same
+#     return MEDIAN(replanning times), MEDIAN(A* times), speedup
+
+
+def benchmark_replanning(problem, batches=20, changes=10, seed=0):
+    """
+    Measures incremental replanning (LPA*) against planning from scratch (A*) while edge weights
+    change.
+
+    Each batch changes the weights of `changes` edges, half of them on the current shortest
+    path (the changes that matter) and half anywhere, then the planner repairs its search and A*
+    runs again on the changed graph; both paths must cost the same. A new weight is the original
+    one times 1 to 3, so weights never drop below the original ones and the heuristic stays
+    consistent. The edges of the problem are changed in place.
+
+    Args:
+        problem (Problems): The problem instance; its graph is changed.
+        batches (int): The number of batches of changes.
+        changes (int): The number of edges changed per batch.
+        seed (int): The random seed of the changes.
+
+    Returns:
+        dict: The number of batches and changes per batch, the time (seconds) of the initial search, the median
+        replanning and A* times (seconds), and the speedup of the median.
+    """
+    graph = problem.graph
+    if hasattr(graph, "load_all"):
+        graph.load_all()  # Every edge must be known to pick the changed ones.
+    rng = random.Random(seed)
+    planner = LPAStar(problem)
+    start_time = time.perf_counter()
+    path = planner.path()
+    initial_time = time.perf_counter() - start_time
+
+    sources = [s for s in range(graph.num_nodes) if graph.degree(s)]
+    original = {}
+    replan_times, a_star_times = [], []
+    for _ in range(batches):
+        edges = list(zip(path, path[1:])) if path else []
+        edges = rng.sample(edges, min(len(edges), changes // 2))
+        while len(edges) < changes and sources:
+            s = rng.choice(sources)
+            edges.append((s, rng.choice(list(graph.neighbors(s)))))
+        batch = []
+        for s, s_prime in edges:
+            weight = original.setdefault((s, s_prime), graph.weight(s, s_prime))
+            batch.append((s, s_prime, weight * rng.randint(1, 3)))
+
+        start_time = time.perf_counter()
+        planner.update_edges(batch)
+        path = planner.path()
+        replan_times.append(time.perf_counter() - start_time)
+        start_time = time.perf_counter()
+        expected = a_star_search(problem)
+        a_star_times.append(time.perf_counter() - start_time)
+
+        costs = [
+            None if p is None else sum(map(graph.weight, p, p[1:])) for p in (path, expected)
+        ]
+        if costs[0] != costs[1]:
+            raise AssertionError(f"LPA* path costs {costs[0]} instead of {costs[1]} after replanning")
+
+    return {
+        "batches": batches,
+        "changes": changes,
+        "initial": initial_time,
+        "replan_median": statistics.median(replan_times),
+        "a_star_median": statistics.median(a_star_times),
+        "speedup": statistics.median(a_star_times) / max(statistics.median(replan_times), 1e-9),
+    }
+
+
+def write_csv(rows, output_file):
+    """
+    Writes benchmark rows to a CSV file, one row per (input file, algorithm) pair.
+
+    Args:
+        rows (list): The rows returned by `benchmark_files`.
+        output_file (str): Path to the CSV file.
+    """
+    fieldnames = list(dict.fromkeys(key for row in rows for key in row))  # Union, in order.
+    with open(output_file, "w", newline="") as file:
+        writer = csv.DictWriter(file, fieldnames=fieldnames)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def write_json(rows, output_file):
+    """
+    Writes benchmark rows to a JSON file as a list of objects.
+
+    Args:
+        rows (list): The rows returned by `benchmark_files`.
+        output_file (str): Path to the JSON file.
+    """
+    with open(output_file, "w") as file:
+        json.dump(rows, file, indent=2)
+
+
+def print_table(rows):
+    # Print a compact summary of the rows to the console, with columns as wide as the longest input and algorithm.
+    input_width = max([28] + [len(row["input"]) for row in rows])
+    name_width = max([14] + [len(row["algorithm"]) for row in rows])
+    print(
+        f"{'input':<{input_width}} {'algorithm':<{name_width}} {'median (s)':>12} {'p95 (s)':>12} "
+        f"{'memory (KB)':>12} {'expanded':>10} {'generated':>10} {'duplicates':>10} "
+        f"{'reexpanded':>10} {'pushes':>10} {'pops':>10} {'frontier':>9}  outcome"
+    )
+    for row in rows:
+        if "median" not in row:
+            print(f"{row['input']:<{input_width}} {row['algorithm']:<{name_width}} {row['outcome']}")
+            continue
+        print(
+            f"{row['input']:<{input_width}} {row['algorithm']:<{name_width}} {row['median']:>12.8f} {row['p95']:>12.8f} "
+            f"{row['memory_kb']:>12.2f} {row['expansions']:>10} {row['generated']:>10} "
+            f"{row['duplicates']:>10} {row['reexpansions']:>10} {row['pushes']:>10} {row['pops']:>10} "
+            f"{row['max_frontier']:>9}  {row['outcome']}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the search algorithms.")
+    parser.add_argument("inputs", nargs="+", help="input files (text or binary graph files)")
+    parser.add_argument("--warmups", type=int, default=1, help="unmeasured runs before timing")
+    parser.add_argument("--repeats", type=int, default=5, help="number of timed runs")
+    parser.add_argument(
+        "--algorithms",
+        nargs="+",
+        default=None,
+        choices=list(ALGORITHMS),
+        help="algorithms to run (default: all)",
+    )
+    parser.add_argument("--timeout", type=float, default=None, help="time limit of each run in seconds")
+    parser.add_argument("--csv", default=None, help="write the results to this CSV file")
+    parser.add_argument("--json", default=None, help="write the results to this JSON file")
+    parser.add_argument(
+        "--ch-queries",
+        type=int,
+        default=None,
+        help="instead, benchmark contraction hierarchies against UCS on this many random queries",
+    )
+    parser.add_argument(
+        "--local-search",
+        type=int,
+        default=None,
+        help="instead, benchmark the hill-climbing variants on this many random starts",
+    )
+    parser.add_argument(
+        "--anytime",
+        type=float,
+        default=None,
+        help="instead, run the anytime searches with this deadline in seconds",
+    )
+    parser.add_argument(
+        "--replan",
+        type=int,
+        default=None,
+        help="instead, benchmark LPA* replanning against A* on this many batches of edge changes",
+    )
+    args = parser.parse_args()
+
+    if args.replan is not None:
+        # Replanning against planning from scratch, one row per input file.
+        rows = []
+        for input_file in args.inputs:
+            row = {"input": input_file}
+            row.update(benchmark_replanning(read_problem(input_file), args.replan))
+            rows.append(row)
+            print(
+                f"{input_file}: initial search {row['initial']:.4f} s, {row['batches']} batches of "
+                f"{row['changes']} changes, median replanning {row['replan_median']:.6f} s, "
+                f"A* {row['a_star_median']:.6f} s ({row['speedup']:.1f}x)"
+            )
+    elif args.anytime is not None:
+        # The anytime searches under the deadline, one row per (input file, search) pair.
+        rows = []
+        for input_file in args.inputs:
+            for row in benchmark_anytime(read_problem(input_file), args.anytime):
+                rows.append({"input": input_file, **row})
+                if row["cost"] is None:
+                    print(f"{input_file}: {row['search']:<20} no path within the deadline")
+                    continue
+                print(
+                    f"{input_file}: {row['search']:<20} first path {row['first_cost']:g} after "
+                    f"{row['first_time']:.4f} s, best {row['cost']:g} (within {row['bound']:.3f}x optimal)"
+                    f"{'' if not row['complete'] else ', proven optimal'}"
+                )
+    elif args.local_search is not None:
+        # The hill-climbing variants, one row per (input file, variant) pair.
+        rows = []
+        for input_file in args.inputs:
+            for row in benchmark_local_search(read_problem(input_file), args.local_search):
+                rows.append({"input": input_file, **row})
+                ratio = "-" if row["cost_ratio"] is None else f"{row['cost_ratio']:.2f}"
+                print(
+                    f"{input_file}: {row['variant']:<18} success {row['success_rate']:6.1%} "
+                    f"in {row['time']:.3f} s ({row['successes_per_second']:.1f} successes/s), "
+                    f"cost ratio {ratio}"
+                )
+    elif args.ch_queries is not None:
+        # Contraction hierarchies against UCS, one row per input file.
+        rows = []
+        for input_file in args.inputs:
+            row = {"input": input_file}
+            row.update(benchmark_hierarchy(read_problem(input_file), args.ch_queries))
+            rows.append(row)
+            print(
+                f"{input_file}: preprocessing {row['preprocessing']:.2f} s, {row['shortcuts']} shortcuts "
+                f"for {row['edges']} edges, index {row['index_kb']:.0f} KB, median query "
+                f"UCS {row['ucs_median']:.6f} s, CH {row['ch_median']:.6f} s ({row['speedup']:.1f}x)"
+            )
+    else:
+        algorithms = (
+            ALGORITHMS
+            if args.algorithms is None
+            else {name: ALGORITHMS[name] for name in args.algorithms}
+        )
+        budget = SearchBudget(max_time=args.timeout) if args.timeout is not None else None
+        rows = benchmark_files(args.inputs, algorithms, args.warmups, args.repeats, budget)
+        print_table(rows)
+    if args.csv:
+        write_csv(rows, args.csv)
+    if args.json:
+        write_json(rows, args.json)
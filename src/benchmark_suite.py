@@ -0,0 +1,178 @@
+import argparse
+import math
+import os
+from benchmark import benchmark, print_table, write_csv, write_json
+from common.budget import SearchBudget
+from common.generators import GENERATORS
+from common.graph_file import read_graph_file, write_graph_file
+from common.utils import write_input
+from main import ALGORITHMS
+
+# Pseudo-code for run_suite()
+# function RUN_SUITE(families, sizes, algorithms, output_folder) returns rows
+#     for each family in families do
+#         for each num_nodes in sizes do
+#             problem ← GENERATORS[family](num_nodes)
+#             WRITE_GRAPH_FILE(output_folder/family-num_nodes.bin, problem)
+#             if num_nodes is small then WRITE_INPUT(output_folder/family-num_nodes.txt, problem)
+#             problem ← READ_GRAPH_FILE(output_folder/family-num_nodes.bin)
+#             for each (name, algorithm) in algorithms do
+#                 append BENCHMARK(algorithm, problem) to rows
+#     return rows
+
+
+def run_suite(
+    families,
+    sizes,
+    algorithms,
+    output_folder,
+    text_limit=2000,
+    warmups=0,
+    repeats=3,
+    budget=None,
+    seed=0,
+):
+    """
+    Generates every (family, size) graph and benchmarks every algorithm on it.
+
+    Each graph is saved as a binary graph file (and, up to `text_limit` nodes, in the text input
+    format as well), then benchmarked through the memory-mapped file like any other input.
+
+    Args:
+        families (list): Names of generator families in `GENERATORS`.
+        sizes (list): The numbers of nodes to generate.
+        algorithms (dict): The algorithms to run by name.
+        output_folder (str): Where to write the generated graphs.
+        text_limit (int): The largest graph also written in the (dense) text input format.
+        warmups (int): The number of unmeasured runs before timing.
+        repeats (int): The number of timed runs.
+        budget (SearchBudget): The limits of each run, or None for no limits.
+        seed (int): The random seed of the generators.
+
+    Returns:
+        list: One result row per (family, size, algorithm).
+    """
+    os.makedirs(output_folder, exist_ok=True)
+    name_width = max([14] + [len(name) for name in algorithms])  # Align the longest algorithm name.
+    rows = []
+    for family in families:
+        for num_nodes in sizes:
+            base = os.path.join(output_folder, f"{family}-{num_nodes}")
+            problem = GENERATORS[family](num_nodes, seed=seed)
+            write_graph_file(base + ".bin", problem)
+            if problem.graph.num_nodes <= text_limit:
+                write_input(base + ".txt", problem)
+            problem = read_graph_file(base + ".bin")
+
+            for name, algorithm in algorithms.items():
+                row = {
+                    "family": family,
+                    "nodes": problem.graph.num_nodes,
+                    "edges": problem.graph.num_edges,
+                    "input": base + ".bin",
+                    "algorithm": name,
+                }
+                try:
+                    row.update(benchmark(algorithm, problem, warmups, repeats, budget))
+                except Exception as e:  # Report a failing algorithm without stopping the suite.
+                    row.update({"outcome": f"error ({type(e).__name__})"})
+                rows.append(row)
+                print(
+                    f"{family:<11} {row['nodes']:>8} {name:<{name_width}} "
+                    f"{row.get('median', math.nan):>12.6f} s  {row['outcome']}"
+                )
+    return rows
+
+
+def scaling_exponents(rows, metric):
+    """
+    Estimates how a metric grows with the graph size, as the slope of log(metric) against
+    log(nodes) between consecutive sizes (1 means linear, 2 quadratic, ...).
+
+    Args:
+        rows (list): The rows returned by `run_suite`.
+        metric (str): The row field to fit, e.g. "median" or "memory_kb".
+
+    Returns:
+        dict: For each (family, algorithm), the list of ((nodes_from, nodes_to), exponent) pairs.
+    """
+    series = {}
+    for row in rows:
+        if row.get(metric) and row["outcome"] == "found":
+            series.setdefault((row["family"], row["algorithm"]), []).append(
+                (row["nodes"], row[metric])
+            )
+
+    exponents = {}
+    for key, points in series.items():
+        points.sort()
+        exponents[key] = [
+            ((n1, n2), math.log(v2 / v1) / math.log(n2 / n1))
+            for (n1, v1), (n2, v2) in zip(points, points[1:])
+            if n2 > n1 and v1 > 0 and v2 > 0
+        ]
+    return exponents
+
+
+def print_scaling(rows):
+    # Print the scaling exponents of time and memory for every (family, algorithm).
+    name_width = max([14] + [len(row["algorithm"]) for row in rows])
+    for metric in ("median", "memory_kb"):
+        print(f"\nScaling exponent of {metric} (log-log slope between consecutive sizes):")
+        for (family, algorithm), slopes in sorted(scaling_exponents(rows, metric).items()):
+            if not slopes:
+                continue
+            text = ", ".join(f"{n1}->{n2}: {slope:.2f}" for (n1, n2), slope in slopes)
+            print(f"  {family:<11} {algorithm:<{name_width}} {text}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Generate synthetic graphs and benchmark how the search algorithms scale."
+    )
+    parser.add_argument(
+        "--families", nargs="+", default=list(GENERATORS), choices=list(GENERATORS)
+    )
+    parser.add_argument(
+        "--sizes",
+        nargs="+",
+        type=int,
+        default=[100, 1000, 10000],
+        help="numbers of nodes, e.g. 100 1000 10000 100000 1000000",
+    )
+    parser.add_argument(
+        "--algorithms", nargs="+", default=list(ALGORITHMS), choices=list(ALGORITHMS)
+    )
+    parser.add_argument("--output-folder", default="test/generated")
+    parser.add_argument("--text-limit", type=int, default=2000)
+    parser.add_argument("--warmups", type=int, default=0)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=10.0,
+        help="time limit of each run in seconds; 0 for no limit (and no counters in the timed runs)",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--csv", default=None)
+    parser.add_argument("--json", default=None)
+    args = parser.parse_args()
+
+    rows = run_suite(
+        args.families,
+        args.sizes,
+        {name: ALGORITHMS[name] for name in args.algorithms},
+        args.output_folder,
+        text_limit=args.text_limit,
+        warmups=args.warmups,
+        repeats=args.repeats,
+        budget=SearchBudget(max_time=args.timeout) if args.timeout else None,
+        seed=args.seed,
+    )
+    print()
+    print_table([row for row in rows if "median" in row])
+    print_scaling(rows)
+    if args.csv:
+        write_csv(rows, args.csv)
+    if args.json:
+        write_json(rows, args.json)
@@ -0,0 +1,212 @@
+import threading
+import time
+
+# Pseudo code
+# class SearchBudget
+#     method __init__(max_expansions, max_time, max_frontier, cancel_token)
+#         store the limits (null means unlimited)
+
+#     method start()
+#         every counter ← 0
+#         deadline ← now + max_time
+
+#     method charge_expansion(children, state)  // called once per expanded node
+#         expansions ← expansions + 1
+#         generated ← generated + children
+#         CALL the "expand" callbacks with (state, children)
+#         if cancel_token is cancelled then raise BudgetExceeded("cancelled")
+#         if expansions > max_expansions then raise BudgetExceeded("max expansions")
+#         if now > deadline then raise BudgetExceeded("max time")
+
+#     method check_frontier(size)  // called when a node is added to a frontier
+#         max_frontier_size ← MAX(max_frontier_size, size)
+#         if size > max_frontier then raise BudgetExceeded("max frontier")
+
+#     method record(event, state, ...)  // push, pop, decrease_key, duplicate or reexpansion
+#         counter of event ← counter of event + 1
+#         CALL the callbacks of event with (state, ...)
+
+#     method on(event, callback)
+#         append callback to the callbacks of event  // only a search with callbacks pays for them
+
+# A search without a budget (problem.budget = null) skips all of these calls, so the counters and
+# callbacks cost nothing unless a budget is attached.
+
+
+class BudgetExceeded(Exception):
+    """
+    Raised inside a search when its `SearchBudget` runs out.
+
+    Attributes:
+        reason: Which limit was hit ("max expansions", "max time", "max frontier" or "cancelled").
+    """
+
+    def __init__(self, reason):
+        super().__init__(f"budget exceeded ({reason})")
+        self.reason = reason
+
+
+class CancelToken:
+    """
+    A flag that another thread (or a signal handler) sets to stop a running search cooperatively.
+    """
+
+    def __init__(self):
+        self.event = threading.Event()
+
+    def cancel(self):
+        self.event.set()
+
+    @property
+    def cancelled(self):
+        return self.event.is_set()
+
+
+class SearchBudget:
+    """
+    Limits on how much work a single search may do.
+
+    A budget is attached to a problem (`problem.budget`). The expansion primitives (`expand`,
+    `Problems.successors`, `expand_batch`) charge it once per expanded node, and frontiers built
+    with `budget=problem.budget` check their size on every insertion, so every algorithm honours
+    it without special code. When a limit is hit the search is unwound with `BudgetExceeded`.
+
+    The same calls also count the work done, so a budget without limits is a cheap way to
+    measure a search: the frontiers count their pushes, pops and decrease-keys, and the algorithms
+    count the children they prune as duplicates and the states they expand more than once.
+    Callbacks registered with `on` are called on every event, for tracing; without callbacks an
+    event costs one counter increment.
+
+    Attributes:
+        max_expansions: The maximum number of expanded nodes, or None.
+        max_time: The maximum wall time in seconds, or None.
+        max_frontier: The maximum number of nodes in the frontier, or None.
+        cancel_token: A `CancelToken` that stops the search when cancelled, or None.
+        expansions: The number of nodes expanded since `start`.
+        generated: The number of child nodes generated since `start`.
+        max_frontier_size: The largest frontier size seen since `start`.
+        pushes: The number of nodes added to a frontier since `start`.
+        pops: The number of nodes removed from a frontier since `start`.
+        decrease_keys: The number of frontier entries given a better priority since `start`.
+        duplicates: The number of children pruned because their state was already reached since `start`.
+        reexpansions: The number of expansions of a state that had already been expanded since `start`.
+        callbacks: The callbacks of each event ("expand", "push", "pop", "decrease_key",
+            "duplicate", "reexpansion").
+    """
+
+    # The events that callbacks can be registered for.
+    EVENTS = ("expand", "push", "pop", "decrease_key", "duplicate", "reexpansion")
+
+    def __init__(
+        self, max_expansions=None, max_time=None, max_frontier=None, cancel_token=None
+    ):
+        self.max_expansions = max_expansions
+        self.max_time = max_time
+        self.max_frontier = max_frontier
+        self.cancel_token = cancel_token
+        self.callbacks = {}
+        self.start()
+
+    def start(self):
+        # Reset the counters and start the clock, before each search that uses the budget.
+        self.expansions = 0
+        self.generated = 0
+        self.max_frontier_size = 0
+        self.pushes = 0
+        self.pops = 0
+        self.decrease_keys = 0
+        self.duplicates = 0
+        self.reexpansions = 0
+        self.deadline = (
+            None if self.max_time is None else time.perf_counter() + self.max_time
+        )
+
+    def charge_expansion(self, children=0, state=None):
+        # Count one expanded node (and its children) and stop the search if any limit is exceeded.
+        self.expansions += 1
+        self.generated += children
+        if self.callbacks:
+            self._call("expand", state, children)
+        if self.cancel_token is not None and self.cancel_token.cancelled:
+            raise BudgetExceeded("cancelled")
+        if self.max_expansions is not None and self.expansions > self.max_expansions:
+            raise BudgetExceeded("max expansions")
+        if self.deadline is not None and time.perf_counter() > self.deadline:
+            raise BudgetExceeded("max time")
+
+    def check_frontier(self, size):
+        # Record the frontier size and stop the search if the frontier has grown past its limit.
+        if size > self.max_frontier_size:
+            self.max_frontier_size = size
+        if self.max_frontier is not None and size > self.max_frontier:
+            raise BudgetExceeded("max frontier")
+
+    def record_push(self, size, state=None, priority=None):
+        # Count a node added to a frontier of the given size, and check the frontier limit.
+        self.pushes += 1
+        if self.callbacks:
+            self._call("push", state, priority)
+        self.check_frontier(size)
+
+    def record_pop(self, state=None, priority=None):
+        # Count a node removed from a frontier.
+        self.pops += 1
+        if self.callbacks:
+            self._call("pop", state, priority)
+
+    def record_decrease_key(self, state=None, priority=None):
+        # Count a frontier entry given a better priority.
+        self.decrease_keys += 1
+        if self.callbacks:
+            self._call("decrease_key", state, priority)
+
+    def record_duplicate(self, state=None):
+        # Count a child pruned because its state was already reached (or is on the current path).
+        self.duplicates += 1
+        if self.callbacks:
+            self._call("duplicate", state)
+
+    def record_reexpansion(self, state=None):
+        # Count the expansion of a state that had already been expanded in this search.
+        self.reexpansions += 1
+        if self.callbacks:
+            self._call("reexpansion", state)
+
+    def on(self, event, callback):
+        """
+        Registers a callback for every event of a kind, for tracing.
+
+        The callback gets the state of the event, then its detail: the number of children for
+        "expand", the priority for "push", "pop" and "decrease_key", nothing else otherwise.
+
+        Args:
+            event (str): One of `EVENTS`.
+            callback (function): The function to call.
+        """
+        if event not in self.EVENTS:
+            raise ValueError(f"unknown event {event!r}")
+        self.callbacks.setdefault(event, []).append(callback)
+
+    def _call(self, event, *args):
+        # Call the callbacks of an event.
+        for callback in self.callbacks.get(event, ()):
+            callback(*args)
+
+    def counters(self):
+        """
+        Returns the work counters of the search.
+
+        Returns:
+            dict: The expansions, generated children, duplicates pruned, re-expansions, frontier pushes, pops and
+            decrease-keys, and the largest frontier size.
+        """
+        return {
+            "expansions": self.expansions,
+            "generated": self.generated,
+            "duplicates": self.duplicates,
+            "reexpansions": self.reexpansions,
+            "pushes": self.pushes,
+            "pops": self.pops,
+            "decrease_keys": self.decrease_keys,
+            "max_frontier": self.max_frontier_size,
+        }
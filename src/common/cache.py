@@ -0,0 +1,348 @@
+import hashlib
+import os
+import pickle
+import sqlite3
+import threading
+import weakref
+from array import array
+from collections import OrderedDict
+
+# Result cache
+# Pseudo code
+
+# function GRAPH_FINGERPRINT(problem) returns a string
+#     source ← problem.heuristics, or their SOURCE for a provider (e.g. the landmarks of an ALT heuristic)  // the goal is part of the key
+#     if the fingerprint of (problem.graph, graph.version, source) is not memoised then
+#         h ← BLAKE2B()
+#         UPDATE(h, offsets, targets, weights, source)  // the raw bytes, in fixed types (a provider lists its own)
+#         memo ← HEX(h)
+#     return memo
+
+# class ResultCache
+#     method get(key) returns (found, path)
+#         if key in memory then
+#             count the hit, mark key as used (LRU: most recent, LFU: one more use)
+#             return true, memory[key]
+#         if key in disk then
+#             count the disk hit, copy it into memory
+#             return true, disk[key]
+#         count the miss
+#         return false, null
+
+#     method put(key, path)
+#         memory[key] ← path, bytes ← bytes + SIZE(path)
+#         write key, path to disk (if any)
+#         while bytes > max_bytes do
+#             evict the least recently used (LRU) or least frequently used (LFU) key
+
+#     method key(problem, algorithm) returns a key
+#         key ← (GRAPH_FINGERPRINT(problem), problem.initial, problem.goal, algorithm)
+#         if the graph had another fingerprint before then
+#             remove every key of the old fingerprint from memory  // the graph has changed
+#         return key  // the disk rows of the old fingerprint may still serve other processes
+
+#     method invalidate(fingerprint)
+#         remove every key of the fingerprint from memory and disk
+
+
+# The memoised fingerprints, by graph: {id(source): (source, graph.version, fingerprint)}.
+_fingerprints = weakref.WeakKeyDictionary()
+
+
+def _heuristic_source(heuristics):
+    # What determines the heuristic values: the source of a heuristic provider (shared by the
+    # providers of every goal, e.g. the landmarks of an ALT heuristic), or else the table itself.
+    return getattr(heuristics, "source", heuristics)
+
+
+def _update_hash(h, values, typecode):
+    # Hash a sequence of numbers as raw bytes of one fixed type, so the same graph hashes the
+    # same whether it is backed by lists, arrays or a memory-mapped file.
+    try:
+        view = memoryview(values)
+    except TypeError:
+        view = None
+    if view is None or view.format != typecode:
+        view = memoryview(array(typecode, values))
+    h.update(view.cast("B"))
+
+
+def graph_fingerprint(problem):
+    """
+    Returns a content hash of a problem's graph (edges and weights) and heuristics.
+
+    The hash is computed once per graph, `graph.version` and heuristic table, so a change of the
+    graph (which increments its `version`) or of the heuristics gives a new fingerprint. The
+    heuristic providers of every goal share a fingerprint, computed from their source (e.g. the
+    landmark tables of the ALT heuristics), so hashing never evaluates a computed heuristic.
+
+    Args:
+        problem (Problems): The problem instance.
+
+    Returns:
+        str: The hexadecimal fingerprint.
+    """
+    graph = problem.graph
+    source = _heuristic_source(problem.heuristics)
+    memo = _fingerprints.setdefault(graph, {})
+    entry = memo.get(id(source))
+    if entry is not None and entry[0] is source and entry[1] == graph.version:
+        return entry[2]
+
+    if hasattr(graph, "load_all"):
+        graph.load_all()  # A streaming graph must be complete to be hashed.
+    h = hashlib.blake2b(digest_size=16)
+    _update_hash(h, graph.offsets, "q")
+    _update_hash(h, graph.targets, "i")
+    _update_hash(h, graph.weights, "q")
+    if hasattr(source, "hashed_values"):
+        for values, typecode in source.hashed_values():
+            _update_hash(h, values, typecode)
+    elif source is not None:
+        _update_hash(h, source, "d")
+    fingerprint = h.hexdigest()
+    memo[id(source)] = (source, graph.version, fingerprint)
+    return fingerprint
+
+
+def result_key(problem, algorithm):
+    """
+    Returns the cache key of running an algorithm on a problem.
+
+    Args:
+        problem (Problems): The problem instance.
+        algorithm (function): The search algorithm.
+
+    Returns:
+        tuple: (graph fingerprint, initial state, goal state, algorithm name).
+    """
+    name = f"{algorithm.__module__}.{algorithm.__qualname__}"
+    return graph_fingerprint(problem), problem.initial, problem.goal, name
+
+
+class ResultCache:
+    """
+    A cache of search results (paths), keyed by `result_key`.
+
+    Entries are kept in memory up to `max_bytes` (the size of their pickled form), and evicted in
+    least recently used (`"lru"`) or least frequently used (`"lfu"`, ties broken by recency)
+    order. With a `path`, every entry is also written to an SQLite file that survives the
+    process and is shared by processes, and memory misses are looked up there.
+
+    Keys start with the graph fingerprint, so a changed graph never hits the entries of the old
+    one. `key` drops them from memory when it sees the change; only `invalidate` also removes them
+    from the disk tier, which other processes may still be using for the old graph.
+
+    Attributes:
+        max_bytes: The memory limit in bytes.
+        policy: The eviction policy, "lru" or "lfu".
+        path: The SQLite file of the disk tier, or None.
+        bytes: The size of the entries in memory, in bytes.
+        hits: The number of lookups answered from memory.
+        disk_hits: The number of lookups answered from disk.
+        misses: The number of lookups not answered.
+        evictions: The number of entries evicted from memory.
+    """
+
+    def __init__(self, max_bytes=64 * 1024 * 1024, policy="lru", path=None):
+        if policy not in ("lru", "lfu"):
+            raise ValueError(f"unknown eviction policy {policy!r}")
+        self.max_bytes = max_bytes
+        self.policy = policy
+        self.path = path
+        self.entries = OrderedDict()  # key → (value, size, uses), from least to most recently used
+        self.by_uses = {}  # For LFU: uses → the keys with that many uses, from least to most recently used
+        self.bytes = 0
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = threading.Lock()
+        self._db = None
+        self._db_pid = None
+        self._seen = weakref.WeakKeyDictionary()  # graph → {id(heuristic source): last fingerprint}
+
+    def key(self, problem, algorithm):
+        """
+        Returns the key of running an algorithm on a problem (see `result_key`). If the graph of
+        the problem has changed since its last key, the entries of its old fingerprint are
+        removed from memory first (not from disk, see `invalidate`).
+
+        Args:
+            problem (Problems): The problem instance.
+            algorithm (function): The search algorithm.
+
+        Returns:
+            tuple: (graph fingerprint, initial state, goal state, algorithm name).
+        """
+        key = result_key(problem, algorithm)
+        with self.lock:
+            seen = self._seen.setdefault(problem.graph, {})
+            source = id(_heuristic_source(problem.heuristics))
+            old = seen.get(source)
+            seen[source] = key[0]
+        if old is not None and old != key[0]:
+            with self.lock:
+                self._forget(old)
+        return key
+
+    def _disk(self):
+        # The SQLite connection of this process (a connection cannot be shared after a fork).
+        if self.path is None:
+            return None
+        if self._db is None or self._db_pid != os.getpid():
+            self._db = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS results (fingerprint TEXT, initial INTEGER,"
+                " goal INTEGER, algorithm TEXT, value BLOB,"
+                " PRIMARY KEY (fingerprint, initial, goal, algorithm))"
+            )
+            self._db_pid = os.getpid()
+        return self._db
+
+    def get(self, key):
+        """
+        Looks up a result.
+
+        Args:
+            key (tuple): The key from `result_key`.
+
+        Returns:
+            tuple: (True, value) on a hit, (False, None) on a miss.
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.hits += 1
+                value, size, uses = entry
+                self.entries[key] = (value, size, uses + 1)
+                self.entries.move_to_end(key)
+                self._count_use(key, uses, uses + 1)
+                return True, value
+
+            db = self._disk()
+            if db is not None:
+                row = db.execute(
+                    "SELECT value FROM results WHERE fingerprint = ? AND initial = ?"
+                    " AND goal = ? AND algorithm = ?",
+                    key,
+                ).fetchone()
+                if row is not None:
+                    self.disk_hits += 1
+                    value = pickle.loads(row[0])
+                    self._store(key, value, row[0])
+                    return True, value
+
+            self.misses += 1
+            return False, None
+
+    def put(self, key, value):
+        """
+        Stores a result in memory (evicting others if needed) and on disk.
+
+        Args:
+            key (tuple): The key from `result_key`.
+            value: The result, e.g. a path (list) or None for no path.
+        """
+        data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        with self.lock:
+            self._store(key, value, data)
+            db = self._disk()
+            if db is not None:
+                with db:
+                    db.execute(
+                        "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?)",
+                        (*key, data),
+                    )
+
+    def _store(self, key, value, data):
+        # Keep an entry in memory and evict entries until the memory limit holds again.
+        size = len(data)
+        old = self.entries.get(key)
+        if old is not None:
+            self._remove(key)
+        if size > self.max_bytes:
+            return  # Larger than the whole cache: keep it on disk only.
+        uses = 1 if old is None else old[2]
+        self.entries[key] = (value, size, uses)
+        self._count_use(key, None, uses)
+        self.bytes += size
+        while self.bytes > self.max_bytes:
+            self._remove(self._victim())
+            self.evictions += 1
+
+    def _count_use(self, key, old_uses, uses):
+        # Move a key between the LFU buckets of its old and new number of uses.
+        if self.policy != "lfu":
+            return
+        if old_uses is not None:
+            bucket = self.by_uses[old_uses]
+            del bucket[key]
+            if not bucket:
+                del self.by_uses[old_uses]
+        self.by_uses.setdefault(uses, OrderedDict())[key] = None
+
+    def _remove(self, key):
+        # Remove an entry from memory.
+        _, size, uses = self.entries.pop(key)
+        self.bytes -= size
+        if self.policy == "lfu":
+            bucket = self.by_uses[uses]
+            del bucket[key]
+            if not bucket:
+                del self.by_uses[uses]
+
+    def _victim(self):
+        # The key to evict: the least recently used one, or the least frequently used one (the least
+        # recently used among those on ties).
+        if self.policy == "lru":
+            return next(iter(self.entries))
+        return next(iter(self.by_uses[min(self.by_uses)]))
+
+    def _forget(self, fingerprint):
+        # Remove every entry of a graph fingerprint from memory.
+        for key in [key for key in self.entries if key[0] == fingerprint]:
+            self._remove(key)
+
+    def invalidate(self, fingerprint):
+        """
+        Removes every entry of a graph fingerprint, from memory and disk. The disk tier is shared,
+        so this also removes them for every other process using the same file.
+
+        Args:
+            fingerprint (str): The fingerprint from `graph_fingerprint`.
+        """
+        with self.lock:
+            self._forget(fingerprint)
+            db = self._disk()
+            if db is not None:
+                with db:
+                    db.execute("DELETE FROM results WHERE fingerprint = ?", (fingerprint,))
+
+    def stats(self):
+        """
+        Returns the cache metrics.
+
+        Returns:
+            dict: The number of entries and bytes in memory, the hits (memory and disk), misses, evictions and the
+            hit rate (hits from either tier over all lookups).
+        """
+        with self.lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                "entries": len(self.entries),
+                "bytes": self.bytes,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+            }
+
+    def __getstate__(self):
+        # Pickle the configuration only (e.g. to pass the cache to worker processes): each process
+        # starts with an empty memory tier and its own lock and disk connection.
+        return {"max_bytes": self.max_bytes, "policy": self.policy, "path": self.path}
+
+    def __setstate__(self, state):
+        self.__init__(**state)
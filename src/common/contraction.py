@@ -0,0 +1,318 @@
+import heapq
+import pickle
+from array import array
+from bisect import bisect_left
+from common.graph import CSRGraph
+
+# Contraction Hierarchies (CH)
+# Pseudo code
+
+# Contracting a state v removes it from the graph and adds a shortcut u → w of cost
+# c(u, v) + c(v, w) for every pair of remaining neighbours u → v → w whose shortest path needs v.
+# States are contracted one by one in order of importance (their rank); each one keeps the edges
+# it had to the remaining (higher-ranked) states when it was contracted. A shortest path then
+# always exists that goes up in rank from the initial state and down in rank to the goal.
+
+# function BUILD_HIERARCHY(problem) returns ContractionHierarchy
+#     out, in ← the edges of the graph, as dictionaries per state
+#     queue ← every state v with priority PRIORITY(v)  // each PRIORITY charges problem.budget once
+#     rank ← 0
+#     while queue is not empty do
+#         v ← POP(queue)
+#         if PRIORITY(v) > the lowest priority in queue then
+#             PUSH(queue, v, PRIORITY(v)) and continue  // lazy update: the priority was out of date
+#         for each shortcut u → w of SHORTCUTS(v) do
+#             out[u][w], in[w][u] ← its cost, middle[u → w] ← v
+#         up[v] ← out[v], down[v] ← in[v]  // edges to higher-ranked states, with their middle state
+#         remove v from out and in, rank[v] ← rank, rank ← rank + 1
+#         deleted[x] ← deleted[x] + 1 for every neighbour x of v
+#     return ContractionHierarchy(rank, up, down)
+
+# function SHORTCUTS(v) returns list of shortcuts
+#     for each u → v in in[v] do
+#         limit ← c(u, v) + the largest c(v, w)
+#         distance ← WITNESS_SEARCH(u, limit, without v)  // Dijkstra on the remaining graph, bounded
+#         for each v → w in out[v] with w ≠ u do
+#             if distance[w] > c(u, v) + c(v, w) then
+#                 add shortcut u → w of cost c(u, v) + c(v, w)
+
+# function PRIORITY(v) returns a number
+#     return |SHORTCUTS(v)| - |in[v]| - |out[v]| + deleted[v]  // edge difference, spread out the contraction
+
+
+class ContractionHierarchy:
+    """
+    A contraction hierarchy of a graph: a rank per state and the edges of the augmented graph
+    (original edges plus shortcuts), split by direction of rank.
+
+    `up` holds every edge u → w with rank[u] < rank[w]. `down` holds every edge u → w with
+    rank[u] > rank[w], stored reversed as w → u, so a backward search from the goal also only
+    goes up in rank. A shortcut remembers the state it skips in `up_middle` / `down_middle`
+    (parallel to the edges of `up` / `down`, -1 for an original edge), which is enough to unpack
+    it recursively into original edges.
+
+    Attributes:
+        rank: The contraction order of each state.
+        up: The `CSRGraph` of the upward edges.
+        down: The `CSRGraph` of the downward edges, reversed.
+        up_middle: The skipped state of each edge of `up`, or -1.
+        down_middle: The skipped state of each edge of `down`, or -1.
+        version: The `version` of the graph the hierarchy was built from.
+    """
+
+    def __init__(self, rank, up, down, up_middle, down_middle, version=0):
+        self.rank = rank
+        self.up = up
+        self.down = down
+        self.up_middle = up_middle
+        self.down_middle = down_middle
+        self.version = version
+
+    @property
+    def num_shortcuts(self):
+        # The number of edges of the hierarchy that are shortcuts.
+        return sum(1 for m in self.up_middle if m >= 0) + sum(
+            1 for m in self.down_middle if m >= 0
+        )
+
+    @property
+    def nbytes(self):
+        # The size of the index in memory, in bytes.
+        arrays = [self.rank, self.up_middle, self.down_middle]
+        for graph in (self.up, self.down):
+            arrays += [graph.offsets, graph.targets, graph.weights]
+        return sum(len(a) * a.itemsize for a in arrays)
+
+    @classmethod
+    def build(cls, problem, witness_limit=64):
+        """
+        Orders the states by edge difference and contracts them one by one, adding shortcuts.
+
+        Each witness search (a Dijkstra that looks for a path u → w avoiding the contracted state)
+        settles at most `witness_limit` states. A search cut short only adds a shortcut that was
+        not needed, so the limit trades index size for preprocessing time, never correctness.
+
+        Every computation of the shortcuts of a state (for its first priority, then each time it
+        is taken from the queue) charges `problem.budget` as one expansion, with the shortcuts as
+        children, so a build under a time or expansion limit stops with `BudgetExceeded` like a
+        search.
+
+        Args:
+            problem (Problems): The problem whose graph is preprocessed.
+            witness_limit (int): The largest number of states settled by one witness search.
+
+        Returns:
+            ContractionHierarchy: The hierarchy of the graph.
+        """
+        graph = problem.graph
+        if hasattr(graph, "load_all"):
+            graph.load_all()  # A streaming graph must be complete to be contracted.
+        num_nodes = graph.num_nodes
+
+        # The remaining graph (original edges and shortcuts), with the cheapest of parallel edges.
+        out_edges = [{} for _ in range(num_nodes)]
+        in_edges = [{} for _ in range(num_nodes)]
+        for u in range(num_nodes):
+            for w, cost in zip(graph.neighbors(u), graph.edge_weights(u)):
+                if w != u and cost < out_edges[u].get(w, float("inf")):
+                    out_edges[u][w] = cost
+                    in_edges[w][u] = cost
+        middle = {}  # (u, w) → the state skipped by the shortcut u → w
+
+        def shortcuts(v):
+            # The shortcuts needed to contract v, as (u, w, cost) triples.
+            found = []
+            if not out_edges[v]:
+                return found
+            largest = max(out_edges[v].values())
+            for u, in_cost in in_edges[v].items():
+                distance = _witness_search(
+                    out_edges, u, v, in_cost + largest, witness_limit
+                )
+                for w, out_cost in out_edges[v].items():
+                    if w != u and distance.get(w, float("inf")) > in_cost + out_cost:
+                        found.append((u, w, in_cost + out_cost))
+            return found
+
+        deleted = array("i", [0]) * num_nodes
+        budget = problem.budget
+
+        def priority(v, found):
+            # Edge difference plus the number of contracted neighbours.
+            return len(found) - len(in_edges[v]) - len(out_edges[v]) + deleted[v]
+
+        queue = []
+        for v in range(num_nodes):
+            found = shortcuts(v)
+            if budget is not None:
+                budget.charge_expansion(len(found), v)
+            queue.append((priority(v, found), v))
+        heapq.heapify(queue)
+        rank = array("i", [0]) * num_nodes
+        up_edges = [None] * num_nodes
+        down_edges = [None] * num_nodes
+        next_rank = 0
+        while queue:
+            _, v = heapq.heappop(queue)
+            # Lazy update: contract v only if it is still the least important state.
+            found = shortcuts(v)
+            if budget is not None:
+                budget.charge_expansion(len(found), v)
+            current = priority(v, found)
+            if queue and current > queue[0][0]:
+                heapq.heappush(queue, (current, v))
+                continue
+
+            for u, w, cost in found:
+                if cost < out_edges[u].get(w, float("inf")):
+                    out_edges[u][w] = cost
+                    in_edges[w][u] = cost
+                    middle[(u, w)] = v
+
+            # Freeze the edges of v: every remaining neighbour has a higher rank.
+            up_edges[v] = [(w, cost, middle.pop((v, w), -1)) for w, cost in out_edges[v].items()]
+            down_edges[v] = [(u, cost, middle.pop((u, v), -1)) for u, cost in in_edges[v].items()]
+            for w in out_edges[v]:
+                del in_edges[w][v]
+                deleted[w] += 1
+            for u in in_edges[v]:
+                del out_edges[u][v]
+                deleted[u] += 1
+            out_edges[v] = in_edges[v] = None
+            rank[v] = next_rank
+            next_rank += 1
+
+        up, up_middle = _frozen_graph(up_edges)
+        down, down_middle = _frozen_graph(down_edges)
+        return cls(rank, up, down, up_middle, down_middle, graph.version)
+
+    def middle(self, s, s_prime):
+        """
+        Returns the state skipped by the edge s → s_prime of the hierarchy.
+
+        Args:
+            s (int): The source of the edge.
+            s_prime (int): The target of the edge.
+
+        Returns:
+            int: The skipped state, or -1 if the edge is an original edge.
+        """
+        if self.rank[s] < self.rank[s_prime]:
+            graph, middles, u, w = self.up, self.up_middle, s, s_prime
+        else:
+            graph, middles, u, w = self.down, self.down_middle, s_prime, s
+        lo, hi = graph.offsets[u], graph.offsets[u + 1]
+        return middles[bisect_left(graph.targets, w, lo, hi)]
+
+    def unpack(self, path):
+        """
+        Replaces every shortcut of a path by the original edges it stands for.
+
+        Args:
+            path (list): A path of the hierarchy.
+
+        Returns:
+            list: The same path in the original graph.
+        """
+        if not path:
+            return path
+        unpacked = [path[0]]
+        # The edges still to unpack, the next one on top.
+        stack = [(s, s_prime) for s, s_prime in zip(path[-2::-1], path[:0:-1])]
+        while stack:
+            s, s_prime = stack.pop()
+            v = self.middle(s, s_prime)
+            if v < 0:
+                unpacked.append(s_prime)
+            else:
+                stack.append((v, s_prime))
+                stack.append((s, v))
+        return unpacked
+
+    def save(self, file_path):
+        """
+        Saves the hierarchy (the augmented graph with its ranks and shortcuts).
+
+        Args:
+            file_path (str): Path to the file to write.
+        """
+        arrays = {
+            "rank": self.rank,
+            "up_middle": self.up_middle,
+            "down_middle": self.down_middle,
+        }
+        for name, graph in (("up", self.up), ("down", self.down)):
+            arrays[f"{name}_offsets"] = graph.offsets
+            arrays[f"{name}_targets"] = graph.targets
+            arrays[f"{name}_weights"] = graph.weights
+        state = {
+            "version": self.version,
+            "arrays": {name: (a.typecode, a.tobytes()) for name, a in arrays.items()},
+        }
+        with open(file_path, "wb") as file:
+            pickle.dump(state, file, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def load(cls, file_path):
+        """
+        Loads a hierarchy saved by `save`.
+
+        Args:
+            file_path (str): Path to the saved hierarchy.
+
+        Returns:
+            ContractionHierarchy: The hierarchy.
+        """
+        with open(file_path, "rb") as file:
+            state = pickle.load(file)
+        arrays = {
+            name: array(typecode, data) for name, (typecode, data) in state["arrays"].items()
+        }
+        up = CSRGraph(arrays["up_offsets"], arrays["up_targets"], arrays["up_weights"])
+        down = CSRGraph(arrays["down_offsets"], arrays["down_targets"], arrays["down_weights"])
+        return cls(
+            arrays["rank"],
+            up,
+            down,
+            arrays["up_middle"],
+            arrays["down_middle"],
+            state["version"],
+        )
+
+
+def _witness_search(out_edges, source, excluded, limit, max_settled):
+    # Dijkstra from the source on the remaining graph without the excluded state. Stops past the
+    # cost limit or after max_settled states; the distances found are upper bounds either way.
+    distance = {source: 0}
+    heap = [(0, source)]
+    settled = 0
+    while heap and settled < max_settled:
+        d, s = heapq.heappop(heap)
+        if d > limit:
+            break
+        if d > distance[s]:
+            continue  # Outdated entry.
+        settled += 1
+        for s_prime, cost in out_edges[s].items():
+            if s_prime == excluded:
+                continue
+            path_cost = d + cost
+            if path_cost < distance.get(s_prime, float("inf")):
+                distance[s_prime] = path_cost
+                heapq.heappush(heap, (path_cost, s_prime))
+    return distance
+
+
+def _frozen_graph(edges):
+    # Build a CSRGraph (and the parallel array of middle states) from per-state edge lists.
+    offsets = array("q", [0])
+    targets = array("i")
+    weights = array("q")
+    middles = array("i")
+    for state_edges in edges:
+        for target, cost, middle in sorted(state_edges):
+            targets.append(target)
+            weights.append(cost)
+            middles.append(middle)
+        offsets.append(len(targets))
+    return CSRGraph(offsets, targets, weights), middles
@@ -1,15 +1,21 @@
+from collections import deque
+
 # Stack Frontier is for Depth - First Search (DFS)
 # Pseudo code
 
 # class StackFrontier
-#     method __init__()
-#         frontier ← empty list
+#     method __init__(budget)
+#         frontier ← empty deque
+#         counts ← empty dictionary  // state → number of nodes with that state in frontier
+#         self.budget ← budget  // optional SearchBudget with a frontier size limit
 
 #     method add(node)
-#         append node to frontier
+#         append node to the right end of frontier
+#         counts[node.state] ← counts[node.state] + 1
+#         RECORD_PUSH(budget, length of frontier)  // counts the push and checks the size limit
 
 #     method contains_state(state) returns boolean
-#         return any node.state == state for each node in frontier
+#         return state in counts
 
 #     method empty() returns boolean
 #         return length of frontier == 0
@@ -18,30 +24,43 @@
 #         if empty()
 #             raise Exception("empty frontier")
 #         else
-#             node ← last element in frontier
-#             remove last element from frontier
+#             node ← pop the right end of frontier
+#             counts[node.state] ← counts[node.state] - 1, delete the key when it reaches 0
+#             RECORD_POP(budget)
 #             return node
 
 
 class StackFrontier:
-    def __init__(self):
-        # Initialize an empty list to serve as the stack (frontier)
-        self.frontier = []
+    def __init__(self, budget=None):
+        # Initialize an empty deque to serve as the stack (frontier)
+        self.frontier = deque()
+        # The search budget that counts the adds and removes and limits the size, or None.
+        self.budget = budget
+        # Count the nodes of each state in the frontier, so membership tests do not scan it.
+        # A count (instead of a plain set) is needed because tree search can hold one state several times.
+        self.counts = {}
 
     def add(self, node):
         # Add a node to the frontier (stack). In a stack, this is equivalent to a push operation.
         self.frontier.append(node)
+        self.counts[node.state] = self.counts.get(node.state, 0) + 1
+        if self.budget is not None:
+            self.budget.record_push(len(self.frontier), node.state)
 
     def contains_state(self, state):
         # Check if a state is already in the frontier.
         # This method returns True if any node in the frontier has the same state as the given state, otherwise False.
-        return any(node.state == state for node in self.frontier)
+        return state in self.counts
 
     def empty(self):
         # Check if the frontier is empty.
         # This method returns True if the frontier is empty, otherwise False.
         return len(self.frontier) == 0
 
+    def _pop(self):
+        # Take the next node out of the deque. In a stack, this is the last node that was added (LIFO order).
+        return self.frontier.pop()
+
     # Define the function that removes a node from the frontier and returns it.
     def remove(self):
         # Remove and return a node from the frontier (stack). In a stack, this is equivalent to a pop operation.
@@ -51,8 +70,15 @@ class StackFrontier:
         if self.empty():
             raise Exception("empty frontier")
         else:
-            # Pop the last node from the list (stack) and return it.
-            node = self.frontier.pop()
+            # Pop the node and forget its state once no other node in the frontier holds it.
+            node = self._pop()
+            count = self.counts[node.state] - 1
+            if count:
+                self.counts[node.state] = count
+            else:
+                del self.counts[node.state]
+            if self.budget is not None:
+                self.budget.record_pop(node.state)
             return node
 
 
@@ -64,20 +90,181 @@ class StackFrontier:
 #         if empty()
 #             raise Exception("empty frontier")
 #         else
-#             node ← first element in frontier
-#             remove first element from frontier
+#             node ← pop the left end of frontier
+#             counts[node.state] ← counts[node.state] - 1, delete the key when it reaches 0
+#             RECORD_POP(budget)
 #             return node
 
 
 class QueueFrontier(StackFrontier):
-    # Define the function that removes a node from the frontier and returns it.
-    def remove(self):
-        # Terminate the search if the frontier is empty, because this means that there is no solution.
+    def _pop(self):
+        # Take the oldest node (which was the first one to be added) from the left end of the deque in O(1).
+        return self.frontier.popleft()
+
+
+# Indexed Priority Queue is for Uniform - Cost Search (UCS), Greedy Best - First Search (GBFS) and A*
+# Pseudo code
+
+# class IndexedPriorityQueue
+#     method __init__(budget)
+#         heap ← empty binary min-heap of entries (priority, order, state, item)
+#         position ← empty dictionary  // state → index of its entry in heap
+#         self.budget ← budget
+
+#     method push(state, priority, item)
+#         append (priority, order, state, item) to heap, position[state] ← last index
+#         SIFT_UP(position[state])
+#         RECORD_PUSH(budget, length of heap)
+
+#     method decrease_key(state, priority, item)
+#         entry ← heap[position[state]]
+#         entry.priority ← priority, entry.item ← item
+#         SIFT_UP(position[state])
+#         RECORD_DECREASE_KEY(budget)
+
+#     method contains(state) returns boolean
+#         return state in position
+
+#     method remove(state) returns (priority, item)
+#         move the last entry into the slot of state, SIFT_UP or SIFT_DOWN it  // any entry, not only the top
+
+#     method pop() returns (priority, item)
+#         if empty()
+#             raise Exception("empty frontier")
+#         swap heap[0] with the last entry, remove the last entry and its position
+#         SIFT_DOWN(0)
+#         RECORD_POP(budget)
+#         return (priority, item) of the removed entry
+
+
+class IndexedPriorityQueue:
+    """
+    A binary min-heap that holds at most one entry per state.
+
+    Every state in the heap is indexed by its position, so a better path to a state already in
+    the frontier lowers the priority of its existing entry (`decrease_key`) instead of pushing a
+    second, stale entry. The heap size is therefore bounded by the number of states, and a state
+    is never popped twice for the same path.
+
+    Entries with equal priority are popped in insertion order.
+    """
+
+    def __init__(self, budget=None):
+        self.heap = []  # Entries [priority, order, state, item].
+        self.position = {}  # state → index of its entry in the heap.
+        self.counter = 0  # Insertion order, used to break ties between equal priorities.
+        self.budget = budget  # The search budget that counts the heap operations and limits the size, or None.
+
+    def __len__(self):
+        return len(self.heap)
+
+    def empty(self):
+        # Check if the frontier is empty.
+        return len(self.heap) == 0
+
+    def contains(self, state):
+        # Check if a state has a live entry in the frontier in O(1).
+        return state in self.position
+
+    def peek(self):
+        # Return the (priority, item) pair with the lowest priority without removing it.
+        if self.empty():
+            raise Exception("empty frontier")
+        entry = self.heap[0]
+        return entry[0], entry[3]
+
+    def priority(self, state):
+        # Return the current priority of a state in the frontier.
+        return self.heap[self.position[state]][0]
+
+    def push(self, state, priority, item=None):
+        # Add a new state to the frontier. Use decrease_key for a state that is already in it.
+        if state in self.position:
+            raise KeyError(f"state {state} is already in the frontier")
+        self.heap.append([priority, self.counter, state, item])
+        self.counter += 1
+        self.position[state] = len(self.heap) - 1
+        self._sift_up(len(self.heap) - 1)
+        if self.budget is not None:
+            self.budget.record_push(len(self.heap), state, priority)
+
+    def decrease_key(self, state, priority, item=None):
+        # Give a state in the frontier a lower priority (and the node of its better path).
+        i = self.position[state]
+        entry = self.heap[i]
+        if priority > entry[0]:
+            raise ValueError(f"new priority {priority} is higher than {entry[0]}")
+        entry[0] = priority
+        entry[3] = item
+        self._sift_up(i)
+        if self.budget is not None:
+            self.budget.record_decrease_key(state, priority)
+
+    def remove(self, state):
+        # Remove the entry of any state in the frontier and return its (priority, item) pair.
+        i = self.position.pop(state)
+        entry = self.heap[i]
+        last = self.heap.pop()
+        if i < len(self.heap):
+            self.heap[i] = last
+            self.position[last[2]] = i
+            self._sift_up(i)
+            self._sift_down(self.position[last[2]])
+        return entry[0], entry[3]
+
+    def pop(self):
+        # Remove and return the (priority, item) pair with the lowest priority.
         if self.empty():
             raise Exception("empty frontier")
+        last = self.heap.pop()
+        if self.heap:
+            entry = self.heap[0]
+            self.heap[0] = last
+            self.position[last[2]] = 0
+            self._sift_down(0)
         else:
-            # Save the oldest item on the list (which was the first one to be added)
-            node = self.frontier[0]
-            # Save all the items on the list besides the first one (i.e. removing the first node)
-            self.frontier = self.frontier[1:]
-            return node
+            entry = last
+        del self.position[entry[2]]
+        if self.budget is not None:
+            self.budget.record_pop(entry[2], entry[0])
+        return entry[0], entry[3]
+
+    def _sift_up(self, i):
+        # Move the entry at index i towards the root until its parent is not larger.
+        heap, position = self.heap, self.position
+        entry = heap[i]
+        key = (entry[0], entry[1])
+        while i > 0:
+            parent_index = (i - 1) >> 1
+            parent = heap[parent_index]
+            if key >= (parent[0], parent[1]):
+                break
+            heap[i] = parent
+            position[parent[2]] = i
+            i = parent_index
+        heap[i] = entry
+        position[entry[2]] = i
+
+    def _sift_down(self, i):
+        # Move the entry at index i towards the leaves until no child is smaller.
+        heap, position = self.heap, self.position
+        size = len(heap)
+        entry = heap[i]
+        key = (entry[0], entry[1])
+        while True:
+            child_index = 2 * i + 1
+            if child_index >= size:
+                break
+            child = heap[child_index]
+            right_index = child_index + 1
+            if right_index < size:
+                right = heap[right_index]
+                if (right[0], right[1]) < (child[0], child[1]):
+                    child_index, child = right_index, right
+            if key <= (child[0], child[1]):
+                break
+            heap[i] = child
+            position[child[2]] = i
+            i = child_index
+        heap[i] = entry
+        position[entry[2]] = i
@@ -0,0 +1,243 @@
+import heapq
+import math
+import random
+from common.graph import CSRGraph
+from common.heuristics import CoordinateHeuristic
+from common.problem import Problems
+
+# Synthetic graph generators
+# Every generator returns a Problems instance with a CSRGraph (so sizes up to 10^6 nodes fit in memory)
+# and integer heuristics that are admissible and consistent:
+#     h(goal) = 0 and h(u) ≤ cost(u, v) + h(v) for every edge u → v
+
+# Pseudo code
+# function BUILD_PROBLEM(num_nodes, edges, start, goal, heuristics) returns Problems
+#     rows ← for each state, its (neighbor, weight) pairs sorted by neighbor
+#     return Problems(initial=start, goal=goal, heuristics=heuristics, graph=CSRGraph.FROM_ROWS(rows))
+
+
+def _build_problem(adjacency, start, goal, heuristics):
+    # Turn per-state lists of (neighbor, weight) pairs into a problem backed by a CSRGraph.
+    def rows():
+        for edges in adjacency:
+            edges.sort()
+            yield [v for v, _ in edges], [w for _, w in edges]
+
+    graph = CSRGraph.from_rows(rows())
+    return Problems(initial=start, goal=goal, heuristics=heuristics, graph=graph)
+
+
+def _add_undirected(adjacency, u, v, weight):
+    adjacency[u].append((v, weight))
+    adjacency[v].append((u, weight))
+
+
+def _largest_component(adjacency):
+    # The states of the largest connected component of an undirected graph.
+    component_of = [-1] * len(adjacency)
+    largest = []
+    for root in range(len(adjacency)):
+        if component_of[root] != -1:
+            continue
+        component_of[root] = root
+        members = [root]
+        for u in members:  # The list grows while it is walked (breadth-first).
+            for v, _ in adjacency[u]:
+                if component_of[v] == -1:
+                    component_of[v] = root
+                    members.append(v)
+        if len(members) > len(largest):
+            largest = members
+    return largest
+
+
+def _scaled_distances_to(goal, adjacency, factor):
+    # Exact distances to the goal (Dijkstra on the reversed edges), scaled down by `factor` ≤ 1.
+    # floor(factor * d) keeps h consistent: d(u) ≤ w + d(v) gives floor(factor * d(u)) ≤ w + floor(factor * d(v)).
+    reverse = [[] for _ in adjacency]
+    for u, edges in enumerate(adjacency):
+        for v, w in edges:
+            reverse[v].append((u, w))
+
+    distances = [math.inf] * len(adjacency)
+    distances[goal] = 0
+    heap = [(0, goal)]
+    while heap:
+        d, v = heapq.heappop(heap)
+        if d > distances[v]:
+            continue
+        for u, w in reverse[v]:
+            if d + w < distances[u]:
+                distances[u] = d + w
+                heapq.heappush(heap, (d + w, u))
+
+    # States that cannot reach the goal get 0, which never overestimates.
+    return [0 if d == math.inf else int(factor * d) for d in distances]
+
+
+def grid_graph(width, height, max_weight=10, seed=0):
+    """
+    A 4-connected grid with random edge weights in [1, max_weight], from one corner to the opposite one.
+
+    The heuristic is the Manhattan distance to the goal (a `CoordinateHeuristic`, so queries to
+    any other goal get theirs), which is consistent because every step changes it by exactly 1
+    and costs at least 1.
+
+    Args:
+        width (int): The number of columns.
+        height (int): The number of rows.
+        max_weight (int): The largest edge weight.
+        seed (int): The random seed.
+
+    Returns:
+        Problems: The grid problem.
+    """
+    rng = random.Random(seed)
+    adjacency = [[] for _ in range(width * height)]
+    for y in range(height):
+        for x in range(width):
+            u = y * width + x
+            if x + 1 < width:
+                _add_undirected(adjacency, u, u + 1, rng.randint(1, max_weight))
+            if y + 1 < height:
+                _add_undirected(adjacency, u, u + width, rng.randint(1, max_weight))
+
+    cells = [(u % width, u // width) for u in range(width * height)]
+    heuristics = CoordinateHeuristic(cells, width * height - 1, metric="manhattan")
+    return _build_problem(adjacency, 0, width * height - 1, heuristics)
+
+
+def random_geometric_graph(num_nodes, degree=6, scale=1000, seed=0):
+    """
+    Random points in the unit square, with an edge between every two points closer than a radius
+    chosen to give about `degree` neighbours per node, from the point nearest (0, 0) to the point
+    nearest (1, 1).
+
+    Edge weights are `ceil(scale * distance)` and the heuristic is `floor(scale * distance to goal)`
+    (a `CoordinateHeuristic`, so queries to any other goal get theirs), which is consistent by the
+    triangle inequality. The start and goal are taken from the largest
+    connected component.
+
+    Args:
+        num_nodes (int): The number of points.
+        degree (int): The expected average degree.
+        scale (int): The factor from Euclidean distance to integer weight.
+        seed (int): The random seed.
+
+    Returns:
+        Problems: The random geometric problem.
+    """
+    rng = random.Random(seed)
+    points = [(rng.random(), rng.random()) for _ in range(num_nodes)]
+    radius = math.sqrt(degree / (math.pi * num_nodes))
+
+    # Bucket the points into cells of side `radius`, so only neighbouring cells are compared.
+    cells = {}
+    for u, (x, y) in enumerate(points):
+        cells.setdefault((int(x / radius), int(y / radius)), []).append(u)
+
+    adjacency = [[] for _ in range(num_nodes)]
+    for (cx, cy), members in cells.items():
+        for dx, dy in ((0, 0), (1, -1), (1, 0), (1, 1), (0, 1)):  # Each pair of cells once.
+            others = cells.get((cx + dx, cy + dy))
+            if others is None:
+                continue
+            for i, u in enumerate(members):
+                candidates = members[i + 1 :] if (dx, dy) == (0, 0) else others
+                for v in candidates:
+                    distance = math.dist(points[u], points[v])
+                    if distance <= radius:
+                        _add_undirected(
+                            adjacency, u, v, max(1, math.ceil(scale * distance))
+                        )
+
+    # Pick the start and goal inside the largest connected component, so a path exists.
+    component = _largest_component(adjacency)
+    start = min(component, key=lambda u: math.dist(points[u], (0, 0)))
+    goal = min(component, key=lambda u: math.dist(points[u], (1, 1)))
+    heuristics = CoordinateHeuristic(points, goal, metric="euclidean", scale=scale)
+    return _build_problem(adjacency, start, goal, heuristics)
+
+
+def scale_free_graph(num_nodes, edges_per_node=2, max_weight=10, factor=0.8, seed=0):
+    """
+    A Barabási-Albert preferential-attachment graph (a few hubs, many low-degree nodes) with random
+    edge weights, from the first node to the last one.
+
+    There are no coordinates, so the heuristic is `factor` times the exact distance to the goal,
+    rounded down, which is admissible and consistent for any `factor` ≤ 1.
+
+    Args:
+        num_nodes (int): The number of nodes.
+        edges_per_node (int): The number of edges each new node attaches with.
+        max_weight (int): The largest edge weight.
+        factor (float): How much of the true distance the heuristic reveals, in [0, 1].
+        seed (int): The random seed.
+
+    Returns:
+        Problems: The scale-free problem.
+    """
+    rng = random.Random(seed)
+    adjacency = [[] for _ in range(num_nodes)]
+    # Every node appears in `endpoints` once per incident edge, so sampling it is degree-proportional.
+    endpoints = []
+    seed_size = min(num_nodes, edges_per_node + 1)
+    for u in range(seed_size):
+        for v in range(u + 1, seed_size):
+            _add_undirected(adjacency, u, v, rng.randint(1, max_weight))
+            endpoints += (u, v)
+    for u in range(seed_size, num_nodes):
+        targets = set()
+        while len(targets) < edges_per_node:
+            targets.add(rng.choice(endpoints))
+        for v in targets:
+            _add_undirected(adjacency, u, v, rng.randint(1, max_weight))
+            endpoints += (u, v)
+
+    goal = num_nodes - 1
+    heuristics = _scaled_distances_to(goal, adjacency, factor)
+    return _build_problem(adjacency, 0, goal, heuristics)
+
+
+def chain_graph(num_nodes, skip_probability=0.1, max_weight=10, factor=0.8, seed=0):
+    """
+    A long directed chain 0 → 1 → ... → n-1 with occasional forward skips and back edges,
+    the worst case for depth and path length.
+
+    The heuristic is `factor` times the exact distance to the goal, rounded down.
+
+    Args:
+        num_nodes (int): The number of nodes.
+        skip_probability (float): The chance of each node getting an extra skip edge and back edge.
+        max_weight (int): The largest edge weight.
+        factor (float): How much of the true distance the heuristic reveals, in [0, 1].
+        seed (int): The random seed.
+
+    Returns:
+        Problems: The chain problem.
+    """
+    rng = random.Random(seed)
+    adjacency = [[] for _ in range(num_nodes)]
+    for u in range(num_nodes - 1):
+        adjacency[u].append((u + 1, rng.randint(1, max_weight)))
+        if rng.random() < skip_probability:
+            v = rng.randint(u + 2, u + 10)
+            if v < num_nodes:
+                adjacency[u].append((v, rng.randint(1, max_weight * 5)))
+        if u > 0 and rng.random() < skip_probability:
+            adjacency[u].append((rng.randint(max(0, u - 10), u - 1), rng.randint(1, max_weight)))
+
+    goal = num_nodes - 1
+    heuristics = _scaled_distances_to(goal, adjacency, factor)
+    return _build_problem(adjacency, 0, goal, heuristics)
+
+
+# The generator families by name. Each takes the number of nodes and a seed.
+GENERATORS = {
+    "grid": lambda num_nodes, seed=0: grid_graph(
+        math.isqrt(num_nodes), math.isqrt(num_nodes), seed=seed
+    ),
+    "geometric": lambda num_nodes, seed=0: random_geometric_graph(num_nodes, seed=seed),
+    "scale-free": lambda num_nodes, seed=0: scale_free_graph(num_nodes, seed=seed),
+    "chain": lambda num_nodes, seed=0: chain_graph(num_nodes, seed=seed),
+}
@@ -0,0 +1,327 @@
+from array import array
+from bisect import bisect_left
+
+# Compressed Sparse Row (CSR) graph
+# Pseudo code
+
+# class CSRGraph
+#     method __init__(offsets, targets, weights)
+#         self.offsets ← offsets      // offsets[s] .. offsets[s + 1] is the edge range of s
+#         self.targets ← targets      // the neighbour of every edge, sorted inside each range
+#         self.weights ← weights      // the weight of every edge, parallel to targets
+#         self.version ← 0            // incremented by every change of the edges
+
+#     method neighbors(state) returns list of states
+#         return targets[offsets[state] : offsets[state + 1]]
+
+#     method weight(s, s_prime) returns cost
+#         i ← BINARY_SEARCH(targets, s_prime) inside the range of s
+#         if i is found then
+#             return weights[i]
+#         return 0
+
+#     method update_weights(changes) returns list of (s, s_prime, old, new)
+#         for each (s, s_prime, new) in changes do  // new = 0 removes the edge, like an empty matrix cell
+#             old ← WEIGHT(s, s_prime)
+#             if the edge exists and new > 0 then weights[i] ← new  // in place, the common case
+#             else insert or delete the edge in the range of s  // into new arrays, copied once for the batch
+#         shift the offsets of the states after each inserted or deleted edge
+#         version ← version + 1
+#         return the changes with their old weights
+
+#     method transpose() returns CSRGraph
+#         counts ← number of edges into each state
+#         offsets ← prefix sums of counts
+#         for each edge s → t with weight w, in increasing s do
+#             place (s, w) in the next free slot of the range of t
+#         return CSRGraph(offsets, targets, weights)  // every edge reversed, ranges still sorted
+
+#     function FROM_ADJACENCY_MATRIX(adjacency_matrix) returns CSRGraph
+#         for each row in adjacency_matrix do
+#             append (index, value) of every value > 0 in row to targets / weights
+#             append length of targets to offsets
+#         return CSRGraph(offsets, targets, weights)
+
+
+class CSRGraph:
+    """
+    A directed, weighted graph stored in compressed sparse row (CSR) form.
+
+    The outgoing edges of state `s` live at positions `offsets[s]` up to (but not including)
+    `offsets[s + 1]` of the `targets` and `weights` arrays, with targets sorted in increasing
+    order inside each range. Memory is O(V + E) instead of the O(V^2) of a dense matrix, and
+    listing the neighbours of a state is O(degree) instead of O(V).
+
+    Any sequence of integers can back the three arrays (`array.array`, `memoryview`, ...),
+    so the same class serves graphs built in memory and graphs mapped from disk.
+
+    Attributes:
+        offsets: Sequence of length `num_nodes + 1` with the start of each state's edge range.
+        targets: Sequence of length `num_edges` with the neighbour of each edge.
+        weights: Sequence of length `num_edges` with the cost of each edge.
+        version: Incremented by every change of the edges or weights, so that anything derived
+            from the graph (e.g. cached results) can tell that it is out of date.
+    """
+
+    def __init__(self, offsets, targets, weights):
+        self.offsets = offsets
+        self.targets = targets
+        self.weights = weights
+        self.version = 0
+
+    @property
+    def num_nodes(self):
+        return len(self.offsets) - 1
+
+    @property
+    def num_edges(self):
+        return len(self.targets)
+
+    def degree(self, state):
+        return self.offsets[state + 1] - self.offsets[state]
+
+    def neighbors(self, state):
+        # The neighbours of a state are one contiguous, already sorted slice of `targets`.
+        return self.targets[self.offsets[state] : self.offsets[state + 1]]
+
+    def edge_weights(self, state):
+        # The weights of the outgoing edges of a state, parallel to `neighbors(state)`.
+        return self.weights[self.offsets[state] : self.offsets[state + 1]]
+
+    def weight(self, s, s_prime):
+        # Binary search for s_prime inside the (sorted) edge range of s.
+        lo, hi = self.offsets[s], self.offsets[s + 1]
+        i = bisect_left(self.targets, s_prime, lo, hi)
+        if i < hi and self.targets[i] == s_prime:
+            return self.weights[i]
+        # A missing edge has weight 0, exactly like an empty cell of the adjacency matrix.
+        return 0
+
+    def update_weights(self, changes):
+        """
+        Changes the weights of a batch of edges in place, and increments `version`.
+
+        A change of an existing edge writes its weight; a new edge (weight > 0 where there was
+        none) or a removed one (weight 0) changes the number of edges, so the batch builds new
+        `offsets`, `targets` and `weights` arrays in one copy instead of resizing the old ones,
+        which may be shared (NumPy views of `graph_arrays`, a memory-mapped graph file). Arrays
+        that cannot be written are copied into memory first.
+
+        Args:
+            changes (iterable): (s, s_prime, weight) triples; a weight of 0 removes the edge. When an edge
+                appears more than once, its last weight is kept.
+
+        Returns:
+            list: The (s, s_prime, old weight, new weight) of every edge whose weight changed (0 for no edge).
+        """
+        batch = {}
+        for s, s_prime, weight in changes:
+            batch[(s, s_prime)] = weight
+        applied = []
+        structural = []
+        for (s, s_prime), weight in batch.items():
+            old = self.weight(s, s_prime)
+            if old == weight:
+                continue
+            applied.append((s, s_prime, old, weight))
+            if old > 0 and weight > 0:
+                continue
+            structural.append((s, s_prime, weight))
+        if not applied:
+            return applied
+
+        if not isinstance(self.weights, array):
+            self.weights = array("q", self.weights)  # Copy on first write.
+        for s, s_prime, old, weight in applied:
+            if old > 0 and weight > 0:
+                lo, hi = self.offsets[s], self.offsets[s + 1]
+                self.weights[bisect_left(self.targets, s_prime, lo, hi)] = weight
+
+        if structural:
+            # Copy the edges between the changed slots, from the first edge to the last.
+            targets, weights = array("i"), array("q")
+            offsets = array("q", self.offsets)
+            copied = 0  # The next slot of the old arrays to copy.
+            shift = {}  # The number of edges added to the range of each state.
+            for s, s_prime, weight in sorted(structural):
+                i = bisect_left(self.targets, s_prime, self.offsets[s], self.offsets[s + 1])
+                targets.extend(self.targets[copied:i])
+                weights.extend(self.weights[copied:i])
+                if weight > 0:
+                    targets.append(s_prime)
+                    weights.append(weight)
+                    copied = i
+                else:
+                    copied = i + 1  # Skip the removed edge.
+                shift[s] = shift.get(s, 0) + (1 if weight > 0 else -1)
+            total = 0
+            for state in range(min(shift), self.num_nodes):
+                total += shift.get(state, 0)
+                offsets[state + 1] += total
+            targets.extend(self.targets[copied:])
+            weights.extend(self.weights[copied:])
+            self.offsets, self.targets, self.weights = offsets, targets, weights
+
+        self.version += 1
+        return applied
+
+    def transpose(self):
+        """
+        Builds the reverse graph, where every edge s -> t of weight w becomes t -> s of weight w.
+
+        Runs in O(V + E). Edges are placed in increasing order of their source, so the neighbour
+        ranges of the result are sorted as well.
+
+        Returns:
+            CSRGraph: The reverse graph.
+        """
+        num_nodes = self.num_nodes
+        counts = array("q", [0]) * (num_nodes + 1)
+        for s in range(num_nodes):
+            for t in self.neighbors(s):
+                counts[t + 1] += 1
+
+        offsets = array("q", [0]) * (num_nodes + 1)
+        for state in range(num_nodes):
+            offsets[state + 1] = offsets[state] + counts[state + 1]
+
+        targets = array("i", [0]) * self.num_edges
+        weights = array("q", [0]) * self.num_edges
+        position = array("q", offsets[:num_nodes])  # The next free slot of each range.
+        for s in range(num_nodes):
+            for t, w in zip(self.neighbors(s), self.edge_weights(s)):
+                i = position[t]
+                targets[i] = s
+                weights[i] = w
+                position[t] = i + 1
+        return CSRGraph(offsets, targets, weights)
+
+    @classmethod
+    def from_rows(cls, rows):
+        """
+        Builds a graph from an iterable of `(neighbors, weights)` pairs, one pair per state in
+        increasing state order. Rows are consumed one at a time, so the iterable can be a generator.
+
+        Args:
+            rows (iterable): The sorted neighbours and the matching edge weights of every state.
+
+        Returns:
+            CSRGraph: The graph holding the given edges.
+        """
+        offsets = array("q", [0])
+        targets = array("i")
+        weights = array("q")
+        for row_targets, row_weights in rows:
+            targets.extend(row_targets)
+            weights.extend(row_weights)
+            offsets.append(len(targets))
+        return cls(offsets, targets, weights)
+
+    @classmethod
+    def from_adjacency_matrix(cls, adjacency_matrix):
+        """
+        Builds a graph from a dense adjacency matrix, keeping only the entries greater than 0.
+
+        Args:
+            adjacency_matrix (list): A list of rows, where `adjacency_matrix[s][t]` is the cost of the edge s -> t.
+
+        Returns:
+            CSRGraph: The graph holding the nonzero entries of the matrix.
+        """
+        return cls.from_rows(
+            (
+                [t for t, x in enumerate(row) if x > 0],
+                [x for x in row if x > 0],
+            )
+            for row in adjacency_matrix
+        )
+
+
+# Streaming CSR graph
+# Pseudo code
+
+# class StreamingCSRGraph inherits CSRGraph
+#     method __init__(num_nodes, rows)
+#         CSRGraph.__init__(offsets=[0], targets=[], weights=[])
+#         self.rows ← rows  // a generator of (neighbors, weights), one per state
+
+#     method load(state)
+#         while fewer than state + 1 rows are loaded do
+#             (row_targets, row_weights) ← NEXT(rows)
+#             append row_targets to targets, row_weights to weights
+#             append length of targets to offsets
+
+#     method load_all()
+#         for each (row_targets, row_weights) in rows do
+#             append them like LOAD does
+
+#     method neighbors(state) returns list of states
+#         LOAD(state)
+#         return CSRGraph.NEIGHBORS(state)
+
+
+class StreamingCSRGraph(CSRGraph):
+    """
+    A `CSRGraph` that is filled row by row from a generator while it is being searched.
+
+    Asking for the edges of a state only pulls rows from the generator up to that state, so a
+    search can start as soon as the first rows of a huge input file are parsed instead of
+    waiting for the whole file.
+
+    Attributes:
+        rows: The generator of `(neighbors, weights)` pairs that is still being consumed.
+    """
+
+    def __init__(self, num_nodes, rows):
+        super().__init__(array("q", [0]), array("i"), array("q"))
+        self._num_nodes = num_nodes
+        self.rows = rows
+
+    @property
+    def num_nodes(self):
+        return self._num_nodes
+
+    @property
+    def loaded(self):
+        # The number of states whose edges are already available.
+        return len(self.offsets) - 1
+
+    def _append(self, row_targets, row_weights):
+        self.targets.extend(row_targets)
+        self.weights.extend(row_weights)
+        self.offsets.append(len(self.targets))
+
+    def load(self, state):
+        # Pull rows from the generator until the row of `state` is available.
+        while self.loaded <= state:
+            self._append(*next(self.rows))
+
+    def load_all(self):
+        # Consume the generator to the end, e.g. before the edge count is needed.
+        for row_targets, row_weights in self.rows:
+            self._append(row_targets, row_weights)
+
+    @property
+    def num_edges(self):
+        self.load_all()
+        return len(self.targets)
+
+    def degree(self, state):
+        self.load(state)
+        return super().degree(state)
+
+    def neighbors(self, state):
+        self.load(state)
+        return super().neighbors(state)
+
+    def edge_weights(self, state):
+        self.load(state)
+        return super().edge_weights(state)
+
+    def weight(self, s, s_prime):
+        self.load(s)
+        return super().weight(s, s_prime)
+
+    def update_weights(self, changes):
+        self.load_all()  # The offsets of every later state may shift.
+        return super().update_weights(changes)
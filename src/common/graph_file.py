@@ -0,0 +1,176 @@
+import mmap
+import struct
+import sys
+from array import array
+from common.graph import CSRGraph
+from common.problem import Problems
+from common.utils import read_input
+
+# Binary graph file layout (native byte order, every section starts on an 8-byte boundary)
+#     header      : magic "SRCHGRPH", version, byte-order mark, num_nodes, num_edges, start, goal
+#     offsets     : int64[num_nodes + 1]
+#     targets     : int32[num_edges] (padded to 8 bytes)
+#     weights     : int64[num_edges]
+#     heuristics  : int64[num_nodes]
+
+MAGIC = b"SRCHGRPH"
+VERSION = 1
+BYTE_ORDER_MARK = 0x01020304
+HEADER = struct.Struct("=8sIIqqqq")
+
+
+def _padded(size):
+    # Round a section size up to the next multiple of 8 bytes.
+    return (size + 7) & ~7
+
+
+# Pseudo-code for write_graph_file()
+# function WRITE_GRAPH_FILE(file_path, problem)
+#     file ← open file_path for binary writing
+#     write HEADER(MAGIC, VERSION, num_nodes, num_edges, problem.initial, problem.goal) to file
+#     write offsets, targets (padded), weights and heuristics of problem to file
+#     close file
+
+
+def write_graph_file(file_path, problem):
+    """
+    Writes a problem to the binary graph file format.
+
+    Args:
+        file_path (str): Path to the binary file to create.
+        problem (Problems): The problem to save. Its graph must provide `offsets`, `targets` and `weights`.
+    """
+    graph = problem.graph
+    offsets = array("q", graph.offsets)
+    targets = array("i", graph.targets)
+    weights = array("q", graph.weights)
+    heuristics = array("q", problem.heuristics)
+    num_nodes = len(offsets) - 1
+    num_edges = len(targets)
+
+    with open(file_path, "wb") as file:
+        file.write(
+            HEADER.pack(
+                MAGIC,
+                VERSION,
+                BYTE_ORDER_MARK,
+                num_nodes,
+                num_edges,
+                problem.initial,
+                problem.goal,
+            )
+        )
+        file.write(offsets.tobytes())
+        file.write(targets.tobytes())
+        file.write(bytes(_padded(num_edges * 4) - num_edges * 4))  # Keep the next section aligned.
+        file.write(weights.tobytes())
+        file.write(heuristics.tobytes())
+
+
+def is_graph_file(file_path):
+    """
+    Checks whether a file is in the binary graph file format.
+
+    Args:
+        file_path (str): Path to the file to check.
+
+    Returns:
+        bool: True if the file starts with the binary graph file magic.
+    """
+    with open(file_path, "rb") as file:
+        return file.read(len(MAGIC)) == MAGIC
+
+
+# Pseudo-code for read_graph_file()
+# function READ_GRAPH_FILE(file_path) returns Problems
+#     buffer ← MMAP(file_path, read only)  # No copy, pages are loaded on first access.
+#     header ← UNPACK(HEADER, buffer)
+#     offsets, targets, weights, heuristics ← typed views of their sections of buffer
+#     return Problems(initial=header.start, goal=header.goal, heuristics=heuristics, graph=CSRGraph(offsets, targets, weights))
+
+
+def read_graph_file(file_path):
+    """
+    Opens a binary graph file without parsing or copying it.
+
+    The file is memory-mapped read-only and the graph arrays are typed `memoryview`s over the
+    mapping, so opening takes the same time for any graph size, pages are only read when the
+    search touches them, and processes opening the same file share the operating system's page cache.
+
+    Args:
+        file_path (str): Path to the binary graph file.
+
+    Returns:
+        Problems: An instance of the Problems class backed by the mapped file.
+    """
+    with open(file_path, "rb") as file:
+        buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    magic, version, byte_order_mark, num_nodes, num_edges, start, goal = (
+        HEADER.unpack_from(buffer)
+    )
+    if magic != MAGIC:
+        raise ValueError(f"{file_path} is not a binary graph file")
+    if version != VERSION:
+        raise ValueError(f"{file_path} has unsupported version {version}")
+    if byte_order_mark != BYTE_ORDER_MARK:
+        raise ValueError(f"{file_path} was written with a different byte order")
+
+    view = memoryview(buffer)
+    position = HEADER.size
+
+    def section(format, count, item_size):
+        # Cut the next section out of the mapping as a typed view and move past it.
+        nonlocal position
+        size = count * item_size
+        typed = view[position : position + size].cast(format)
+        position += _padded(size)
+        return typed
+
+    offsets = section("q", num_nodes + 1, 8)
+    targets = section("i", num_edges, 4)
+    weights = section("q", num_edges, 8)
+    heuristics = section("q", num_nodes, 8)
+
+    return Problems(
+        initial=start,
+        goal=goal,
+        heuristics=heuristics,
+        graph=CSRGraph(offsets, targets, weights),
+    )
+
+
+def read_problem(file_path):
+    """
+    Reads a problem from either the binary graph file format or the text input format.
+
+    Args:
+        file_path (str): Path to the input file.
+
+    Returns:
+        Problems: An instance of the Problems class.
+    """
+    if is_graph_file(file_path):
+        return read_graph_file(file_path)
+    return read_input(file_path)
+
+
+def convert_input(input_file, output_file):
+    """
+    Converts a text input file (`input{i}.txt` format) to the binary graph file format once,
+    so later runs can open it with `read_graph_file` instead of parsing it again.
+
+    Args:
+        input_file (str): Path to the text input file.
+        output_file (str): Path to the binary graph file to create.
+    """
+    write_graph_file(output_file, read_input(input_file))
+
+
+if __name__ == "__main__":
+    # Usage: python -m common.graph_file input1.txt input1.bin [input2.txt input2.bin ...]
+    args = sys.argv[1:]
+    if not args or len(args) % 2:
+        sys.exit("usage: python -m common.graph_file INPUT OUTPUT [INPUT OUTPUT ...]")
+    for input_file, output_file in zip(args[::2], args[1::2]):
+        convert_input(input_file, output_file)
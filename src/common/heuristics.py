@@ -0,0 +1,136 @@
+import math
+from array import array
+from collections import OrderedDict
+
+# Heuristic providers
+# Pseudo code
+
+# A heuristic provider is anything indexed like the heuristic line of an input file:
+# heuristics[state] → h(state). The static table of an input file (a list or an array) is the
+# simplest one; the others compute h(state) when a search asks for it. A provider may also have:
+#     FOR_GOAL(goal)  the same heuristic towards another goal (Problems.with_query uses it)
+#     SOURCE          what determines every value, whatever the goal (the result cache hashes it)
+
+# class CoordinateHeuristic
+#     method __getitem__(state) returns h
+#         return FLOOR(scale * DISTANCE(coordinates[state], coordinates[goal]))  // Euclidean or Manhattan
+
+# class CachedHeuristic
+#     method __getitem__(state) returns h
+#         if state in memo then
+#             mark state as the most recently used
+#             return memo[state]
+#         h ← provider[state]  // the expensive call
+#         memo[state] ← h
+#         if |memo| > max_entries then
+#             remove the least recently used state from memo
+#         return h
+
+
+# The distances of `CoordinateHeuristic`.
+METRICS = ("euclidean", "manhattan")
+
+
+def _manhattan(p, q):
+    return sum(abs(a - b) for a, b in zip(p, q))
+
+
+class CoordinateHeuristic:
+    """
+    A heuristic computed from the coordinates of the states: `floor(scale * distance)` from a
+    state to the goal, with the Euclidean or the Manhattan distance.
+
+    It is admissible and consistent as long as every edge costs at least `scale` times the
+    distance between its two states (for example, weights of `ceil(scale * distance)`), by the
+    triangle inequality. Nothing is stored per state, and `for_goal` gives the heuristic towards
+    any other goal for free.
+
+    Attributes:
+        coordinates: The point of each state, as a sequence of numbers.
+        goal: The goal state.
+        metric: One of `METRICS`.
+        scale: The factor from distance to cost.
+        source: The heuristic every `for_goal` derives from (itself for the first one).
+    """
+
+    def __init__(self, coordinates, goal, metric="euclidean", scale=1, source=None):
+        if metric not in METRICS:
+            raise ValueError(f"unknown metric {metric!r}")
+        self.coordinates = coordinates
+        self.goal = goal
+        self.metric = metric
+        self.scale = scale
+        self.source = self if source is None else source
+        self._distance = math.dist if metric == "euclidean" else _manhattan
+        self._goal_point = coordinates[goal]
+
+    def __getitem__(self, state):
+        return int(self.scale * self._distance(self.coordinates[state], self._goal_point))
+
+    def __len__(self):
+        return len(self.coordinates)
+
+    def __iter__(self):
+        return (self[state] for state in range(len(self)))
+
+    def for_goal(self, goal):
+        # The same heuristic towards another goal.
+        return CoordinateHeuristic(self.coordinates, goal, self.metric, self.scale, self.source)
+
+    def hashed_values(self):
+        # The (values, typecode) sequences that determine the heuristic of every goal, for the cache fingerprint.
+        points = array("d", [x for point in self.coordinates for x in point])
+        return [(points, "d"), (array("d", [self.scale, METRICS.index(self.metric)]), "d")]
+
+
+class CachedHeuristic:
+    """
+    A bounded memo cache in front of an expensive heuristic provider.
+
+    The last `max_entries` values asked for are kept, evicting the least recently used one, so a
+    search that looks up the same states again (re-expansions, IDA* iterations, both sides of a
+    bidirectional search) computes each value once. It is only worth it when a value costs more
+    than the lookup, e.g. the O(K) ALT heuristic of many landmarks; a static table never needs it.
+
+    Attributes:
+        provider: The heuristic provider whose values are cached.
+        max_entries: The largest number of cached values.
+        hits: The number of values answered from the cache.
+        misses: The number of values computed by the provider.
+    """
+
+    def __init__(self, provider, max_entries=65536):
+        self.provider = provider
+        self.max_entries = max_entries
+        self.memo = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __getitem__(self, state):
+        memo = self.memo
+        h = memo.get(state)
+        if h is not None:
+            self.hits += 1
+            memo.move_to_end(state)
+            return h
+        self.misses += 1
+        h = memo[state] = self.provider[state]
+        if len(memo) > self.max_entries:
+            memo.popitem(last=False)
+        return h
+
+    def __len__(self):
+        return len(self.provider)
+
+    def __iter__(self):
+        return iter(self.provider)  # A full scan would only flush the cache.
+
+    @property
+    def source(self):
+        return getattr(self.provider, "source", self.provider)
+
+    @property
+    def for_goal(self):
+        # Present only if the provider has it, so `Problems.with_query` can tell.
+        for_goal = self.provider.for_goal
+        return lambda goal: CachedHeuristic(for_goal(goal), self.max_entries)
@@ -0,0 +1,227 @@
+import math
+import pickle
+import random
+from array import array
+from common.problem import Problems
+
+# ALT heuristic (A*, Landmarks, Triangle inequality)
+# Pseudo code
+
+# For a landmark L and any states v, t, the triangle inequality gives two lower bounds on d(v, t):
+#     d(v, t) ≥ d(v, L) - d(t, L)    (since d(v, L) ≤ d(v, t) + d(t, L))
+#     d(v, t) ≥ d(L, t) - d(L, v)    (since d(L, t) ≤ d(L, v) + d(v, t))
+# so h(v) = max over all landmarks of both bounds (and 0) is admissible and consistent for any goal t.
+
+# function BUILD_LANDMARKS(problem, k) returns Landmarks
+#     landmarks ← empty list
+#     while |landmarks| < k do
+#         append the state farthest from the landmarks chosen so far (at first, from a random state)  // spread them out
+#     for each landmark L do
+#         from[L] ← the distances of ShortestPathTree(problem, L).COMPLETE()            // d(L, v)
+#         to[L] ← the distances of ShortestPathTree(reverse problem, L).COMPLETE()      // d(v, L)
+#     return Landmarks(landmarks, from, to)
+
+# function HEURISTIC(landmarks, goal) returns h
+#     h(v) ← MAX(0, for each L: to[L][v] - to[L][goal], from[L][goal] - from[L][v])  // unreachable terms skipped
+
+
+# Stored for states that cannot be reached (or cannot reach the landmark).
+UNREACHABLE = -1
+
+
+def _distances(problem, source):
+    # The distances of a one-to-all UCS from the source, as a list (UNREACHABLE where unreachable).
+    from algorithms.ucs import ShortestPathTree
+
+    tree = ShortestPathTree(problem, source)
+    tree.complete()
+    return [
+        int(cost) if settled else UNREACHABLE
+        for cost, settled in zip(tree.store.path_costs, tree.settled)
+    ]
+
+
+class Landmarks:
+    """
+    Distance tables between K landmark states and every state, for the ALT heuristic.
+
+    The tables hold d(L, v) and d(v, L) for every landmark L and state v, as two flat integer
+    arrays of K * V entries (32-bit when the distances fit), -1 for unreachable pairs. `heuristic`
+    turns them into an admissible and consistent heuristic for any goal, so one preprocessing run
+    serves every query on the graph.
+
+    Attributes:
+        landmarks: The landmark states.
+        num_nodes: The number of states of the graph.
+        from_landmark: d(L, v) at index i * num_nodes + v, for the i-th landmark L.
+        to_landmark: d(v, L) at index i * num_nodes + v, for the i-th landmark L.
+    """
+
+    def __init__(self, landmarks, num_nodes, from_landmark, to_landmark):
+        self.landmarks = landmarks
+        self.num_nodes = num_nodes
+        self.from_landmark = from_landmark
+        self.to_landmark = to_landmark
+
+    @classmethod
+    def build(cls, problem, k=8, seed=0):
+        """
+        Picks k landmarks by farthest-point selection and computes their distance tables.
+
+        The first landmark is the state farthest from a random state; every next landmark is the
+        state whose distance to the nearest landmark chosen so far is the largest. Landmarks on the
+        border of the graph give the tightest bounds.
+
+        Args:
+            problem (Problems): The problem whose graph is preprocessed.
+            k (int): The number of landmarks.
+            seed (int): The random seed of the first pick.
+
+        Returns:
+            Landmarks: The landmarks and their distance tables.
+        """
+        num_nodes = problem.graph.num_nodes
+        # The reverse problem: its one-to-all searches give the distances *to* the source.
+        reverse = Problems(0, 0, heuristics=None, graph=problem.reverse_graph)
+        reverse.budget = problem.budget
+        forward = problem.with_query(0, 0)
+        forward.budget = problem.budget
+
+        rng = random.Random(seed)
+        # The distance from the nearest landmark chosen so far (at first, from a random state).
+        nearest = _distances(forward, rng.randrange(num_nodes))
+        landmarks, from_tables, to_tables = [], [], []
+        chosen = set()
+        while len(landmarks) < min(k, num_nodes):
+            # The farthest state, preferring states that the chosen landmarks cannot reach at all.
+            landmark = max(
+                (v for v in range(num_nodes) if v not in chosen),
+                key=lambda v: math.inf if nearest[v] == UNREACHABLE else nearest[v],
+            )
+            landmarks.append(landmark)
+            chosen.add(landmark)
+            from_tables.append(_distances(forward, landmark))
+            to_tables.append(_distances(reverse, landmark))
+            if len(landmarks) == 1:
+                nearest = list(from_tables[0])
+            else:
+                for v, d in enumerate(from_tables[-1]):
+                    if d != UNREACHABLE and (nearest[v] == UNREACHABLE or d < nearest[v]):
+                        nearest[v] = d
+
+        # Store the tables in 32-bit integers when the distances fit.
+        largest = max((max(table) for table in from_tables + to_tables), default=0)
+        typecode = "i" if largest < 2**31 else "q"
+        from_landmark = array(typecode, [d for table in from_tables for d in table])
+        to_landmark = array(typecode, [d for table in to_tables for d in table])
+        return cls(landmarks, num_nodes, from_landmark, to_landmark)
+
+    def heuristic(self, goal):
+        """
+        Returns the ALT heuristic towards a goal.
+
+        Args:
+            goal (int): The goal state.
+
+        Returns:
+            LandmarkHeuristic: A sequence with the heuristic value of each state (computed on access).
+        """
+        return LandmarkHeuristic(self, goal)
+
+    def hashed_values(self):
+        # The (values, typecode) sequences that determine the heuristic of every goal, for the cache fingerprint.
+        return [(self.landmarks, "q"), (self.from_landmark, "q"), (self.to_landmark, "q")]
+
+    def save(self, file_path):
+        """
+        Saves the landmarks and their distance tables.
+
+        Args:
+            file_path (str): Path to the file to write.
+        """
+        state = {
+            "landmarks": self.landmarks,
+            "num_nodes": self.num_nodes,
+            "typecode": self.from_landmark.typecode,
+            "from_landmark": self.from_landmark.tobytes(),
+            "to_landmark": self.to_landmark.tobytes(),
+        }
+        with open(file_path, "wb") as file:
+            pickle.dump(state, file, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def load(cls, file_path):
+        """
+        Loads landmarks saved by `save`.
+
+        Args:
+            file_path (str): Path to the saved landmarks.
+
+        Returns:
+            Landmarks: The landmarks and their distance tables.
+        """
+        with open(file_path, "rb") as file:
+            state = pickle.load(file)
+        return cls(
+            state["landmarks"],
+            state["num_nodes"],
+            array(state["typecode"], state["from_landmark"]),
+            array(state["typecode"], state["to_landmark"]),
+        )
+
+
+class LandmarkHeuristic:
+    """
+    The ALT heuristic towards one goal, used like a heuristic list (`heuristics[state]`).
+
+    The values are computed on access in O(K) from the distance tables, so building the heuristic
+    for a new goal costs O(K), not O(V).
+
+    Attributes:
+        landmarks: The `Landmarks` with the distance tables.
+        goal: The goal state.
+    """
+
+    def __init__(self, landmarks, goal):
+        self.landmarks = landmarks
+        self.goal = goal
+        num_nodes = landmarks.num_nodes
+        # The per-landmark distances of the goal, read once: (offset of the landmark's tables, d(goal, L), d(L, goal)).
+        self._goal_terms = [
+            (
+                i * num_nodes,
+                landmarks.to_landmark[i * num_nodes + goal],
+                landmarks.from_landmark[i * num_nodes + goal],
+            )
+            for i in range(len(landmarks.landmarks))
+        ]
+
+    def __len__(self):
+        return self.landmarks.num_nodes
+
+    def __getitem__(self, state):
+        from_landmark = self.landmarks.from_landmark
+        to_landmark = self.landmarks.to_landmark
+        best = 0
+        for offset, goal_to, goal_from in self._goal_terms:
+            to = to_landmark[offset + state]
+            # d(v, t) ≥ d(v, L) - d(t, L), when both reach the landmark.
+            if to != UNREACHABLE and goal_to != UNREACHABLE and to - goal_to > best:
+                best = to - goal_to
+            # d(v, t) ≥ d(L, t) - d(L, v), when the landmark reaches both.
+            frm = from_landmark[offset + state]
+            if frm != UNREACHABLE and goal_from != UNREACHABLE and goal_from - frm > best:
+                best = goal_from - frm
+        return best
+
+    def __iter__(self):
+        return (self[state] for state in range(len(self)))
+
+    @property
+    def source(self):
+        # Every goal shares the distance tables.
+        return self.landmarks
+
+    def for_goal(self, goal):
+        # The ALT heuristic of the same landmarks towards another goal.
+        return LandmarkHeuristic(self.landmarks, goal)
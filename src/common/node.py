@@ -1,3 +1,5 @@
+from array import array
+
 # Pseudo - code
 # class Node:
 #     def __init__(self, state, parent=None, action=None, path_cost=0, heuristic=0):
@@ -23,6 +25,9 @@ class Node:
         heuristic: The heuristic value of this node.
     """
 
+    # No per-instance __dict__: a search can create one Node per generated child.
+    __slots__ = ("state", "parent", "action", "path_cost", "heuristic")
+
     def __init__(self, state, parent=None, action=None, path_cost=0, heuristic=0):
         self.state = state
         self.parent = parent
@@ -36,3 +41,81 @@ class Node:
         This is used to order nodes in priority queues.
         """
         return (self.path_cost + self.heuristic) < (other.path_cost + other.heuristic)
+
+
+# Pseudo - code
+# class NodeStore:
+#     def __init__(self, num_nodes):
+#         self.reached ← array of num_nodes flags, all false
+#         self.parents ← array of num_nodes parent states, all -1
+#         self.path_costs ← array of num_nodes path costs
+#         self.heuristics ← array of num_nodes heuristic values
+
+#     def add(self, state, parent, path_cost, heuristic):
+#         reached[state] ← true
+#         parents[state] ← parent
+#         path_costs[state] ← path_cost
+#         heuristics[state] ← heuristic
+
+#     def path(self, state):
+#         path ← an empty list
+#         while state ≠ -1 do
+#             append state to path
+#             state ← parents[state]
+#         reverse path
+#         return path
+
+
+class NodeStore:
+    """
+    Search nodes stored as parallel arrays indexed by state instead of as `Node` objects.
+
+    Graph searches keep at most one best node per state, so the parent, path cost and heuristic
+    of that node fit in flat typed arrays: a node costs a few bytes in each array instead of a
+    Python object, and children that are not kept are never allocated at all. The parent links
+    are state indices, so the path is read back by walking `parents`.
+
+    Attributes:
+        reached: A flag per state, set once the state has a node in the store.
+        parents: The parent state of each node, -1 for the root.
+        path_costs: The path cost of each node.
+        heuristics: The heuristic value of each node.
+    """
+
+    def __init__(self, num_nodes):
+        self.reached = bytearray(num_nodes)
+        self.parents = array("q", [-1]) * num_nodes
+        self.path_costs = array("d", [0]) * num_nodes
+        self.heuristics = array("d", [0]) * num_nodes
+
+    def __contains__(self, state):
+        return self.reached[state] == 1
+
+    def add(self, state, parent=-1, path_cost=0, heuristic=0):
+        # Store (or overwrite with a better one) the node of a state.
+        self.reached[state] = 1
+        self.parents[state] = parent
+        self.path_costs[state] = path_cost
+        self.heuristics[state] = heuristic
+
+    def path(self, state):
+        # Follow the parent indices from the state back to the root.
+        path = []
+        while state != -1:
+            path.append(state)
+            state = self.parents[state]
+        path.reverse()
+        return path
+
+    def node(self, state):
+        # Materialise the stored node of a state, and its ancestors, as Node objects.
+        node = None
+        for s in self.path(state):
+            node = Node(
+                state=s,
+                parent=node,
+                action=None if node is None else s,
+                path_cost=self.path_costs[s],
+                heuristic=self.heuristics[s],
+            )
+        return node
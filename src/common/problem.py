@@ -1,40 +1,263 @@
+from array import array
+from common.graph import CSRGraph
+from common.heuristics import CachedHeuristic
+
 # Pseudo code
 # class Problems
-#     method __init__(initial, goal, adjacency_matrix, heuristics)
+#     method __init__(initial, goal, adjacency_matrix, heuristics, graph, budget)
 #         self.initial ← initial
 #         self.goal ← goal
 #         self.adjacency_matrix ← adjacency_matrix
 #         self.heuristics ← heuristics
+#         if graph is null then
+#             graph ← CSRGraph.FROM_ADJACENCY_MATRIX(adjacency_matrix)
+#         self.graph ← graph
+#         self.budget ← budget
+
+#     method with_query(initial, goal, heuristics) returns Problems
+#         if heuristics is null then
+#             if goal == self.goal then
+#                 heuristics ← self.heuristics
+#             else if self.heuristics has FOR_GOAL then
+#                 heuristics ← self.heuristics.FOR_GOAL(goal)  // a provider valid for any goal (coordinates, landmarks)
+#             else if landmarks is not null then
+#                 heuristics ← landmarks.HEURISTIC(goal)
+#             else
+#                 heuristics ← zeros  // a static table only fits its own goal
+#         return Problems(initial, goal, heuristics, graph=self.graph) sharing the reverse graph, landmarks and hierarchy
+
+#     method use_heuristic(provider, max_entries)
+#         self.heuristics ← provider, behind a CachedHeuristic of max_entries values if max_entries is not null
+
+#     method use_landmarks(landmarks, max_entries)
+#         self.landmarks ← landmarks
+#         USE_HEURISTIC(landmarks.HEURISTIC(goal), max_entries)
+
+#     method use_hierarchy(hierarchy)
+#         self.hierarchy ← hierarchy  // the contraction hierarchy of graph, for ch_search
 
 #     method is_goal(state) returns boolean
 #         return state == goal
 
 #     method actions(state) returns list of actions
-#         return list of indices i where adjacency_matrix[state][i] > 0
+#         return graph.NEIGHBORS(state)  // the indices i where adjacency_matrix[state][i] > 0
 
 #     method result(state, action) returns new_state
 #         return action
 
 #     method action_cost(s, action, s_prime) returns cost
-#         return adjacency_matrix[s][action]
+#         return graph.WEIGHT(s, action)  // adjacency_matrix[s][action]
+
+#     method successors(state) returns list of (s_prime, cost)
+#         CHARGE_EXPANSION(budget)
+#         return pairs of graph.NEIGHBORS(state) and graph.EDGE_WEIGHTS(state)
+
+#     method update_edges(changes) returns list of (s, s_prime, old, new)
+#         applied ← graph.UPDATE_WEIGHTS(changes)  // increments graph.version
+#         reverse.UPDATE_WEIGHTS(the reversed changes), if the reverse graph is built
+#         adjacency_matrix[s][s_prime] ← new for each change, if there is a matrix
+#         return applied
+
+#     method predecessors(state) returns list of (s_prev, cost)
+#         if reverse graph is not built, or was built for another graph.version then
+#             reverse ← graph.TRANSPOSE()  // built once per problem
+#         CHARGE_EXPANSION(budget)
+#         return pairs of reverse.NEIGHBORS(state) and reverse.EDGE_WEIGHTS(state)
 
 
 class Problems:
-    def __init__(self, initial, goal, adjacency_matrix, heuristics):
+    """
+    A class to represent a path-finding problem on a weighted graph.
+
+    The graph can be given either as a dense `adjacency_matrix` or as any graph storage object
+    (for example `CSRGraph`) that provides `neighbors(state)` and `weight(s, s_prime)`. A dense
+    matrix is converted to a `CSRGraph` once, so `actions` and `action_cost` never scan a full row.
+
+    Attributes:
+        initial: The initial state.
+        goal: The goal state.
+        adjacency_matrix: The dense adjacency matrix the problem was built from, or None.
+        heuristics: The heuristic provider: the heuristic value of each state, indexed by state, either stored (the
+            list of an input file) or computed on access (see `common.heuristics`). Searches only read it when they
+            need it, so uninformed searches never evaluate it.
+        graph: The graph storage used by `actions` and `action_cost`.
+        budget: The `SearchBudget` charged by the expansion primitives, or None for no limits.
+        landmarks: The `Landmarks` of the graph, which give a heuristic for any goal, or None.
+        hierarchy: The `ContractionHierarchy` of the graph, used by `ch_search`, or None.
+    """
+
+    def __init__(
+        self,
+        initial,
+        goal,
+        adjacency_matrix=None,
+        heuristics=None,
+        graph=None,
+        budget=None,
+    ):
+        if graph is None and adjacency_matrix is None:
+            raise ValueError("Problems needs either an adjacency_matrix or a graph")
         self.initial = initial
         self.goal = goal
         self.adjacency_matrix = adjacency_matrix
         self.heuristics = heuristics
+        if graph is None:
+            graph = CSRGraph.from_adjacency_matrix(adjacency_matrix)
+        self.graph = graph
+        self.budget = budget
+        self.landmarks = None
+        self.hierarchy = None
+        self._reverse_graph = None
+        self._zero_heuristics = None
+
+    def with_query(self, initial, goal, heuristics=None):
+        """
+        Returns a problem on the same graph with another initial and goal state.
+
+        The graph (and the reverse graph and contraction hierarchy, if they have been built) is
+        shared, not copied, so a loaded graph can answer many queries. Each query gets its own object, so concurrent searches do
+        not share a `budget`.
+
+        Unless `heuristics` is given, a query with the goal of the problem keeps its heuristics. For
+        another goal, a provider with `for_goal` (coordinates, landmarks) gives the heuristic of
+        that goal, and so do the `landmarks` of the problem. Otherwise the heuristic table of an
+        input file estimates the distance to its own goal only, so the query uses h = 0, which is
+        admissible (informed searches then behave like their uninformed counterparts).
+
+        Args:
+            initial (int): The initial state of the query.
+            goal (int): The goal state of the query.
+            heuristics (list): The heuristic value of each state for this goal, or None.
+
+        Returns:
+            Problems: The problem of the query.
+        """
+        num_nodes = self.graph.num_nodes
+        for state in (initial, goal):
+            if not 0 <= state < num_nodes:
+                raise ValueError(f"state {state} is not in the graph (0..{num_nodes - 1})")
+        if heuristics is None:
+            if goal == self.goal:
+                heuristics = self.heuristics
+            elif hasattr(self.heuristics, "for_goal"):
+                heuristics = self.heuristics.for_goal(goal)
+            elif self.landmarks is not None:
+                heuristics = self.landmarks.heuristic(goal)
+            else:
+                if self._zero_heuristics is None:
+                    self._zero_heuristics = array("q", bytes(8 * num_nodes))
+                heuristics = self._zero_heuristics
+        query = Problems(
+            initial,
+            goal,
+            adjacency_matrix=self.adjacency_matrix,
+            heuristics=heuristics,
+            graph=self.graph,
+        )
+        query.landmarks = self.landmarks
+        query.hierarchy = self.hierarchy
+        query._reverse_graph = self._reverse_graph
+        query._zero_heuristics = self._zero_heuristics
+        return query
+
+    def use_heuristic(self, provider, max_entries=None):
+        """
+        Replaces the heuristics of the problem (and of its later queries, if the provider has
+        `for_goal`) by a heuristic provider.
+
+        Args:
+            provider: The heuristic provider, e.g. a `CoordinateHeuristic` or a table of values.
+            max_entries (int): Memoise the last values of an expensive provider in a `CachedHeuristic` of this
+                size, or None to call the provider on every lookup.
+        """
+        if max_entries is not None:
+            provider = CachedHeuristic(provider, max_entries)
+        self.heuristics = provider
+
+    def use_landmarks(self, landmarks, max_entries=None):
+        """
+        Replaces the heuristics of the problem (and of its later queries) by the ALT heuristic of
+        precomputed landmarks.
+
+        Args:
+            landmarks (Landmarks): The landmarks of this graph, from `Landmarks.build` or `Landmarks.load`.
+            max_entries (int): Memoise the last values of the heuristic (each costs O(K) to compute), or None.
+        """
+        self.landmarks = landmarks
+        self.use_heuristic(landmarks.heuristic(self.goal), max_entries)
+
+    def use_hierarchy(self, hierarchy):
+        """
+        Sets the contraction hierarchy that `ch_search` queries on this problem (and its later queries).
+
+        Args:
+            hierarchy (ContractionHierarchy): The hierarchy of this graph, from `ContractionHierarchy.build` or
+                `ContractionHierarchy.load`.
+        """
+        self.hierarchy = hierarchy
 
     def is_goal(self, state):
         return state == self.goal
 
     def actions(self, state):
         # Return actions sorted by index
-        return [i for i, x in enumerate(self.adjacency_matrix[state]) if x > 0]
+        return self.graph.neighbors(state)
 
     def result(self, state, action):
         return action
 
     def action_cost(self, s, action, s_prime):
-        return self.adjacency_matrix[s][action]
+        return self.graph.weight(s, action)
+
+    def successors(self, state):
+        # Return (s_prime, cost) pairs for every action of the state, without building Node objects.
+        # Equivalent to (result(state, a), action_cost(state, a, result(state, a))) for each action a,
+        # but reads the edge weights in one slice instead of looking each one up.
+        if self.budget is not None:
+            self.budget.charge_expansion(self.graph.degree(state), state)
+        return zip(self.graph.neighbors(state), self.graph.edge_weights(state))
+
+    @property
+    def reverse_graph(self):
+        # The graph with every edge reversed, built on first use and kept for later searches
+        # (rebuilt if the graph was changed other than by `update_edges`).
+        reverse_graph = self._reverse_graph
+        if reverse_graph is None or reverse_graph.source_version != self.graph.version:
+            reverse_graph = self._reverse_graph = self.graph.transpose()
+            reverse_graph.source_version = self.graph.version
+        return reverse_graph
+
+    def update_edges(self, changes):
+        """
+        Changes the weights of a batch of edges, e.g. after a traffic update, in place.
+
+        The graph (and the reverse graph, if built) is patched rather than rebuilt, and the
+        `version` of the graph is incremented, so the results cached for the old graph and its
+        contraction hierarchy are no longer used. The graph is shared with the queries of
+        `with_query`, which see the change too. Heuristics are not updated: they stay admissible
+        as long as no edge gets cheaper than they assume (an increase is always safe), and
+        `landmarks` must be rebuilt after edges get cheaper.
+
+        Args:
+            changes (iterable): (s, s_prime, weight) triples; a weight of 0 removes the edge.
+
+        Returns:
+            list: The (s, s_prime, old weight, new weight) of every edge whose weight changed (0 for no edge).
+        """
+        reverse_graph = self._reverse_graph
+        up_to_date = reverse_graph is not None and reverse_graph.source_version == self.graph.version
+        applied = self.graph.update_weights(changes)
+        if up_to_date and applied:
+            reverse_graph.update_weights((s_prime, s, new) for s, s_prime, _, new in applied)
+            reverse_graph.source_version = self.graph.version
+        if self.adjacency_matrix is not None:
+            for s, s_prime, _, new in applied:
+                self.adjacency_matrix[s][s_prime] = new
+        return applied
+
+    def predecessors(self, state):
+        # Return (s_prev, cost) pairs for every edge s_prev -> state, for searches that run backwards from the goal.
+        reverse_graph = self.reverse_graph
+        if self.budget is not None:
+            self.budget.charge_expansion(reverse_graph.degree(state), state)
+        return zip(reverse_graph.neighbors(state), reverse_graph.edge_weights(state))
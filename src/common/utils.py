@@ -1,41 +1,52 @@
+import json
+import os
+import time
+from common.budget import BudgetExceeded
 from common.node import Node
 from common.problem import Problems
+from common.graph import CSRGraph, StreamingCSRGraph
 
 # Pseudo code
-# function EXPAND(problem, node) returns a generator of child nodes
+# function EXPAND(problem, node, informed) returns a generator of child nodes
+#     CHARGE_EXPANSION(problem.BUDGET)  # Stop the search if its budget is exhausted
 #     s ← node.STATE  # Get the current state from the node
 #     for each action in problem.ACTIONS(s) do  # Loop through all possible actions from the current state
 #         s_prime ← problem.RESULT(s, action)  # Get the resulting state after applying the action
 #         path_cost ← node.PATH_COST + problem.ACTION_COST(s, action, s_prime)  # Calculate the new path cost
-#         heuristic ← problem.HEURISTICS[s_prime]  # Get the heuristic value for the new state
+#         heuristic ← problem.HEURISTICS[s_prime] if informed else 0  # Only searches that use it evaluate the heuristic
 #         child ← NODE(STATE=s_prime, PARENT=node, ACTION=action, PATH_COST=path_cost, HEURISTIC=heuristic)  # Create a new child node
 #         yield child  # Yield the child node
 
 
-def expand(problem, node):
+def expand(problem, node, informed=True):
     """
     Generates the child nodes of a given node by applying all possible actions.
 
     Args:
         problem (Problems): The problem instance which includes the initial state, goal state, and other problem-specific methods.
         node (Node): The current node to be expanded.
+        informed (bool): Look up the heuristic of each child. Uninformed searches pass False, so they never
+            evaluate (or, for `read_input_lazy`, wait for) the heuristics; their children get 0.
 
     Yields:
         Node: The child node resulting from applying an action to the current node.
     """
     s = node.state  # Get the current state from the node.
-    for action in problem.actions(
-        s
-    ):  # Loop through all possible actions from the current state.
+    actions = problem.actions(s)  # Get all possible actions from the current state.
+    if problem.budget is not None:
+        problem.budget.charge_expansion(
+            len(actions), s
+        )  # Count the expansion and its children against the search budget.
+    for action in actions:  # Loop through all possible actions from the current state.
         s_prime = problem.result(
             s, action
         )  # Get the resulting state after applying the action.
         path_cost = node.path_cost + problem.action_cost(
             s, action, s_prime
         )  # Calculate the new path cost.
-        heuristic = problem.heuristics[
-            s_prime
-        ]  # Get the heuristic value for the new state.
+        heuristic = (
+            problem.heuristics[s_prime] if informed else 0
+        )  # Get the heuristic value for the new state, if the search uses it.
         child = Node(  # Create a new child node with the new state, path cost, and heuristic.
             state=s_prime,
             parent=node,
@@ -46,78 +57,263 @@ def expand(problem, node):
         yield child  # Yield the child node.
 
 
+# Pseudo-code for iter_adjacency_rows()
+# function ITER_ADJACENCY_ROWS(file, num_nodes) returns a generator of (neighbors, weights)
+#     for i ← 0 to num_nodes - 1 do
+#         line ← read the next non-empty line of file
+#         neighbors, weights ← empty lists
+#         for each (index, token) in line do
+#             if token is not "0" and INT(token) > 0 then
+#                 append index to neighbors, INT(token) to weights
+#         yield (neighbors, weights)
+
+
+def _next_line(file):
+    # Return the next non-empty line of the file, stripped of surrounding whitespace.
+    for line in file:
+        line = line.strip()
+        if line:
+            return line
+    raise ValueError("unexpected end of input file")
+
+
+def iter_adjacency_rows(file, num_nodes):
+    """
+    Parses the adjacency matrix of an input file one line at a time.
+
+    Only the nonzero cells of a row are converted with `int()` and kept, so memory stays bounded
+    by a single line of text plus the edges of one state.
+
+    Args:
+        file (file): An open input file positioned at the first row of the adjacency matrix.
+        num_nodes (int): The number of rows to read.
+
+    Yields:
+        tuple: The sorted neighbours of the state and the weights of the matching edges.
+    """
+    for _ in range(num_nodes):
+        neighbors = []
+        weights = []
+        for index, token in enumerate(_next_line(file).split()):
+            # Most cells of a sparse matrix are "0"; skip them without calling int().
+            if token != "0":
+                value = int(token)
+                if value > 0:
+                    neighbors.append(index)
+                    weights.append(value)
+        yield neighbors, weights
+
+
+def report_parse_rate(file_path, num_nodes, num_edges, duration):
+    """
+    Prints how fast an input file was parsed.
+
+    Args:
+        file_path (str): Path to the parsed input file.
+        num_nodes (int): The number of nodes read from the file.
+        num_edges (int): The number of nonzero edges kept.
+        duration (float): The parse time in seconds.
+    """
+    size = os.path.getsize(file_path) / (1024 * 1024)  # File size in MB.
+    duration = max(duration, 1e-9)  # Avoid dividing by zero on tiny files.
+    print(
+        f"Parsed {file_path}: {num_nodes} nodes, {num_edges} edges in {duration:.4f} seconds "
+        f"({num_nodes / duration:.0f} rows/s, {size / duration:.2f} MB/s)"
+    )
+
+
 # Pseudo-code for read_input()
 # function READ_INPUT(file_path) returns Problems
 #     file ← open file_path for reading
-#     lines ← read all lines from file
-#     close file
-
-#     num_nodes ← convert lines[0] to integer
-#     start, goal ← convert lines[1] to two integers
-#     adjacency_matrix ← empty list
-
-#     for i ← 2 to 2 + num_nodes - 1 do
-#         row ← convert lines[i] to list of integers
-#         append row to adjacency_matrix
 
-#     heuristics ← convert lines[2 + num_nodes] to list of integers
+#     num_nodes ← convert the first line to integer
+#     start, goal ← convert the next line to two integers
+#     graph ← CSRGraph.FROM_ROWS(ITER_ADJACENCY_ROWS(file, num_nodes))  # One line at a time, nonzero cells only.
+#     heuristics ← convert the next line to list of integers
 
-#     return Problems(initial=start, goal=goal, adjacency_matrix=adjacency_matrix, heuristics=heuristics)
+#     close file
+#     return Problems(initial=start, goal=goal, heuristics=heuristics, graph=graph)
 
 
-def read_input(file_path):
+def read_input(file_path, verbose=False):
     """Reads the input file and constructs the problem instance.
 
+    The adjacency matrix is streamed line by line straight into a sparse `CSRGraph`, so the file
+    is never loaded whole and no dense matrix is built.
+
     Args:
         file_path (str): Path to the input file.
+        verbose (bool): Print the parse rate when True.
 
     Returns:
         Problems: An instance of the Problems class.
     """
+    start_time = time.perf_counter()
     with open(file_path, "r") as file:
-        lines = file.readlines()
+        num_nodes = int(_next_line(file))  # Read the number of nodes.
+        start, goal = map(int, _next_line(file).split())  # Read the start and goal nodes.
+        graph = CSRGraph.from_rows(
+            iter_adjacency_rows(file, num_nodes)
+        )  # Read the adjacency matrix.
+        heuristics = list(map(int, _next_line(file).split()))  # Read the heuristic values.
+
+    if verbose:
+        report_parse_rate(
+            file_path, num_nodes, graph.num_edges, time.perf_counter() - start_time
+        )
+
+    return Problems(
+        initial=start,
+        goal=goal,
+        heuristics=heuristics,
+        graph=graph,
+    )
+
+
+# Pseudo-code for write_input()
+# function WRITE_INPUT(file_path, problem)
+#     file ← open file_path for writing
+#     write num_nodes, then "start goal" to file
+#     for each state do
+#         row ← num_nodes zeros, with row[s_prime] ← cost for each (s_prime, cost) in the edges of state
+#         write row to file
+#     write heuristics to file
+#     close file
+
+
+def write_input(file_path, problem):
+    """Writes a problem in the text input format read by `read_input`.
+
+    The matrix is written one row at a time. The format is dense (num_nodes^2 cells), so it is
+    only practical for small graphs; use `common.graph_file.write_graph_file` for large ones.
+
+    Args:
+        file_path (str): Path to the input file to create.
+        problem (Problems): The problem to write.
+    """
+    graph = problem.graph
+    num_nodes = graph.num_nodes
+    with open(file_path, "w") as file:
+        file.write(f"{num_nodes}\n")
+        file.write(f"{problem.initial} {problem.goal}\n")
+        for state in range(num_nodes):
+            row = ["0"] * num_nodes
+            for s_prime, cost in zip(graph.neighbors(state), graph.edge_weights(state)):
+                row[s_prime] = str(cost)
+            file.write(" ".join(row) + "\n")
+        file.write(" ".join(map(str, problem.heuristics)) + "\n")
+
+
+class _PendingHeuristics:
+    # The heuristic line is the last line of the input file, so reading it waits for the rest of the graph.
+    def __init__(self, graph):
+        self.graph = graph
+        self.values = None
+
+    def _resolve(self):
+        if self.values is None:
+            self.graph.load_all()
+        return self.values
+
+    def __getitem__(self, state):
+        return self._resolve()[state]
+
+    def __len__(self):
+        return len(self._resolve())
+
+    def __iter__(self):
+        return iter(self._resolve())
+
+
+# Pseudo-code for read_input_lazy()
+# function READ_INPUT_LAZY(file_path) returns Problems
+#     file ← open file_path for reading
+#     num_nodes, start, goal ← read the first two lines
+#     graph ← StreamingCSRGraph(num_nodes, rows)  # rows: ITER_ADJACENCY_ROWS, then the heuristic line, then close file
+#     return Problems(initial=start, goal=goal, heuristics=heuristics read on first use, graph=graph)
+
+
+def read_input_lazy(file_path, verbose=False):
+    """Opens the input file and returns a problem whose graph is parsed while it is searched.
 
-    num_nodes = int(lines[0].strip())  # Read the number of nodes.
-    start, goal = map(int, lines[1].strip().split())  # Read the start and goal nodes.
-    adjacency_matrix = []
+    Only the two header lines are read up front. Rows of the adjacency matrix are parsed on demand
+    when the search first asks for the edges of a state, so a search can start before a huge file
+    has finished loading. The heuristic values come after the matrix, so the first heuristic lookup
+    reads the rest of the file; uninformed searches never look one up, so they only read the rows
+    they reach.
 
-    for i in range(2, 2 + num_nodes):  # Read the adjacency matrix.
-        adjacency_matrix.append(list(map(int, lines[i].strip().split())))
+    Args:
+        file_path (str): Path to the input file.
+        verbose (bool): Print the parse rate once the whole file has been read.
 
-    heuristics = list(
-        map(int, lines[2 + num_nodes].strip().split())
-    )  # Read the heuristic values.
+    Returns:
+        Problems: An instance of the Problems class backed by a `StreamingCSRGraph`.
+    """
+    start_time = time.perf_counter()
+    file = open(file_path, "r")
+    num_nodes = int(_next_line(file))  # Read the number of nodes.
+    start, goal = map(int, _next_line(file).split())  # Read the start and goal nodes.
+
+    def rows():
+        with file:
+            yield from iter_adjacency_rows(file, num_nodes)  # Read the adjacency matrix.
+            heuristics.values = list(
+                map(int, _next_line(file).split())
+            )  # Read the heuristic values.
+        if verbose:
+            report_parse_rate(
+                file_path,
+                num_nodes,
+                len(graph.targets),
+                time.perf_counter() - start_time,
+            )
+
+    graph = StreamingCSRGraph(num_nodes, rows())
+    heuristics = _PendingHeuristics(graph)
 
     return Problems(
         initial=start,
         goal=goal,
-        adjacency_matrix=adjacency_matrix,
         heuristics=heuristics,
+        graph=graph,
     )
 
 
 # Pseudo - code
-# function RECONSTRUCT_PATH(node) returns path
-#     path ← an empty list
-#     while node is not null do
-#         append node.state to path
-#         node ← node.parent
-#     end while
-#     reverse path
+# function RECONSTRUCT_PATH(node, store, shortcuts) returns path
+#     if store is not null then
+#         path ← store.PATH(node)  # node is a state, follow the parent indices of the store
+#     else
+#         path ← an empty list
+#         while node is not null do
+#             append node.state to path
+#             node ← node.parent
+#         end while
+#         reverse path
+#     if shortcuts is not null then
+#         path ← shortcuts.UNPACK(path)  # Replace every shortcut edge by the original edges it skips
 #     return path
 
 
-def reconstruct_path(node):
+def reconstruct_path(node, store=None, shortcuts=None):
     """
     Reconstruct the path from the initial state to the goal state by following
     the parent links from the goal node back to the initial node.
 
     Args:
-        node (Node): The goal node from which the path reconstruction starts.
+        node (Node or int): The goal node from which the path reconstruction starts,
+            or the goal state when `store` is given.
+        store (NodeStore): The node store holding the search nodes, or None for Node objects.
+        shortcuts (ContractionHierarchy): The hierarchy whose shortcut edges the search followed,
+            to unpack them into edges of the original graph, or None.
 
     Returns:
         list: A list representing the path from the initial  state to the goal state.
     """
+    if store is not None:
+        path = store.path(node)  # Walk the parent indices of the node store.
+        return path if shortcuts is None else shortcuts.unpack(path)
+
     path = []  # Initialize an empty list to store the path.
 
     while node:
@@ -126,6 +322,8 @@ def reconstruct_path(node):
         node = node.parent  # Move to the parent node.
 
     path.reverse()  # Reverse the path to get it from the initial state to the goal state.
+    if shortcuts is not None:
+        path = shortcuts.unpack(path)  # Expand the shortcuts into original edges.
     return path  # Return the reconstructed path.
 
 
@@ -134,14 +332,18 @@ def reconstruct_path(node):
 #     try
 #         file ← open output_file for writing
 #         for each (name, result) in results.items() do
-#             path, duration, memory_usage ← result
+#             path, duration, memory_usage, counters ← result
 #             write name to file
 #             if path is null
 #                 write "Path: -1" to file
+#             else if path is BudgetExceeded
+#                 write "Path: budget exceeded (" + path.reason + ")" to file
 #             else
 #                 write "Path: " + join path with " -> " to file
 #             write "Time: " + format duration with 8 decimal places + " seconds" to file
 #             write "Memory: " + format memory_usage with 2 decimal places + " KB" to file
+#             if counters is not null then
+#                 write "Counters: " + "name=value" for each counter, joined with spaces to file
 #             write "\n===============\n\n" to file
 #         end for
 #         close file
@@ -155,19 +357,64 @@ def write_output(output_file, results):
 
     Args:
         output_file (str): Path to the output file.
-        results (dict): Dictionary containing the results of the search algorithms.
+        results (dict): Dictionary containing the results of the search algorithms: (path, duration, memory usage,
+            counters) tuples, where counters is the dict of `SearchBudget.counters` or None.
     """
     try:
         with open(output_file, "w") as file:
             for name, result in results.items():
-                path, duration, memory_usage = result
+                path, duration, memory_usage, counters = result
                 file.write(f"{name}:\n")
                 if path is None:
                     file.write("Path: -1\n")
+                elif isinstance(path, BudgetExceeded):
+                    file.write(f"Path: budget exceeded ({path.reason})\n")
                 else:
                     file.write("Path: " + " -> ".join(map(str, path)) + "\n")
                 file.write(f"Time: {duration:.8f} seconds\n")
                 file.write(f"Memory: {memory_usage:.2f} KB\n")
+                if counters is not None:
+                    file.write(
+                        "Counters: "
+                        + " ".join(
+                            f"{key}={value:.8f}" if isinstance(value, float) else f"{key}={value}"
+                            for key, value in counters.items()
+                        )
+                        + "\n"
+                    )
                 file.write("\n===============\n\n")
     except Exception as e:
         raise ValueError(f"Error writing output file {output_file}: {e}")
+
+
+# Pseudo-code
+# function WRITE_JSON_OUTPUT(output_file, results_by_input)
+#     rows ← empty list
+#     for each (input_file, results) in results_by_input.items() do
+#         for each (name, (path, duration, memory_usage, counters)) in results.items() do
+#             append {input, algorithm, path, error, time, memory_kb} + counters to rows
+#     write rows to output_file as JSON
+
+
+def write_json_output(output_file, results_by_input):
+    """
+    Writes the results of the search algorithms, with their work counters, to a JSON file: a
+    list of objects, one per (input file, algorithm) pair.
+
+    Args:
+        output_file (str): Path to the JSON file.
+        results_by_input (dict): The results (as given to `write_output`) of each input file, by input file.
+    """
+    rows = []
+    for input_file, results in results_by_input.items():
+        if results is None:
+            continue  # The input file could not be read.
+        for name, (path, duration, memory_usage, counters) in results.items():
+            row = {"input": input_file, "algorithm": name, "path": path, "error": None}
+            if isinstance(path, BudgetExceeded):
+                row.update(path=None, error=str(path))
+            row.update(time=duration, memory_kb=memory_usage)
+            row.update(counters or {})
+            rows.append(row)
+    with open(output_file, "w") as file:
+        json.dump(rows, file, indent=2)
@@ -0,0 +1,145 @@
+import weakref
+from array import array
+import numpy as np
+
+# Pseudo code
+# function GRAPH_ARRAYS(problem) returns (offsets, targets, weights)
+#     graph ← problem.graph
+#     if graph is not cached or cache[graph].version ≠ graph.version then  // the edges changed since
+#         cache[graph] ← graph.version, NumPy views of graph.offsets, targets and weights
+#     return cache[graph]
+
+# function HEURISTIC_ARRAY(problem, states) returns heuristics
+#     values ← cache[problem.heuristics], or an array of NaN (not computed yet)  // shared by the queries of a provider
+#     for each state of states whose value is NaN do
+#         values[state] ← problem.heuristics[state]  // only the states a search asks for
+#     return values[states]
+
+# function EXPAND_BATCH(problem, state, informed) returns (neighbors, costs, heuristics)
+#     CHARGE_EXPANSION(problem.budget)
+#     offsets, targets, weights ← GRAPH_ARRAYS(problem)
+#     neighbors ← targets[offsets[state] : offsets[state + 1]]
+#     costs ← weights[offsets[state] : offsets[state + 1]]
+#     if not informed then return neighbors, costs, null
+#     return neighbors, costs, HEURISTIC_ARRAY(problem, neighbors)
+
+# (version, arrays) of each graph, the values of each heuristic provider, and for the lists (which
+# cannot be weakly referenced) {id(list): (list, values)} of the graph they belong to.
+_graph_cache = weakref.WeakKeyDictionary()
+_heuristic_cache = weakref.WeakKeyDictionary()
+_list_cache = weakref.WeakKeyDictionary()
+
+
+def _as_array(values, dtype):
+    # View a buffer (array.array, memoryview) as a NumPy array without copying, or copy a plain list.
+    try:
+        return np.frombuffer(values, dtype=dtype)
+    except TypeError:
+        return np.asarray(values, dtype=dtype)
+
+
+def graph_arrays(problem):
+    """
+    Returns the CSR arrays of a problem's graph as NumPy arrays.
+
+    The arrays are views over the graph's own buffers when possible (including memory-mapped
+    graph files). They are built once per graph and `version`, so queries on the same graph share
+    them and a change of the edges (`Problems.update_edges`) makes the next call build them again.
+
+    Args:
+        problem (Problems): A problem backed by a `CSRGraph`.
+
+    Returns:
+        tuple: The `offsets`, `targets` and `weights` arrays.
+    """
+    graph = problem.graph
+    cached = _graph_cache.get(graph)
+    if cached is None or cached[0] != graph.version:
+        if hasattr(graph, "load_all"):
+            graph.load_all()  # A streaming graph must be complete before its buffers are shared.
+        arrays = (
+            _as_array(graph.offsets, np.int64),
+            _as_array(graph.targets, np.int32),
+            _as_array(graph.weights, np.int64),
+        )
+        cached = _graph_cache[graph] = (graph.version, arrays)
+    return cached[1]
+
+
+def heuristic_array(problem, states):
+    """
+    Returns the heuristics of some states as a NumPy array.
+
+    A value is asked from the heuristic provider the first time a state needs it and kept for the
+    later calls with the same provider, so a lazy provider (coordinates, landmarks, `CachedHeuristic`)
+    is only evaluated on the states a search generates, and a static table is converted once for
+    all the queries that share it.
+
+    Args:
+        problem (Problems): The problem whose `heuristics` are looked up.
+        states (numpy.ndarray): The states.
+
+    Returns:
+        numpy.ndarray: The heuristic of each state, as floats.
+    """
+    heuristics = problem.heuristics
+    if isinstance(heuristics, list):
+        memo = _list_cache.setdefault(problem.graph, {})
+        cached = memo.get(id(heuristics))
+        if cached is None:
+            cached = memo[id(heuristics)] = (heuristics, np.asarray(heuristics, dtype=np.float64))
+        values = cached[1]
+    else:
+        values = _heuristic_cache.get(heuristics)
+        if values is None:
+            if isinstance(heuristics, array):
+                values = np.asarray(heuristics, dtype=np.float64)
+            else:
+                values = np.full(problem.graph.num_nodes, np.nan)
+            _heuristic_cache[heuristics] = values
+    missing = states[np.isnan(values[states])]
+    if missing.size:
+        values[missing] = [heuristics[s] for s in missing.tolist()]
+    return values[states]
+
+
+def expand_batch(problem, state, informed=True):
+    """
+    Generates all children of a state at once, as NumPy arrays instead of one Node per child.
+
+    Args:
+        problem (Problems): A problem backed by a `CSRGraph`.
+        state (int): The state to expand.
+        informed (bool): Whether to look up the heuristics of the children; uninformed searches skip it.
+
+    Returns:
+        tuple: The `neighbors`, step `costs` and `heuristics` (None if not informed) of the children, as
+        parallel arrays.
+    """
+    offsets, targets, weights = graph_arrays(problem)
+    start, end = offsets[state], offsets[state + 1]
+    if problem.budget is not None:
+        problem.budget.charge_expansion(int(end - start), state)
+    neighbors = targets[start:end]
+    if not informed:
+        return neighbors, weights[start:end], None
+    return neighbors, weights[start:end], heuristic_array(problem, neighbors)
+
+
+def store_arrays(store):
+    """
+    Returns writable NumPy views of the arrays of a `NodeStore`, so vectorised searches can
+    update many nodes in one operation.
+
+    Args:
+        store (NodeStore): The node store to view.
+
+    Returns:
+        tuple: The `reached` (bool), `parents`, `path_costs` and `heuristics` arrays of the store.
+    """
+    return (
+        np.frombuffer(store.reached, dtype=np.bool_),
+        np.frombuffer(store.parents, dtype=np.int64),
+        np.frombuffer(store.path_costs, dtype=np.float64),
+        np.frombuffer(store.heuristics, dtype=np.float64),
+    )
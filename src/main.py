@@ -1,151 +1,479 @@
+import argparse
 import os
 import time
 import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
 from common.problem import Problems
-from common.utils import read_input, write_output
+from common.budget import BudgetExceeded, SearchBudget
+from common.cache import ResultCache
+from common.utils import write_json_output, write_output
+from common.graph_file import read_problem
 from algorithms.bfs import bfs
-from algorithms.dfs import dfs
+from algorithms.dfs import dfs, dfs_graph, dfs_on_path
 from algorithms.ucs import ucs
 from algorithms.ids import ids
 from algorithms.gbfs import gbfs
 from algorithms.a_star import a_star_search
-from algorithms.hill_climbing import hill_climbing
+from algorithms.hill_climbing import (
+    hill_climbing,
+    local_beam_search,
+    random_restart_hill_climbing,
+)
+from algorithms.bidirectional import bidirectional_bfs, bidirectional_ucs
+from algorithms.ida_star import ida_star
+from algorithms.sma_star import sma_star
+from algorithms.contraction_hierarchies import ch_search, prepare_hierarchy
+from algorithms.anytime_a_star import (
+    anytime_weighted_a_star_search,
+    ara_star_search,
+    focal_search,
+    weighted_a_star_search,
+)
+from algorithms.lpa_star import lpa_star
+
+# The algorithms run by main(), in output order.
+ALGORITHMS = {
+    "BFS": bfs,
+    "DFS": dfs,
+    "UCS": ucs,
+    "IDS": ids,
+    "GBFS": gbfs,
+    "A*": a_star_search,
+    "Hill-climbing": hill_climbing,
+    "Bidirectional BFS": bidirectional_bfs,
+    "Bidirectional UCS": bidirectional_ucs,
+    "IDA*": ida_star,
+    "SMA*": sma_star,
+    "Contraction Hierarchies": ch_search,
+    "DFS (graph search)": dfs_graph,
+    "DFS (on-path check)": dfs_on_path,
+    "Hill-climbing (random restart)": random_restart_hill_climbing,
+    "Local beam search": local_beam_search,
+    "Weighted A*": weighted_a_star_search,
+    "Anytime weighted A*": anytime_weighted_a_star_search,
+    "ARA*": ara_star_search,
+    "Focal search": focal_search,
+    "LPA*": lpa_star,
+}
+
+# The preprocessing of the algorithms that have one, run on the problem before they are measured.
+PREPROCESSING = {ch_search: prepare_hierarchy}
 
 # Pseudo-code for run_algorithm()
-# function RUN_ALGORITHM(algorithm, problem) returns path
-#     path ← algorithm(problem)  # Execute the algorithm on the problem
+# function RUN_ALGORITHM(algorithm, problem, budget, cache) returns path
+#     if cache is not null then return RUN_CACHED(algorithm, problem, budget, cache).path
+#     problem.budget ← budget  # The expansion primitives and frontiers charge it
+#     START(budget)
+#     try
+#         path ← algorithm(problem)  # Execute the algorithm on the problem
+#     catch BudgetExceeded e
+#         path ← e  # A distinct result: the search ran out of budget
+#     problem.budget ← null
 #     return path  # Return the path found by the algorithm
 
 
-def run_algorithm(algorithm, problem):
+def run_algorithm(algorithm, problem, budget=None, cache=None):
     """
     Wrapper function to run the specified algorithm on the given problem.
 
     Args:
         algorithm (function): The search algorithm to be executed.
         problem (Problems): The problem instance on which the algorithm will run.
+        budget (SearchBudget): The limits of the search, or None for no limits.
+        cache (ResultCache): The cache of earlier results to answer from, or None to always search.
+            Results that ran out of budget are not cached.
 
     Returns:
-        list: The path found by the algorithm from the initial state to the goal state.
+        list or None or BudgetExceeded: The path found by the algorithm from the initial state to the goal state,
+        None if there is no path, or the BudgetExceeded error if the search ran out of budget.
     """
-    path = algorithm(problem)  # Run the algorithm on the problem instance.
+    if cache is not None:
+        return run_cached(algorithm, problem, budget, cache)[0]
+    problem.budget = budget  # Attach the budget, so the search charges it.
+    if budget is not None:
+        budget.start()  # Reset the counters and the clock for this run.
+    try:
+        path = algorithm(problem)  # Run the algorithm on the problem instance.
+    except BudgetExceeded as e:
+        path = e  # Report the exhausted budget instead of a path.
+    finally:
+        problem.budget = None
     return path  # Return the path found by the algorithm.
 
 
+# Pseudo-code for run_cached()
+# function RUN_CACHED(algorithm, problem, budget, cache) returns (path, hit)
+#     key ← cache.KEY(problem, algorithm)  # Graph fingerprint, initial, goal, algorithm
+#     found, path ← cache.GET(key)
+#     if found then return path, true  # No search at all
+#     path ← RUN_ALGORITHM(algorithm, problem, budget)
+#     if path is not a BudgetExceeded then cache.PUT(key, path)
+#     return path, false
+
+
+def run_cached(algorithm, problem, budget, cache):
+    """
+    Runs an algorithm like `run_algorithm`, answering from a result cache when it can.
+
+    Whether the result came from the cache is returned for this lookup only: the hit counters
+    of the cache are shared, e.g. by the threads of the server, so comparing them before and
+    after the run would also count the hits of other queries.
+
+    Args:
+        algorithm (function): The search algorithm to be executed.
+        problem (Problems): The problem instance on which the algorithm will run.
+        budget (SearchBudget): The limits of the search, or None for no limits.
+        cache (ResultCache): The cache of earlier results. Results that ran out of budget are not cached.
+
+    Returns:
+        tuple: The result of `run_algorithm`, and whether it came from the cache.
+    """
+    key = cache.key(problem, algorithm)
+    found, path = cache.get(key)
+    if found:
+        return (list(path) if path is not None else None), True  # A copy, the cached path stays intact.
+    path = run_algorithm(algorithm, problem, budget)
+    if not isinstance(path, BudgetExceeded):
+        cache.put(key, path)
+    return path, False
+
+
+# Pseudo-code for preprocess()
+# function PREPROCESS(algorithm, problem, budget) returns (error, duration)
+#     if algorithm has no PREPROCESSING then return null, null
+#     start_time ← time.perf_counter()
+#     result ← RUN_ALGORITHM(PREPROCESSING[algorithm], problem, budget)  # Kept on the problem, e.g. problem.HIERARCHY
+#     return (result if it is a BudgetExceeded else null), time.perf_counter() - start_time
+
+
+def preprocess(algorithm, problem, budget=None):
+    """
+    Runs the preprocessing of an algorithm (see `PREPROCESSING`) on a problem, so that its
+    measured runs time the queries only. The preprocessing keeps its result on the problem, so
+    it is only paid once per problem.
+
+    Args:
+        algorithm (function): The search algorithm about to be measured.
+        problem (Problems): The problem instance on which the algorithm will run.
+        budget (SearchBudget): The limits of the preprocessing, or None for no limits.
+
+    Returns:
+        tuple: The BudgetExceeded error if the preprocessing ran out of budget (otherwise None), and its duration
+        in seconds (None if the algorithm has no preprocessing).
+    """
+    if algorithm not in PREPROCESSING:
+        return None, None
+    start_time = time.perf_counter()
+    result = run_algorithm(PREPROCESSING[algorithm], problem, budget)
+    duration = time.perf_counter() - start_time
+    return (result if isinstance(result, BudgetExceeded) else None), duration
+
+
 # Pseudo-code for measure_time()
-# function MEASURE_TIME(algorithm, problem) returns (path, duration, memory_usage)
-#     tracemalloc.start()  # Start memory tracking
+# function MEASURE_TIME(algorithm, problem, budget, cache) returns (path, duration, memory_usage, counters)
+#     error, preprocessing ← PREPROCESS(algorithm, problem, budget)  # Not part of the measured runs
+#     if error is not null then return error, preprocessing, 0, {preprocessing}
 #     start_time ← time.perf_counter()  # Record start time
-#     path ← RUN_ALGORITHM(algorithm, problem)  # Run the algorithm
+#     path, hit ← RUN_CACHED(algorithm, problem, budget, cache), or RUN_ALGORITHM(algorithm, problem, budget), false without a cache
 #     end_time ← time.perf_counter()  # Record end time
 #     duration ← end_time - start_time  # Calculate duration
-#     current, peak ← tracemalloc.get_traced_memory()  # Get memory usage
-#     tracemalloc.stop()  # Stop memory tracking
-#     return path, duration, peak / 1024  # Return path, duration, and memory usage in KB
+#     counters ← budget, or SearchBudget() without limits  # Counts the work of the traced run
+#     tracemalloc.start()  # Start memory tracking
+#     try
+#         RUN_ALGORITHM(algorithm, problem, counters, cache if the first run was a cache hit)  # Run again, traced
+#         current, peak ← tracemalloc.get_traced_memory()  # Get memory usage
+#     finally
+#         tracemalloc.stop()  # Stop memory tracking
+#     return path, duration, peak / 1024, COUNTERS(counters) + {preprocessing}  # Path, duration, memory usage in KB and counters
 
 
-def measure_time(algorithm, problem):
+def measure_time(algorithm, problem, budget=None, cache=None):
     """
     Wrapper function to measure the time and memory taken to run the algorithm.
 
+    tracemalloc slows down every allocation, so the time is measured on a run without tracing
+    and the peak memory on a second, traced run. See `benchmark.py` for repeated measurements.
+    When the result comes from the cache, both measure the cache lookup; otherwise both measure
+    the search. The work counters (see `SearchBudget.counters`) come from the traced run, so
+    the timed run only pays for them if `budget` is given.
+
+    The preprocessing of an algorithm (see `preprocess`) runs first, under the same budget, and
+    is measured by neither run: its duration is reported separately, as the `preprocessing`
+    counter (in seconds).
+
     Args:
         algorithm (function): The search algorithm to be executed.
         problem (Problems): The problem instance on which the algorithm will run.
+        budget (SearchBudget): The limits of the search, or None for no limits.
+        cache (ResultCache): The cache of earlier results, or None to always search.
 
     Returns:
-        tuple: A tuple containing the path, duration (in seconds), and memory usage (in KB).
+        tuple: A tuple containing the path, duration (in seconds), memory usage (in KB) and work counters (dict).
     """
-    tracemalloc.start()  # Start tracing memory allocations.
+    error, preprocessing = preprocess(algorithm, problem, budget)  # Not part of the measured runs.
+    if error is not None:
+        return error, preprocessing, 0.0, {"preprocessing": preprocessing}
     start_time = time.perf_counter()  # Record the start time.
-    path = run_algorithm(algorithm, problem)  # Run the algorithm.
+    if cache is not None:
+        path, hit = run_cached(algorithm, problem, budget, cache)  # Run the algorithm, untraced.
+    else:
+        path, hit = run_algorithm(algorithm, problem, budget), False
     end_time = time.perf_counter()  # Record the end time.
     duration = (
         end_time - start_time
     )  # Calculate the duration of the algorithm execution.
-    current, peak = (
-        tracemalloc.get_traced_memory()
-    )  # Get the current and peak memory usage.
-    tracemalloc.stop()  # Stop tracing memory allocations.
+    counters = (
+        budget if budget is not None else SearchBudget()
+    )  # A budget without limits only counts the work.
+    tracemalloc.start()  # Start tracing memory allocations.
+    try:
+        run_algorithm(
+            algorithm, problem, counters, cache if hit else None
+        )  # Run the algorithm again, traced and counted.
+        current, peak = (
+            tracemalloc.get_traced_memory()
+        )  # Get the current and peak memory usage.
+    finally:
+        tracemalloc.stop()  # Stop tracing memory allocations, even if the algorithm raised.
+    counters = counters.counters()
+    if preprocessing is not None:
+        counters["preprocessing"] = preprocessing
     return (
         path,
         duration,
         peak / 1024,
+        counters,
     )  # Convert memory usage to KB and return the results.
 
 
 # Pseudo-code for main()
-# function MAIN(input_file, output_file)
+# function MAIN(input_file, output_file, budget, cache)
 #     try
-#         problem ← READ_INPUT(input_file)  # Read the problem from the input file
+#         problem ← READ_PROBLEM(input_file)  # Read the problem from the input file (text or binary graph file)
 #     catch Exception e
 #         print("Error reading input file " + input_file + ": " + e)
 #         return
 
-#     algorithms ← {
-#         "BFS": bfs,
-#         "DFS": dfs,
-#         "UCS": ucs,
-#         "IDS": ids,
-#         "GBFS": gbfs,
-#         "A*": a_star_search,
-#         "Hill-climbing": hill_climbing,
-#     }
 #     results ← empty dictionary
 
-#     for each (name, algorithm) in algorithms do
+#     for each (name, algorithm) in ALGORITHMS do
 #         try
-#             path, duration, memory_usage ← MEASURE_TIME(algorithm=algorithm, problem=problem)  # Measure the algorithm execution
-#             results[name] ← (path, duration, memory_usage)  # Store the results
+#             results[name] ← MEASURE_TIME(algorithm=algorithm, problem=problem, budget=budget, cache=cache)  # Path, duration, memory usage and counters
 #         catch Exception e
 #             print("Error running " + name + " on " + input_file + ": " + e)
-#             results[name] ← (None, 0, 0)  # Store default values in case of an error
+#             results[name] ← (None, 0, 0, null)  # Store default values in case of an error
 
 #     try
 #         WRITE_OUTPUT(output_file, results)  # Write the results to the output file
 #     catch Exception e
 #         print("Error writing output file " + output_file + ": " + e)
+#     return results
 
 
-def main(input_file, output_file):
+def main(input_file, output_file, budget=None, cache=None):
     try:
-        problem = read_input(input_file)
+        problem = read_problem(input_file)
     except Exception as e:
         print(f"Error reading input file {input_file}: {e}")
         return
-    algorithms = {
-        "BFS": bfs,
-        "DFS": dfs,
-        "UCS": ucs,
-        "IDS": ids,
-        "GBFS": gbfs,
-        "A*": a_star_search,
-        "Hill-climbing": hill_climbing,
-    }
     results = {}
-    for name, algorithm in algorithms.items():
+    for name, algorithm in ALGORITHMS.items():
         try:
-            path, duration, memory_usage = measure_time(
-                algorithm=algorithm, problem=problem
+            results[name] = measure_time(
+                algorithm=algorithm, problem=problem, budget=budget, cache=cache
             )
-            results[name] = (path, duration, memory_usage)
         except Exception as e:
             print(f"Error running {name} on {input_file}: {e}")
-            results[name] = (None, 0, 0)
+            results[name] = (None, 0, 0, None)
 
     try:
         write_output(output_file, results)
     except Exception as e:
         print(f"Error writing output file {output_file}: {e}")
+    return results
+
+
+# Pseudo-code for run_job()
+# function RUN_JOB(input_file, name, budget, cache) returns (path, duration, memory_usage, counters)
+#     if input_file is not loaded in this worker then
+#         problems[input_file] ← READ_PROBLEM(input_file)  # Each worker loads a graph once
+#     return MEASURE_TIME(ALGORITHMS[name], problems[input_file], budget, cache)  # Measured inside the worker
+
+
+# The problems already loaded by this (worker) process, by input file.
+_problems = {}
+
+
+def run_job(input_file, name, budget=None, cache=None):
+    """
+    Runs one algorithm on one input file. This is the unit of work of `run_parallel`.
+
+    The graph is read once per worker process and reused by every later job on the same file.
+    Time and memory are measured inside the worker, around the algorithm only.
+
+    Args:
+        input_file (str): Path to the input file.
+        name (str): The name of the algorithm in `ALGORITHMS`.
+        budget (SearchBudget): The limits of the search (e.g. its `max_time`), or None for no limits.
+        cache (ResultCache): The result cache, or None. Each job gets a copy with an empty memory
+            tier, so across processes only its disk tier is shared.
+
+    Returns:
+        tuple: A tuple containing the path, duration (in seconds), memory usage (in KB) and work counters (dict).
+    """
+    if input_file not in _problems:
+        _problems[input_file] = read_problem(input_file)
+    return measure_time(
+        algorithm=ALGORITHMS[name],
+        problem=_problems[input_file],
+        budget=budget,
+        cache=cache,
+    )
+
+
+# Pseudo-code for run_parallel()
+# function RUN_PARALLEL(files, workers, budget, cache)
+#     pool ← a process pool with workers processes
+#     for each (input_file, output_file) in files do
+#         for each name in ALGORITHMS do
+#             futures[input_file, name] ← SUBMIT(pool, RUN_JOB, input_file, name, budget, cache)
+#     for each (input_file, output_file) in files do
+#         results ← empty dictionary
+#         for each name in ALGORITHMS do
+#             try
+#                 results[name] ← RESULT(futures[input_file, name])
+#             catch Exception e
+#                 print("Error running " + name + " on " + input_file + ": " + e)
+#                 results[name] ← (None, 0, 0, null)
+#         WRITE_OUTPUT(output_file, results)
+#         all_results[input_file] ← results
+#     return all_results
+
+
+def run_parallel(files, workers=None, budget=None, cache=None):
+    """
+    Runs every algorithm on every input file across a process pool and writes one output file
+    per input file, in the same format as `main`.
+
+    Each (input file, algorithm) pair is a separate job, so all of them can run at the same time.
+
+    Args:
+        files (list): A list of (input_file, output_file) pairs.
+        workers (int): The number of worker processes, or None for one per CPU.
+        budget (SearchBudget): The limits applied to each job separately, or None for no limits.
+        cache (ResultCache): The result cache of the jobs (see `run_job`), or None.
+
+    Returns:
+        dict: The results of each input file, by input file.
+    """
+    all_results = {}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            (input_file, name): pool.submit(run_job, input_file, name, budget, cache)
+            for input_file, _ in files
+            for name in ALGORITHMS
+        }
+
+        for input_file, output_file in files:
+            results = {}
+            for name in ALGORITHMS:
+                try:
+                    results[name] = futures[input_file, name].result()
+                except Exception as e:
+                    print(f"Error running {name} on {input_file}: {e}")
+                    results[name] = (None, 0, 0, None)
+
+            try:
+                write_output(output_file, results)
+            except Exception as e:
+                print(f"Error writing output file {output_file}: {e}")
+            all_results[input_file] = results
+    return all_results
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the search algorithms on the test inputs.")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="number of worker processes; 1 runs everything sequentially in this process",
+    )
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=None,
+        help="time limit of each (input file, algorithm) run in seconds",
+    )
+    parser.add_argument(
+        "--max-expansions",
+        type=int,
+        default=None,
+        help="maximum number of nodes each run may expand",
+    )
+    parser.add_argument(
+        "--max-frontier",
+        type=int,
+        default=None,
+        help="maximum number of nodes in the frontier of each run",
+    )
+    parser.add_argument(
+        "--cache",
+        choices=["lru", "lfu"],
+        default=None,
+        help="answer repeated (graph, start, goal, algorithm) runs from a result cache with this eviction policy",
+    )
+    parser.add_argument(
+        "--cache-bytes",
+        type=int,
+        default=64 * 1024 * 1024,
+        help="memory limit of the result cache in bytes",
+    )
+    parser.add_argument(
+        "--cache-file",
+        default=None,
+        help="SQLite file that keeps the cached results between runs",
+    )
+    parser.add_argument(
+        "--json",
+        default=None,
+        help="also write the results (paths, times, memory and work counters) to this JSON file",
+    )
+    args = parser.parse_args()
+    cache = None
+    if args.cache is not None:
+        cache = ResultCache(
+            max_bytes=args.cache_bytes, policy=args.cache, path=args.cache_file
+        )
+    budget = None  # Without limits, only the traced run of measure_time counts the work.
+    if any(limit is not None for limit in (args.max_expansions, args.timeout, args.max_frontier)):
+        budget = SearchBudget(
+            max_expansions=args.max_expansions,
+            max_time=args.timeout,
+            max_frontier=args.max_frontier,
+        )
+
     input_folder = "test/input"
     output_folder = "test/output"
 
     if not os.path.exists(output_folder):
         os.makedirs(output_folder)
 
-    for i in range(1, 6):
-        input_file = os.path.join(input_folder, f"input{i}.txt")
-        output_file = os.path.join(output_folder, f"output{i}.txt")
-        main(input_file, output_file)
+    files = [
+        (
+            os.path.join(input_folder, f"input{i}.txt"),
+            os.path.join(output_folder, f"output{i}.txt"),
+        )
+        for i in range(1, 6)
+    ]
+    if args.workers > 1:
+        all_results = run_parallel(files, workers=args.workers, budget=budget, cache=cache)
+    else:
+        all_results = {
+            input_file: main(input_file, output_file, budget=budget, cache=cache)
+            for input_file, output_file in files
+        }
+        if cache is not None:
+            print(f"Result cache: {cache.stats()}")
+    if args.json:
+        write_json_output(args.json, all_results)
@@ -0,0 +1,410 @@
+import argparse
+import copy
+import json
+import os
+import socketserver
+import statistics
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from benchmark import percentile
+from common.budget import BudgetExceeded, SearchBudget
+from common.cache import ResultCache
+from common.contraction import ContractionHierarchy
+from common.graph_file import read_problem
+from common.landmarks import Landmarks
+from main import ALGORITHMS, run_algorithm, run_cached
+
+# Query server
+# The graph is read once and stays resident. Each query is a (start, goal, algorithm) triple that
+# runs on `problem.with_query(start, goal)`, a per-query view of the shared graph. Its preprocessed
+# indexes (reverse graph, landmarks, contraction hierarchy) are also built or loaded once and shared.
+
+# Protocol (JSON lines, over stdin/stdout or a local TCP socket):
+#     request:  {"start": 0, "goal": 7, "algorithm": "A*"}      → one response object
+#     request:  [{...}, {...}, ...]                             → one list of responses, in order
+#     request:  {"command": "stats"}                            → the latency statistics
+#     response: {"start": 0, "goal": 7, "algorithm": "A*", "path": [0, 1, 7], "cost": 12,
+#                "time": 0.0001, "latency": 0.0003}
+#     `path` is null when there is no path, and `error` is set when the query failed or ran out of budget.
+
+# Pseudo-code for answer()
+# function ANSWER(start, goal, name, budget) returns (path, cost, duration, hit)
+#     query ← PROBLEM.WITH_QUERY(start, goal)  # The graph loaded by this worker, shared by every query
+#     start_time ← time.perf_counter()
+#     path, hit ← RUN_CACHED(ALGORITHMS[name], query, budget, CACHE)  # hit: whether CACHE answered this query
+#     if PROBLEM.HIERARCHY is null then PROBLEM.HIERARCHY ← query.HIERARCHY  # Built by the query: keep it
+#     return path, PATH_COST(path), time.perf_counter() - start_time, hit
+
+
+# The problem loaded by this (worker) process, and its result cache (or None).
+_problem = None
+_cache = None
+
+
+def load(input_file, cache=None, landmarks=None, hierarchy=None):
+    """
+    Reads the graph of an input file into this process, once. This is also the initializer of
+    the worker processes of `QueryEngine`.
+
+    Args:
+        input_file (str): Path to the input file (text or binary graph file).
+        cache (ResultCache): The result cache of the queries answered by this process, or None.
+        landmarks (str): Path to the landmarks of the graph (from `Landmarks.save`), whose ALT
+            heuristic then serves every query, or None.
+        hierarchy (str): Path to the contraction hierarchy of the graph (from
+            `ContractionHierarchy.save`), shared by every "Contraction Hierarchies" query, or None
+            for each query to build its own.
+    """
+    global _problem, _cache
+    _cache = cache
+    _problem = read_problem(input_file)
+    if hasattr(_problem.graph, "load_all"):
+        _problem.graph.load_all()
+    _problem.reverse_graph  # Built once here, then shared by the queries of bidirectional searches.
+    if landmarks is not None:
+        _problem.use_landmarks(Landmarks.load(landmarks))
+    if hierarchy is not None:
+        _problem.use_hierarchy(ContractionHierarchy.load(hierarchy))
+
+
+def answer(start, goal, name, budget=None):
+    """
+    Answers one query on the graph loaded by `load`. This is the unit of work of `QueryEngine`.
+
+    Args:
+        start (int): The initial state of the query.
+        goal (int): The goal state of the query.
+        name (str): The name of the algorithm in `ALGORITHMS`.
+        budget (SearchBudget): The limits of the search, or None for no limits.
+
+    Returns:
+        tuple: The path (a list, None, or the BudgetExceeded error), its cost, the duration of the search (in seconds)
+        and whether the result came from the cache.
+    """
+    query = _problem.with_query(start, goal)
+    start_time = time.perf_counter()
+    if _cache is not None:
+        path, hit = run_cached(ALGORITHMS[name], query, budget, _cache)
+    else:
+        path, hit = run_algorithm(ALGORITHMS[name], query, budget), False
+    duration = time.perf_counter() - start_time
+    if _problem.hierarchy is None and query.hierarchy is not None:
+        _problem.use_hierarchy(query.hierarchy)  # Built by this query, shared by the next ones.
+    cost = None
+    if isinstance(path, list):
+        cost = sum(query.graph.weight(s, s_prime) for s, s_prime in zip(path, path[1:]))
+    return path, cost, duration, hit
+
+
+class LatencyStats:
+    """
+    Per-algorithm latency statistics of the answered queries. Thread-safe.
+
+    The memory does not grow with the number of queries: the percentiles are computed over the
+    last `window` latencies of each algorithm (a ring buffer), while the number of queries, the
+    mean and the maximum cover every query.
+
+    Attributes:
+        window: The number of recent latencies kept per algorithm for the percentiles.
+        latencies: The last `window` latencies (in seconds) of the answered queries, by algorithm.
+        counts: The number of answered queries, by algorithm.
+        totals: The sum of the latencies of all answered queries, by algorithm.
+        maxima: The largest latency of all answered queries, by algorithm.
+        errors: The number of failed queries, by algorithm.
+        cache_hits: The number of queries answered from the result cache, by algorithm.
+    """
+
+    def __init__(self, window=10000):
+        self.window = window
+        self.latencies = {}
+        self.counts = {}
+        self.totals = {}
+        self.maxima = {}
+        self.errors = {}
+        self.cache_hits = {}
+        self.lock = threading.Lock()
+
+    def record(self, name, latency, error=False, hit=False):
+        # Record the latency of one query, whether it failed and whether the cache answered it.
+        with self.lock:
+            if name not in self.latencies:
+                self.latencies[name] = deque(maxlen=self.window)  # The oldest latency drops out.
+            self.latencies[name].append(latency)
+            self.counts[name] = self.counts.get(name, 0) + 1
+            self.totals[name] = self.totals.get(name, 0.0) + latency
+            self.maxima[name] = max(self.maxima.get(name, 0.0), latency)
+            if error:
+                self.errors[name] = self.errors.get(name, 0) + 1
+            if hit:
+                self.cache_hits[name] = self.cache_hits.get(name, 0) + 1
+
+    def summary(self):
+        """
+        Summarises the latencies recorded so far.
+
+        Returns:
+            dict: For each algorithm, the number of queries and errors, the cache hit rate, the mean and maximum
+            latency, and the median, p95 and p99 latency of the last `window` queries, in milliseconds.
+        """
+        with self.lock:
+            return {
+                name: {
+                    "queries": self.counts[name],
+                    "errors": self.errors.get(name, 0),
+                    "cache_hit_rate": self.cache_hits.get(name, 0) / self.counts[name],
+                    "mean_ms": self.totals[name] / self.counts[name] * 1000,
+                    "p50_ms": statistics.median(values) * 1000,
+                    "p95_ms": percentile(values, 95) * 1000,
+                    "p99_ms": percentile(values, 99) * 1000,
+                    "max_ms": self.maxima[name] * 1000,
+                }
+                for name, values in self.latencies.items()
+            }
+
+
+# Pseudo-code for QueryEngine.submit()
+# function SUBMIT(start, goal, name) returns a future response
+#     submitted ← time.perf_counter()
+#     future ← SUBMIT(pool, ANSWER, start, goal, name, budget)  # or ANSWER now, with one worker
+#     when future is done:
+#         latency ← time.perf_counter() - submitted  # Queueing included
+#         RECORD(stats, name, latency)
+#         resolve the response
+
+
+class QueryEngine:
+    """
+    Answers (start, goal, algorithm) queries on one resident graph.
+
+    With more than one worker, every worker process loads the graph once when it starts, and the
+    queries are spread over the pool, so they run concurrently (processes, not threads, since
+    the searches are CPU-bound Python code). With one worker, queries run in the calling thread.
+
+    Attributes:
+        input_file: Path to the input file of the graph.
+        workers: The number of worker processes.
+        budget: The limits applied to each query separately, or None for no limits.
+        cache: The `ResultCache` of the queries, or None. Each worker process gets its own memory
+            tier, and they share its disk tier.
+        landmarks: Path to the landmarks whose ALT heuristic serves the queries, or None.
+        hierarchy: Path to the contraction hierarchy shared by the queries, or None.
+        stats: The `LatencyStats` of the answered queries.
+    """
+
+    def __init__(
+        self, input_file, workers=1, budget=None, cache=None, landmarks=None, hierarchy=None
+    ):
+        self.input_file = input_file
+        self.workers = workers
+        self.budget = budget
+        self.cache = cache
+        self.landmarks = landmarks
+        self.hierarchy = hierarchy
+        self.stats = LatencyStats()
+        self.pool = None
+        if workers > 1:
+            self.pool = ProcessPoolExecutor(
+                max_workers=workers, initializer=load, initargs=(input_file, cache, landmarks, hierarchy)
+            )
+        else:
+            load(input_file, cache, landmarks, hierarchy)
+
+    def submit(self, start, goal, name):
+        """
+        Starts answering one query.
+
+        Args:
+            start (int): The initial state.
+            goal (int): The goal state.
+            name (str): The name of the algorithm in `ALGORITHMS`.
+
+        Returns:
+            Future: A future of the response (a dict, see the protocol at the top of this module).
+        """
+        response = {"start": start, "goal": goal, "algorithm": name}
+        submitted = time.perf_counter()
+        result = Future()
+
+        def done(job):
+            latency = time.perf_counter() - submitted
+            hit = False
+            try:
+                path, cost, duration, hit = job.result()
+                if isinstance(path, BudgetExceeded):
+                    response.update(path=None, error=str(path))
+                else:
+                    response.update(path=path, cost=cost)
+                response.update(time=duration)
+            except Exception as e:
+                response.update(path=None, error=f"{type(e).__name__}: {e}")
+            response["latency"] = latency
+            self.stats.record(name, latency, error="error" in response, hit=hit)
+            result.set_result(response)
+
+        if name not in ALGORITHMS:
+            job = Future()
+            job.set_exception(KeyError(f"unknown algorithm {name!r}"))
+        elif self.pool is not None:
+            job = self.pool.submit(answer, start, goal, name, self.budget)
+        else:
+            job = Future()
+            try:
+                # A copy per query: connections may run queries at the same time, each with its own clock.
+                job.set_result(answer(start, goal, name, copy.copy(self.budget)))
+            except Exception as e:
+                job.set_exception(e)
+        job.add_done_callback(done)
+        return result
+
+    def query_batch(self, queries):
+        """
+        Answers a batch of queries concurrently.
+
+        Args:
+            queries (list): (start, goal, algorithm) triples.
+
+        Returns:
+            list: The responses, in the order of the queries.
+        """
+        futures = [self.submit(start, goal, name) for start, goal, name in queries]
+        return [future.result() for future in futures]
+
+    def handle(self, line):
+        """
+        Answers one line of the protocol.
+
+        Args:
+            line (str): A JSON request: a query object, a list of query objects, or a command.
+
+        Returns:
+            str: The JSON response line.
+        """
+        try:
+            request = json.loads(line)
+            if isinstance(request, dict) and request.get("command") == "stats":
+                return json.dumps(self.stats.summary())
+            batch = request if isinstance(request, list) else [request]
+            queries = [
+                (int(query["start"]), int(query["goal"]), query.get("algorithm", "A*"))
+                for query in batch
+            ]
+        except (ValueError, KeyError, TypeError) as e:
+            return json.dumps({"error": f"bad request: {e}"})
+        responses = self.query_batch(queries)
+        return json.dumps(responses if isinstance(request, list) else responses[0])
+
+    def close(self):
+        # Stop the worker processes.
+        if self.pool is not None:
+            self.pool.shutdown()
+
+
+def serve_stdio(engine, input_stream=sys.stdin, output_stream=sys.stdout):
+    # Answer one request per input line until the end of the input.
+    for line in input_stream:
+        if line.strip():
+            output_stream.write(engine.handle(line) + "\n")
+            output_stream.flush()
+
+
+def serve_tcp(engine, host="127.0.0.1", port=8765):
+    # Answer requests from any number of local connections, one thread per connection.
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            for line in self.rfile:
+                if line.strip():
+                    self.wfile.write((engine.handle(line.decode()) + "\n").encode())
+
+    socketserver.ThreadingTCPServer.allow_reuse_address = True
+    with socketserver.ThreadingTCPServer((host, port), Handler) as server:
+        print(f"Serving {engine.input_file} on {host}:{port}", file=sys.stderr)
+        server.serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Keep a graph loaded and answer (start, goal, algorithm) queries as JSON lines."
+    )
+    parser.add_argument("input", help="input file (text or binary graph file)")
+    parser.add_argument(
+        "--workers", type=int, default=1, help="number of worker processes"
+    )
+    parser.add_argument(
+        "--port",
+        type=int,
+        default=None,
+        help="serve on this local TCP port instead of stdin/stdout",
+    )
+    parser.add_argument(
+        "--timeout", type=float, default=None, help="time limit of each query in seconds"
+    )
+    parser.add_argument(
+        "--cache",
+        choices=["lru", "lfu"],
+        default=None,
+        help="answer repeated queries from a result cache with this eviction policy",
+    )
+    parser.add_argument(
+        "--cache-bytes", type=int, default=64 * 1024 * 1024, help="memory limit of the result cache"
+    )
+    parser.add_argument(
+        "--cache-file", default=None, help="SQLite file that keeps the cached results"
+    )
+    parser.add_argument(
+        "--landmarks",
+        type=int,
+        default=None,
+        help="precompute this many landmarks and answer queries with their ALT heuristic",
+    )
+    parser.add_argument(
+        "--landmarks-file",
+        default=None,
+        help="file of the landmarks: loaded if it exists, else written after --landmarks builds them",
+    )
+    parser.add_argument(
+        "--hierarchy",
+        action="store_true",
+        help="precompute the contraction hierarchy once and share it with every query",
+    )
+    parser.add_argument(
+        "--hierarchy-file",
+        default=None,
+        help="file of the contraction hierarchy: loaded if it exists, else written after --hierarchy builds it",
+    )
+    args = parser.parse_args()
+
+    budget = SearchBudget(max_time=args.timeout) if args.timeout is not None else None
+    cache = None
+    if args.cache is not None:
+        cache = ResultCache(max_bytes=args.cache_bytes, policy=args.cache, path=args.cache_file)
+    landmarks = args.landmarks_file
+    if args.landmarks is not None and (landmarks is None or not os.path.exists(landmarks)):
+        # Build the landmarks once in this process; the workers load them from the file.
+        landmarks = landmarks or os.path.splitext(args.input)[0] + ".landmarks"
+        Landmarks.build(read_problem(args.input), k=args.landmarks).save(landmarks)
+    hierarchy = args.hierarchy_file
+    if args.hierarchy and (hierarchy is None or not os.path.exists(hierarchy)):
+        # Contract the graph once in this process; the workers load the hierarchy from the file.
+        hierarchy = hierarchy or os.path.splitext(args.input)[0] + ".hierarchy"
+        ContractionHierarchy.build(read_problem(args.input)).save(hierarchy)
+    engine = QueryEngine(
+        args.input,
+        workers=args.workers,
+        budget=budget,
+        cache=cache,
+        landmarks=landmarks,
+        hierarchy=hierarchy,
+    )
+    try:
+        if args.port is not None:
+            serve_tcp(engine, port=args.port)
+        else:
+            serve_stdio(engine)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        engine.close()
+        print(json.dumps(engine.stats.summary(), indent=2), file=sys.stderr)
@@ -0,0 +1,45 @@
+import unittest
+from algorithms.anytime_a_star import anytime_focal_search, anytime_weighted_a_star, ara_star
+from algorithms.ucs import ucs
+from common.budget import SearchBudget
+from common.generators import grid_graph, random_geometric_graph
+
+# Run from src/: python -m pytest test
+
+
+def path_cost(problem, path):
+    return None if path is None else sum(map(problem.graph.weight, path, path[1:]))
+
+
+class AnytimeBoundTest(unittest.TestCase):
+    """The bound of an anytime search stopped by `problem.budget`, possibly in the middle of an expansion."""
+
+    def test_bound_after_budget_stop(self):
+        searches = {
+            "AWA*": anytime_weighted_a_star,
+            "ARA*": ara_star,
+            "focal search": anytime_focal_search,
+        }
+        for seed in range(6):
+            problem = grid_graph(6, 6, seed=seed) if seed % 2 else random_geometric_graph(60, seed=seed)
+            optimal = path_cost(problem, ucs(problem))
+            for name, search in searches.items():
+                for limit in range(1, 60):
+                    for budget in (SearchBudget(max_expansions=limit), SearchBudget(max_frontier=limit)):
+                        problem.budget = budget
+                        try:
+                            result = search(problem)
+                        finally:
+                            problem.budget = None
+                        if result.path is None:
+                            continue
+                        self.assertEqual(result.cost, path_cost(problem, result.path))
+                        self.assertLessEqual(
+                            result.cost,
+                            result.bound * optimal + 1e-9,
+                            f"{name} on seed {seed}, {budget.max_expansions=}, {budget.max_frontier=}",
+                        )
+
+
+if __name__ == "__main__":
+    unittest.main()
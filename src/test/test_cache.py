@@ -0,0 +1,41 @@
+import os
+import tempfile
+import unittest
+from algorithms.ucs import ucs
+from common.cache import ResultCache
+from common.generators import grid_graph
+
+# Run from src/: python -m pytest test
+
+
+class SharedDiskTierTest(unittest.TestCase):
+    """Two caches (e.g. two processes) sharing one SQLite file while one of them sees the graph change."""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "results.sqlite")
+
+    def test_graph_change_keeps_disk_rows(self):
+        writer, reader = ResultCache(path=self.path), ResultCache(path=self.path)
+        problem = grid_graph(4, 4, seed=0)
+        old_key = writer.key(problem, ucs)
+        writer.put(old_key, ucs(problem))
+
+        # The writer sees a change of the graph: its own memory entries of the old graph go.
+        problem.update_edges([(0, 1, 1000)])
+        new_key = writer.key(problem, ucs)
+        self.assertNotEqual(new_key, old_key)
+        self.assertNotIn(old_key, writer.entries)
+
+        # A process still on the old graph keeps finding its result on disk.
+        self.assertEqual(reader.get(old_key)[0], True)
+        self.assertEqual(reader.disk_hits, 1)
+
+        # An explicit invalidation removes them for everyone.
+        writer.invalidate(old_key[0])
+        self.assertEqual(ResultCache(path=self.path).get(old_key), (False, None))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,38 @@
+import unittest
+from algorithms.ucs import ShortestPathTree, ucs
+from common.budget import BudgetExceeded, SearchBudget
+from common.generators import grid_graph
+
+# Run from src/: python -m pytest test
+
+
+def path_cost(problem, path):
+    return None if path is None else sum(map(problem.graph.weight, path, path[1:]))
+
+
+class ShortestPathTreeResumeTest(unittest.TestCase):
+    """A `ShortestPathTree` resumed after `problem.budget` stopped it."""
+
+    def test_resume_after_budget_stop(self):
+        problem = grid_graph(10, 10, seed=0)
+        goal = problem.graph.num_nodes - 1
+        for limit in range(1, 60):
+            tree = ShortestPathTree(problem)
+            problem.budget = SearchBudget(max_expansions=limit)
+            try:
+                tree.settle(goal)
+            except BudgetExceeded:
+                pass
+            finally:
+                problem.budget = None
+            # Resumed without a budget, every path must be as cheap as the one of a fresh UCS.
+            for state in range(0, problem.graph.num_nodes, 7):
+                self.assertEqual(
+                    path_cost(problem, tree.path(state)),
+                    path_cost(problem, ucs(problem.with_query(problem.initial, state))),
+                    f"path to {state} after a stop at {limit} expansions",
+                )
+
+
+if __name__ == "__main__":
+    unittest.main()
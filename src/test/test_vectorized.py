@@ -0,0 +1,48 @@
+import unittest
+from algorithms.a_star import a_star_search, a_star_search_vectorized
+from algorithms.ucs import ucs_vectorized
+from common.generators import grid_graph
+
+# Run from src/: python -m pytest test
+
+
+def path_cost(problem, path):
+    return None if path is None else sum(map(problem.graph.weight, path, path[1:]))
+
+
+class VectorizedUpdateTest(unittest.TestCase):
+    """The vectorised searches after `Problems.update_edges` (their NumPy views of the graph are cached)."""
+
+    def setUp(self):
+        self.problem = grid_graph(8, 8, seed=1)
+        # Warm the cached NumPy views of the graph before changing it.
+        self.assertEqual(
+            path_cost(self.problem, a_star_search_vectorized(self.problem)),
+            path_cost(self.problem, a_star_search(self.problem)),
+        )
+
+    def test_new_edge(self):
+        # A structural change: an edge that is not in the graph yet (state 0 is a corner).
+        graph = self.problem.graph
+        self.assertEqual(graph.weight(0, 63), 0)
+        self.problem.update_edges([(0, 63, 10_000)])
+        self.assertEqual(graph.weight(0, 63), 10_000)
+        self.assertEqual(
+            path_cost(self.problem, a_star_search_vectorized(self.problem)),
+            path_cost(self.problem, a_star_search(self.problem)),
+        )
+
+    def test_removed_and_raised_edges(self):
+        # Raise every edge of the current path and remove the first one.
+        path = a_star_search(self.problem)
+        graph = self.problem.graph
+        changes = [(s, s_prime, graph.weight(s, s_prime) * 5) for s, s_prime in zip(path, path[1:])]
+        changes[0] = (path[0], path[1], 0)
+        self.problem.update_edges(changes)
+        expected = path_cost(self.problem, a_star_search(self.problem))
+        self.assertEqual(path_cost(self.problem, a_star_search_vectorized(self.problem)), expected)
+        self.assertEqual(path_cost(self.problem, ucs_vectorized(self.problem)), expected)
+
+
+if __name__ == "__main__":
+    unittest.main()